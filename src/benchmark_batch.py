@@ -0,0 +1,29 @@
+# time a batch of advection problems in one AdvectionSolver against one
+# solver per member as the batch grows
+import time
+import numpy as np
+from util.solve import AdvectionSolver
+
+
+# inputs
+order = 5
+n = 256
+batch_sizes = [1, 10, 100, 1000]
+h = 1 / n
+t = np.arange(0, 0.1, 0.4 * h)
+
+print(f"{'batch':>6} {'separate [s]':>14} {'batched [s]':>14} {'speedup':>8}")
+for batch in batch_sizes:
+    x0 = np.random.rand(batch, n)
+    a = np.random.choice([-1, 1], batch) * np.random.rand(batch)
+
+    start = time.perf_counter()
+    for member in range(batch):
+        AdvectionSolver(x0[member], t, h, a[member], order, [t[-1]]).rk4()
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    AdvectionSolver(x0, t, h, a, order, [t[-1]]).rk4()
+    batched = time.perf_counter() - start
+    speedup = separate / batched
+    print(f"{batch:>6} {separate:14.3e} {batched:14.3e} {speedup:8.1f}")
@@ -0,0 +1,32 @@
+# time rk4 steps of a large grid in DecomposedAdvectionSolver as the number
+# of worker processes grows, against the serial AdvectionSolver
+import os
+import time
+import numpy as np
+from util.decompose import DecomposedAdvectionSolver
+from util.solve import AdvectionSolver
+
+
+# inputs
+order = 5
+n = 2**24
+n_steps = 10
+h = 1 / n
+t = np.arange(n_steps + 1) * 0.8 * h
+x0 = np.random.rand(n)
+worker_counts = sorted({1, 2, 4, 8, 16, 32, os.cpu_count()})
+worker_counts = [w for w in worker_counts if w <= os.cpu_count()]
+
+start = time.perf_counter()
+AdvectionSolver(x0, t, h, 1, order, [t[-1]]).rk4()
+serial = time.perf_counter() - start
+print(f"{'workers':>8} {'time [s]':>11} {'speedup':>8}")
+print(f"{'serial':>8} {serial:11.3e} {1:8.1f}")
+for workers in worker_counts:
+    solver = DecomposedAdvectionSolver(
+        x0, t, h, 1, order, [t[-1]], workers=workers
+    )
+    start = time.perf_counter()
+    solver.rk4()
+    seconds = time.perf_counter() - start
+    print(f"{workers:>8} {seconds:11.3e} {serial / seconds:8.1f}")
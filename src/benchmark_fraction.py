@@ -0,0 +1,101 @@
+# compare memory and throughput of the slotted Fraction against the previous
+# dataclass implementation
+import dataclasses
+import random
+import sys
+import timeit
+import tracemalloc
+from util.mathbasic import gcf, lcm, Fraction
+
+
+@dataclasses.dataclass
+class DataclassFraction:
+    """
+    the previous Fraction, reduced in __post_init__ on every construction
+    """
+
+    numerator: int
+    denominator: int
+
+    def __post_init__(self):
+        if not isinstance(self.numerator, int) or not isinstance(
+            self.denominator, int
+        ):
+            raise TypeError("Input is not an int tuple.")
+        if self.denominator == 0:
+            raise BaseException("Invalid case: zero denominator.")
+        if self.numerator == 0:
+            self.numerator, self.denominator = 0, 1
+        else:
+            factor = gcf([self.numerator, self.denominator])
+            if factor > 1:
+                self.numerator //= factor
+                self.denominator //= factor
+            if self.denominator < 0:
+                self.numerator = -self.numerator
+                self.denominator = abs(self.denominator)
+
+    def __add__(self, other):
+        denominator = lcm(self.denominator, other.denominator)
+        numerator = (self.numerator * (denominator // self.denominator)) + (
+            other.numerator * (denominator // other.denominator)
+        )
+        return self.__class__(numerator, denominator)
+
+    def __mul__(self, other):
+        return self.__class__(
+            self.numerator * other.numerator,
+            self.denominator * other.denominator,
+        )
+
+
+# inputs
+n_fractions = 100000
+n_repeats = 5
+max_int = 10**6
+
+random.seed(0)
+pairs = [
+    (random.randint(-max_int, max_int), random.randint(1, max_int))
+    for _ in range(n_fractions)
+]
+
+print(f"{'':>26} {'dataclass':>12} {'slotted':>12}")
+
+# memory per instance
+sizes = []
+for cls in [DataclassFraction, Fraction]:
+    tracemalloc.start()
+    instances = [cls(n, d) for n, d in pairs]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sizes.append(current / n_fractions)
+    del instances
+print(f"{'bytes per instance':>26} {sizes[0]:12.1f} {sizes[1]:12.1f}")
+print(
+    f"{'sys.getsizeof':>26} {sys.getsizeof(DataclassFraction(1, 2)):12d} "
+    f"{sys.getsizeof(Fraction(1, 2)):12d}"
+)
+
+
+# throughput of the dot products found in scheme generation
+def dot(cls, pairs):
+    fractions = [cls(n, d) for n, d in pairs[:1000]]
+    total = cls(0, 1)
+    for i in range(len(fractions) - 1):
+        total = total + fractions[i] * fractions[i + 1]
+    return total
+
+
+for cls in [DataclassFraction, Fraction]:
+    assert dot(cls, pairs).numerator == dot(Fraction, pairs).numerator
+times = [
+    timeit.timeit(lambda c=cls: dot(c, pairs), number=n_repeats) / n_repeats
+    for cls in [DataclassFraction, Fraction]
+]
+print(f"{'1000 term dot product [s]':>26} {times[0]:12.3e} {times[1]:12.3e}")
+times = [
+    timeit.timeit(lambda c=cls: [c(n, d) for n, d in pairs], number=1)
+    for cls in [DataclassFraction, Fraction]
+]
+print(f"{'construction [s]':>26} {times[0]:12.3e} {times[1]:12.3e}")
@@ -0,0 +1,26 @@
+# time rk4 steps of AdvectionSolver, four xdot evaluations each, against
+# the fused stencil of one rk4 step as the number of cells grows
+import time
+import numpy as np
+from util.solve import AdvectionSolver
+
+
+# inputs
+order = 5
+cfl = 0.8
+n_steps = 20
+cell_counts = [2**10, 2**14, 2**18, 2**22]
+
+print(f"{'cells':>8} {'rk4 [s]':>11} {'fused [s]':>11} {'speedup':>8}")
+for n in cell_counts:
+    h = 1 / n
+    t = np.arange(n_steps + 1) * cfl * h
+    x0 = np.random.rand(n)
+    times = []
+    for integrate in ["rk4", "integrate_fused"]:
+        solver = AdvectionSolver(x0, t, h, 1, order, [t[-1]])
+        start = time.perf_counter()
+        getattr(solver, integrate)()
+        times.append(time.perf_counter() - start)
+    rk4, fused = times
+    print(f"{n:>8} {rk4:11.3e} {fused:11.3e} {rk4 / fused:8.1f}")
@@ -0,0 +1,53 @@
+# compare trial division against Euclid's algorithm for the gcd of operands
+# the size of the denominators found in high order schemes
+import timeit
+from util.mathbasic import gcd_many
+from util.fvscheme import PolynomialReconstruction
+
+
+def trial_division_gcf(mylist: list[int]) -> int:
+    """
+    the original gcf, which checks every integer up to min(|x|)
+    """
+    cf = 1
+    for i in range(2, min(abs(j) for j in mylist) + 1):
+        if all(abs(k) % i == 0 for k in mylist):
+            cf = i
+    return cf
+
+
+# inputs
+orders = [3, 5, 7, 9, 11, 15, 25, 41]  # operand sizes taken from these orders
+max_trial_division_operand = 10**6  # larger operands take too long
+n_repeats = 3
+
+print(f"{'order':>5} {'operand':>9} {'trial [s]':>12} {'euclid [s]':>12}")
+seconds_per_trial = None
+for order in orders:
+    scheme = PolynomialReconstruction.compute_from_order(
+        order, "right", method="solve"
+    )
+    # a pair sharing the largest denominator, like the terms of a sum
+    denominator = max(frac.denominator for frac in scheme.coeffs.values())
+    operands = [7 * denominator, 11 * denominator]
+    euclid_time = (
+        timeit.timeit(lambda ops=operands: gcd_many(ops), number=n_repeats)
+        / n_repeats
+    )
+    if min(operands) <= max_trial_division_operand:
+        trial_time = (
+            timeit.timeit(
+                lambda ops=operands: trial_division_gcf(ops), number=n_repeats
+            )
+            / n_repeats
+        )
+        assert trial_division_gcf(operands) == gcd_many(operands)
+        seconds_per_trial = trial_time / min(operands)
+        trial = f"{trial_time:12.3e}"
+    else:
+        # trial division is linear in the operand, extrapolate
+        trial = f"~{seconds_per_trial * min(operands):11.1e}"
+    print(
+        f"{order:>5} {f'1e{len(str(min(operands))) - 1}':>9} {trial} "
+        f"{euclid_time:12.3e}"
+    )
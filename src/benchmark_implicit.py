@@ -0,0 +1,75 @@
+# time-to-solution of implicit methods against rk4 at equal error: every
+# method runs at the largest CFL in cfl_numbers, capped by 0.9 times the
+# CFL limit of rk4, whose error meets the tolerance
+# a constant speed is solved by FFT, face speeds varying in x by the cyclic
+# banded LU. the error of the constant speed is measured against the exact
+# orbit, that of the varying speeds against rk4 at a quarter of its limit
+import time
+import numpy as np
+from util.solve import AdvectionSolver
+
+
+def run(a, t_end, method, cfl):
+    """
+    (final state, seconds) of advecting the cell averages of sin(2 pi x)
+    until t_end at a Courant number cfl of the fastest face
+    """
+    dt = cfl * h / np.max(np.abs(a))
+    t = np.linspace(0, t_end, int(np.ceil(t_end / dt)) + 1)
+    solver = AdvectionSolver(u0, t, h, a, order, [t[-1]])
+    start = time.perf_counter()
+    solver.integrate(method)
+    seconds = time.perf_counter() - start
+    return solver.x[:, -1], seconds
+
+
+# inputs
+order = 5
+n = 1024
+methods = ["crank_nicolson", "sdirk2", "sdirk3"]
+cfl_numbers = [0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128]
+tolerances = [1e-2, 1e-4, 1e-6]
+h = 1 / n
+# cell averages of sin(2 pi x)
+u0 = np.sin(2 * np.pi * (np.arange(n) + 0.5) * h) * np.sin(np.pi * h)
+u0 /= np.pi * h
+x_faces = np.arange(n + 1) * h
+cases = [
+    ("constant", 1, 1.0),
+    ("varying", 1 + 0.5 * np.sin(2 * np.pi * x_faces), 0.25),
+]
+
+print(f"{'speed':>9} {'tolerance':>10} {'method':>15} {'CFL':>8}", end="")
+print(f" {'error':>10} {'time [s]':>10} {'speedup':>8}")
+for name, a, t_end in cases:
+    rk4_cfl = 0.9 * AdvectionSolver(u0, [0, 1], h, a, order).cfl_limit("rk4")
+    if np.size(a) == 1:
+        reference = u0
+    else:
+        reference, _ = run(a, t_end, "rk4", rk4_cfl / 4)
+    for tolerance in tolerances:
+        rk4_seconds = None
+        for method in ["rk4"] + methods:
+            best = None
+            for cfl in cfl_numbers:
+                if method == "rk4":
+                    cfl = min(cfl, rk4_cfl)
+                x, seconds = run(a, t_end, method, cfl)
+                error = np.max(np.abs(x - reference))
+                if error > tolerance:
+                    break
+                best = cfl, error, seconds
+                if cfl == rk4_cfl:
+                    break
+            row = f"{name:>9} {tolerance:10.0e} {method:>15}"
+            if best is None:
+                print(f"{row} {'-':>8} not reached")
+                continue
+            cfl, error, seconds = best
+            if method == "rk4":
+                rk4_seconds = seconds
+            speedup = rk4_seconds / seconds if rk4_seconds else np.nan
+            print(
+                f"{row} {cfl:8.2f} {error:10.2e} {seconds:10.3e}"
+                f" {speedup:8.1f}"
+            )
@@ -0,0 +1,59 @@
+# time AdvectionSolver.xdot against the original window matrix and per-cell
+# loop implementation as the number of cells grows
+import timeit
+import numpy as np
+from util.solve import AdvectionSolver
+
+
+def original_xdot(solver, x):
+    """
+    xdot as it was before the stencil was vectorized
+    """
+    x_extended = np.concatenate(
+        (np.zeros(solver._gw), x, np.zeros(solver._gw))
+    )
+    solver.periodic_boundary(x_extended)
+    a = []
+    n = len(x)
+    for i in range(2 * solver._k + 1):
+        right_ind = i + n + 2
+        a.append(x_extended[i:right_ind])
+    A = np.array(a).T
+    x_interface_right = (
+        A @ solver.right_interface_scheme / sum(solver.right_interface_scheme)
+    )
+    x_interface_left = (
+        A @ solver.left_interface_scheme / sum(solver.left_interface_scheme)
+    )
+    Delta_x = np.zeros(n)
+    for i in range(n):
+        if solver.a > 0:
+            Delta_x[i] = x_interface_right[i + 1] - x_interface_right[i]
+        elif solver.a < 0:
+            Delta_x[i] = x_interface_left[i + 2] - x_interface_left[i + 1]
+    return -(solver.a / solver.h) * Delta_x
+
+
+def time_call(f, *args):
+    return timeit.timeit(lambda: f(*args), number=n_repeats) / n_repeats
+
+
+# inputs
+order = 5
+cell_counts = [10**3, 10**4, 10**5, 10**6]
+n_repeats = 3
+
+print(f"{'n':>8} {'original [s]':>14} {'stencil [s]':>14} {'speedup':>8}")
+for n in cell_counts:
+    x = np.random.rand(n)
+    solver = AdvectionSolver(
+        x0=x, t=np.array([0, 1]), h=1 / n, a=1, order=order
+    )
+    assert np.allclose(solver.xdot(x, 0), original_xdot(solver, x))
+    times = [
+        time_call(original_xdot, solver, x),
+        time_call(solver.xdot, x, 0),
+    ]
+    print(
+        f"{n:>8} {times[0]:14.3e} {times[1]:14.3e} {times[0] / times[1]:8.1f}"
+    )
@@ -1,11 +1,139 @@
-from util.fvscheme import PolynomialReconstruction
+# generate tables of reconstruction schemes in parallel and save them to the
+# scheme store, e.g.
+# > python src/generate_schemes.py --orders 1-40 --points right left
+import argparse
+import concurrent.futures
+import os
+import time
+from util.fvscheme import Kernel, PolynomialReconstruction
+from util.schemecache import normalize_point, SchemeCache
+from util.schemestore import SchemeStore
 
-orders = range(1, 10)
 
-for order in orders:
-    PolynomialReconstruction.construct_from_order(
-        order=order, reconstruct_here="right"
+def parse_orders(spec: str) -> list[int]:
+    """
+    "1-9" or "1,3,5" or a mix like "1-5,9"
+    """
+    orders = []
+    for part in spec.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            orders.extend(range(int(first), int(last) + 1))
+        else:
+            orders.append(int(part))
+    return orders
+
+
+def parse_point(spec: str):
+    """
+    "right", "left", "center" or an offset from the cell center like "1/3",
+    normalized as in the keys of the scheme cache
+    """
+    return normalize_point(spec)
+
+
+def parse_kernel(spec: str):
+    """
+    "order" for the schemes of each order or "left,right" for a kernel
+    """
+    if spec == "order":
+        return spec
+    left, right = spec.split(",")
+    return int(left), int(right)
+
+
+def make_jobs(orders: list, points: list, kernels: list) -> list:
+    """
+    list of (size, key) with the largest jobs first
+    """
+    jobs = []
+    for kernel in kernels:
+        for point in points:
+            if kernel == "order":
+                jobs.extend(
+                    (order, ("order", order, point)) for order in orders
+                )
+            else:
+                jobs.append((sum(kernel) + 1, (*kernel, point)))
+    return sorted(jobs, key=lambda job: job[0], reverse=True)
+
+
+def compute_scheme(key: tuple, method: str) -> dict:
+    """
+    the scheme {cell index: Fraction} of a key, whose point may be saved
+    as a string like "1/3"
+    """
+    point = normalize_point(key[2])
+    if key[0] == "order":
+        scheme = PolynomialReconstruction.compute_from_order(
+            key[1], point, method
+        )
+    else:
+        scheme = PolynomialReconstruction.construct_by_symmetry(
+            Kernel(key[0], key[1]), point, method
+        )
+    return scheme.coeffs
+
+
+def run_job(key: tuple, method: str, store_path: str, force: bool) -> tuple:
+    """
+    compute one scheme into the store through a scheme cache, returns
+    (key, coeffs, wall time)
+    """
+    start = time.perf_counter()
+    cache = SchemeCache(SchemeStore(store_path))
+    coeffs = cache.get_or_compute(
+        key, lambda: compute_scheme(key, method), force
     )
-    PolynomialReconstruction.construct_from_order(
-        order=order, reconstruct_here="left"
+    return key, coeffs, time.perf_counter() - start
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description="Generate reconstruction schemes into the scheme store."
+    )
+    parser.add_argument("--orders", default="1-9", type=parse_orders)
+    parser.add_argument(
+        "--points", nargs="+", default=["right", "left"], type=parse_point
+    )
+    parser.add_argument(
+        "--kernels",
+        nargs="+",
+        default=["order"],
+        type=parse_kernel,
+        help='"order" or kernel shapes "left,right"',
+    )
+    parser.add_argument(
+        "--method", default="lagrange", choices=["lagrange", "solve"]
     )
+    parser.add_argument("--workers", default=os.cpu_count(), type=int)
+    parser.add_argument("--store", default=None, help="scheme store path")
+    parser.add_argument(
+        "--force", action="store_true", help="regenerate saved schemes"
+    )
+    args = parser.parse_args(argv)
+
+    # the workers write through caches of the store, computing each key
+    # under its lock
+    cache = SchemeCache(SchemeStore(args.store))
+    jobs = []
+    for _, key in make_jobs(args.orders, args.points, args.kernels):
+        key = cache.normalize_key(key)
+        if key not in jobs and (args.force or key not in cache.store):
+            jobs.append(key)
+    print(f"{len(jobs)} jobs on {args.workers} workers")
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(args.workers) as executor:
+        futures = [
+            executor.submit(run_job, key, args.method, args.store, args.force)
+            for key in jobs
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            key, _, wall_time = future.result()
+            print(f"{str(key):>28} {wall_time:10.3f} s")
+    print(f"total {time.perf_counter() - start:.3f} s")
+    return jobs
+
+
+if __name__ == "__main__":
+    main()
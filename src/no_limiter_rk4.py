@@ -2,7 +2,7 @@
 import numpy as np
 import math
 import matplotlib.pyplot as plt
-from util.solve import AdvectionSolver
+from util.solve import MultiOrderSolver
 
 
 # inputs
@@ -12,15 +12,12 @@ a = 1  # tranpsort speed
 x_bounds = [0, 1]  # spatial domain
 h = 0.02  # grid size
 T = 2  # solving time
-Dt = 0.8 * h / a  # time step size
+cfl_fraction = 0.9  # time step size as a fraction of the stable one
 
 # array of x-values
 x_interface = np.arange(x_bounds[0], x_bounds[1] + h, h)
 x = 0.5 * (x_interface[:-1] + x_interface[1:])  # x at cell centers
 
-# array of t-values
-t = np.arange(0, T + Dt, Dt)
-
 # initial values of u
 if ic_type == "sinus":
     u0 = np.cos(2 * math.pi * x)
@@ -29,13 +26,22 @@ elif ic_type == "square":
         [np.heaviside(i - 0.25, 1) - np.heaviside(i - 0.75, 1) for i in x]
     )
 
+# time step size at a fraction of the CFL limit of rk4 with every order
+Dt = cfl_fraction * MultiOrderSolver(
+    x0=u0, t=np.array([0, T]), h=h, a=a, orders=orders
+).max_dt("rk4")
+
+# array of t-values
+t = np.arange(0, T + Dt, Dt)
+
 # advect for T orbits and the initial state should match the final state
-# do this for many orders
+# do this for many orders, all advanced together in one time loop
 plt.plot(x, u0, label="t = 0")
-for order in orders:
-    advection_solution = AdvectionSolver(x0=u0, t=t, h=h, a=a, order=order)
-    advection_solution.rk4()
-    u = advection_solution.x
+advection_solution = MultiOrderSolver(
+    x0=u0, t=t, h=h, a=a, orders=orders, snapshots=[t[-1]]
+)
+advection_solution.rk4()
+for order, u in advection_solution.results().items():
     plt.plot(
         x, u[:, -1], "--", marker="o", mfc="none", label=f"order {order} + rk4"
     )
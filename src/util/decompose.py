@@ -0,0 +1,252 @@
+import multiprocessing
+import os
+import threading
+from multiprocessing import connection, shared_memory
+import numpy as np
+from util.fvscheme import PolynomialReconstruction
+from util.integrate import Integrator
+from util.rungekutta import DiagonallyImplicitTableau, tableaus
+from util.solve import AdvectionSolver
+
+
+def _shared_array(shape: tuple) -> tuple:
+    """
+    (shared memory, float64 array of shape in it)
+    """
+    size = max(8 * int(np.prod(shape)), 1)
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    return memory, np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+
+
+def _attach(name: str, shape: tuple) -> tuple:
+    """
+    (shared memory, float64 array) of an existing block of shared memory
+    """
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+
+
+class BlockSolver(AdvectionSolver):
+    """
+    AdvectionSolver of the cells of one block of a decomposed grid, whose
+    ghost cells are the edge cells of the neighboring blocks instead of its
+    own periodic copies. edges is the shared (2, blocks, 2, gw) array of the
+    first and last gw cells of every block. the exchanges of consecutive
+    stages alternate between edges[0] and edges[1], so a block can not
+    overwrite edges that a slower neighbor has yet to read, and one barrier
+    per stage is enough. the kept states are written straight to x, the
+    block's rows of the shared states
+    """
+
+    def __init__(self, x0, t, h, a, order, snapshots, rank, edges, barrier, x):
+        self.rank = rank
+        self.edges = edges
+        self.barrier = barrier
+        self._exchanges = 0
+        self._shared_x = x
+        super().__init__(x0, t, h, a, order, snapshots)
+
+    def allocate_history(self, shape: tuple, dtype) -> np.ndarray:
+        """
+        the shared states instead of an array of the worker's own
+        """
+        if self._shared_x.shape != shape:
+            raise BaseException("Shared states do not fit the block.")
+        return self._shared_x
+
+    def periodic_boundary(self, x_extended: np.ndarray, gw: int = None):
+        """
+        exchange the _gw cells next to the ghost cells with the neighbors
+        """
+        gw = self._gw
+        negative_gw = -gw
+        edges = self.edges[self._exchanges % 2]
+        self._exchanges += 1
+        right_index = 2 * gw
+        left_index = -2 * gw
+        edges[self.rank, 0] = x_extended[gw:right_index]
+        edges[self.rank, 1] = x_extended[left_index:negative_gw]
+        try:
+            self.barrier.wait()
+        except threading.BrokenBarrierError:
+            raise BaseException(
+                f"Block {self.rank} lost its neighbors: a worker failed or "
+                "the barrier timed out."
+            )
+        blocks = len(edges)
+        x_extended[:gw] = edges[(self.rank - 1) % blocks, 1]
+        x_extended[negative_gw:] = edges[(self.rank + 1) % blocks, 0]
+
+
+def _run_block(
+    rank, first, end, names, shapes, t, h, a, order, snapshots, method, barrier
+):
+    """
+    integrate the cells first, ..., end - 1 in a worker process, keeping
+    the snapshots in the shared x
+    """
+    memories = []
+    try:
+        memory, x = _attach(names["x"], shapes["x"])
+        memories.append(memory)
+        memory, edges = _attach(names["edges"], shapes["edges"])
+        memories.append(memory)
+        if "a" in names:
+            memory, a = _attach(names["a"], shapes["a"])
+            memories.append(memory)
+            # the faces of the cells of the block
+            face_end = end + 1
+            a = np.array(a[first:face_end])
+        solver = BlockSolver(
+            np.array(x[first:end, 0]),
+            t,
+            h,
+            a,
+            order,
+            snapshots,
+            rank,
+            edges,
+            barrier,
+            x[first:end],
+        )
+        solver.integrate(method)
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        # drop the views before the shared memory is closed
+        solver = x = edges = None
+        for memory in memories:
+            memory.close()
+
+
+class DecomposedAdvectionSolver:
+    """
+    AdvectionSolver of one state of n cells split into contiguous blocks,
+    each integrated by its own worker process. the kept states x live in
+    multiprocessing.shared_memory, and before every stage each block writes
+    its first and last gw cells to shared memory, waits at a barrier and
+    reads the ghost cells from its neighbors, so the states are those of
+    the serial AdvectionSolver to the last bit
+    workers defaults to os.cpu_count(), every block needs at least gw
+    cells. explicit methods only
+    a worker waits at most timeout seconds at the barrier of a stage, and
+    the barrier is broken as soon as any worker fails, so a worker killed
+    by a signal fails the integration instead of hanging it
+    """
+
+    def __init__(
+        self,
+        x0,
+        t,
+        h,
+        a,
+        order,
+        snapshots=None,
+        workers: int = None,
+        start_method: str = None,
+        timeout: float = 60,
+    ):
+        if np.ndim(x0) != 1:
+            raise BaseException("x0 of a decomposed solver must be 1D.")
+        self.x0 = x0
+        self.t = t
+        self.h = h
+        self.a = a
+        self.order = order
+        self.snapshots = snapshots
+        self.workers = os.cpu_count() if workers is None else workers
+        self.start_method = start_method
+        self.timeout = timeout
+        # the same kept states as an Integrator over t
+        self.snapshot_indices = Integrator.select_snapshots(self, snapshots)
+        self.t_snapshots = np.asarray(t)[self.snapshot_indices]
+        n = len(x0)
+        self.bounds = np.linspace(0, n, self.workers + 1).astype(int)
+        # the ghost width of AdvectionSolver
+        scheme = PolynomialReconstruction.construct_from_order(order, "right")
+        self._gw = max(scheme.coeffs.keys()) + 1
+        if np.min(np.diff(self.bounds)) < self._gw:
+            raise BaseException("Blocks are smaller than the ghost width.")
+        self.x = None
+
+    def integrate(self, method: str = "rk4"):
+        """
+        integrate over t with an explicit method, see Integrator.integrate
+        """
+        if method not in ("euler", "rk4") and (
+            method not in tableaus
+            or isinstance(tableaus[method], DiagonallyImplicitTableau)
+        ):
+            raise BaseException(f"Invalid decomposed method: {method}")
+        n = len(self.x0)
+        shapes = {
+            "x": (n, len(self.snapshot_indices)),
+            "edges": (2, self.workers, 2, self._gw),
+        }
+        memories = {}
+        try:
+            memories["x"], x = _shared_array(shapes["x"])
+            memories["edges"], _ = _shared_array(shapes["edges"])
+            x[:, 0] = self.x0
+            a = self.a
+            if np.size(a) != 1:
+                shapes["a"] = (n + 1,)
+                memories["a"], shared_a = _shared_array(shapes["a"])
+                shared_a[:] = a
+                a = None
+            names = dict(
+                (key, memory.name) for key, memory in memories.items()
+            )
+            context = multiprocessing.get_context(self.start_method)
+            barrier = context.Barrier(self.workers, timeout=self.timeout)
+            processes = [
+                context.Process(
+                    target=_run_block,
+                    args=(
+                        rank,
+                        self.bounds[rank],
+                        self.bounds[rank + 1],
+                        names,
+                        shapes,
+                        self.t,
+                        self.h,
+                        a,
+                        self.order,
+                        self.snapshots,
+                        method,
+                        barrier,
+                    ),
+                )
+                for rank in range(self.workers)
+            ]
+            for process in processes:
+                process.start()
+            running = dict(
+                (process.sentinel, process) for process in processes
+            )
+            while running:
+                for sentinel in connection.wait(list(running)):
+                    process = running.pop(sentinel)
+                    process.join()
+                    if process.exitcode != 0:
+                        # release the other workers from the barrier
+                        barrier.abort()
+            exit_codes = [process.exitcode for process in processes]
+            if any(exit_codes):
+                raise BaseException(
+                    "A worker of the decomposed solver failed, exit codes "
+                    f"{exit_codes}."
+                )
+            self.x = np.array(x)
+        finally:
+            x = shared_a = None
+            for memory in memories.values():
+                memory.close()
+                memory.unlink()
+
+    def rk4(self):
+        """
+        4th order Runge-Kutta integrator
+        """
+        self.integrate("rk4")
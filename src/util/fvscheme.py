@@ -1,13 +1,65 @@
 import dataclasses
+import fractions
+import functools
+import numbers
 import numpy as np
-import csv
-import os.path
-from util.mathbasic import lcm, Fraction
+from util.mathbasic import lcm_many, Fraction
 from util.lincom import LinearCombinationOfFractions
-from util.polynome import Lagrange
+from util.polynome import DenseLagrange
+from util.linalg import solve_exact
+from util.schemecache import normalize_point, SchemeCache
 
 
-directory_path = "src/util/reconstruction_schemes/"
+# opened on first use, see default_scheme_cache
+scheme_cache = None
+
+# schemes of canonical kernel geometries, see construct_by_symmetry
+canonical_schemes = {}
+
+# cell averages shifted by a fraction of a cell, see construct_shifted_average
+shifted_schemes = {}
+
+
+def default_scheme_cache() -> SchemeCache:
+    """
+    the process-wide scheme cache in front of the scheme store at
+    schemestore.default_store_path()
+    """
+    global scheme_cache
+    if scheme_cache is None:
+        scheme_cache = SchemeCache()
+    return scheme_cache
+
+
+@functools.lru_cache(maxsize=None)
+def lagrange_weights(x_faces: tuple) -> tuple:
+    """
+    polynomials multiplied to each cell value of a kernel whose faces are
+    x_faces in its cumulative quantity, in units of the cell width
+    cell j enters the cumulative quantity at every face i > j, so its weight
+    polynomial is the suffix sum of Lagrange_i over i > j. each Lagrange_i is
+    built once and the result is cached on the face coordinates
+    """
+    weights = []
+    suffix_sum = None
+    # skip first cell wall (coming from the left) because the cumulative
+    # quantity is 0 there
+    for i in range(len(x_faces) - 1, 0, -1):
+        lagrange_i = DenseLagrange.Lagrange_i(list(x_faces), i)
+        suffix_sum = (
+            lagrange_i if suffix_sum is None else suffix_sum + lagrange_i
+        )
+        weights.append(suffix_sum)
+    return tuple(reversed(weights))
+
+
+@functools.lru_cache(maxsize=None)
+def lagrange_weight_primes(x_faces: tuple) -> tuple:
+    """
+    derivatives of lagrange_weights, the polynomials multiplied to each cell
+    value in the reconstructed point value
+    """
+    return tuple(weight.prime() for weight in lagrange_weights(x_faces))
 
 
 class Kernel:
@@ -62,49 +114,70 @@ class PolynomialReconstruction(LinearCombinationOfFractions):
 
     coeffs: dict  # {int: Fraction}
 
+    @staticmethod
+    def x_eval_from_kernel(kernel: Kernel, reconstruct_here="right"):
+        """
+        x value in kernel coordinates at which the scheme is evaluated
+        reconstruct_here:   "right", "left", "center" or a number, the offset
+                            from the center of the central cell in units of
+                            cell width (the right face is 1/2). float offsets
+                            are converted exactly to a Fraction
+        """
+        x = kernel.x_cell_faces
+        x_center = kernel.x_cell_centers[kernel.index_at_center]
+        if reconstruct_here == "right" or reconstruct_here == "r":
+            return x[kernel.index_at_center + 1]
+        elif reconstruct_here == "left" or reconstruct_here == "l":
+            return x[kernel.index_at_center]
+        elif reconstruct_here == "center" or reconstruct_here == "c":
+            return x_center
+        elif isinstance(reconstruct_here, (float, numbers.Rational)):
+            offset = fractions.Fraction(reconstruct_here)
+            offset = Fraction(offset.numerator, offset.denominator)
+            return x_center + kernel.h * offset
+        raise BaseException(
+            "Must provide an x value for polynomial reconstruction."
+        )
+
     @classmethod
     def construct_from_kernel(
-        cls, kernel: Kernel, reconstruct_here: str = "right"
+        cls,
+        kernel: Kernel,
+        reconstruct_here: str = "right",
+        method: str = "lagrange",
     ):
         """
         kernel: object
         face:   which face of the central cell is the scheme evaluating
+        method: "lagrange" differentiates the cumulative Lagrange
+                interpolant, "solve" solves the moment system directly
         """
-        x = kernel.x_cell_faces
-        if reconstruct_here == "right" or reconstruct_here == "r":
-            x_eval = x[kernel.index_at_center + 1]
-        elif reconstruct_here == "left" or reconstruct_here == "l":
-            x_eval = x[kernel.index_at_center]
-        elif reconstruct_here == "center" or reconstruct_here == "c":
-            x_eval = kernel.x_cell_centers[kernel.index_at_center]
-        else:
-            BaseException(
-                "Must provide an x value for polynomial reconstruction."
-            )
+        x_eval = cls.x_eval_from_kernel(kernel, reconstruct_here)
+        if method == "lagrange":
+            return cls.lagrange_from_kernel(kernel, x_eval)
+        elif method == "solve":
+            return cls.solve_from_kernel(kernel, x_eval)
+        raise BaseException(f"Invalid scheme generation method: {method}.")
 
-        # find the polynomial expression being multiplied to each cell value
-        polynomial_weights = {}
-
-        # skip first cell wall (coming from the left) because the cumulative
-        # quantity is 0 there
-        for i in range(1, len(kernel.x_cell_faces)):
-            for j in kernel.indices[:i]:
-                if j in polynomial_weights.keys():
-                    polynomial_weights[j] = polynomial_weights[
-                        j
-                    ] + Lagrange.Lagrange_i(kernel.x_cell_faces, i)
-                else:
-                    polynomial_weights[j] = Lagrange.Lagrange_i(
-                        kernel.x_cell_faces, i
-                    )
-
-        # take the derivative of the polynomials
+    @classmethod
+    def lagrange_from_kernel(cls, kernel: Kernel, x_eval: int):
+        """
+        differentiate the Lagrange interpolant of the cumulative quantity
+        at the kernel faces and evaluate it at x_eval
+        """
+        # the weight polynomials only depend on the face spacing, so
+        # translate the kernel to be centered on 0 and share them between
+        # evaluation points and between kernels of the same size
+        x0 = (kernel.x_cell_faces[0] + kernel.x_cell_faces[-1]) // 2
         polynomial_weights_prime = dict(
-            [
-                (i, polynome.prime())
-                for i, polynome in polynomial_weights.items()
-            ]
+            zip(
+                kernel.indices,
+                lagrange_weight_primes(
+                    tuple(x_face - x0 for x_face in kernel.x_cell_faces)
+                ),
+            )
         )
+        x_eval = x_eval - x0
 
         # evaluate them at the cell face, multiply by h
         coeffs = (
@@ -112,7 +185,7 @@ class PolynomialReconstruction(LinearCombinationOfFractions):
             * LinearCombinationOfFractions(
                 dict(
                     [
-                        (i, polynome.eval(x_eval, div="fraction"))
+                        (i, polynome.eval_many([x_eval])[0])
                         for i, polynome in polynomial_weights_prime.items()
                     ]
                 )
@@ -122,62 +195,282 @@ class PolynomialReconstruction(LinearCombinationOfFractions):
         return cls(coeffs)
 
     @classmethod
-    def construct_from_order(
-        cls, order: int = 1, reconstruct_here: str = "right"
-    ):
+    def solve_from_kernel(cls, kernel: Kernel, x_eval: int):
+        """
+        solve the moment system for the weights w_j which reproduce the
+        point value at x_eval of every polynomial of degree < kernel.size
+        from its cell averages
+            sum_j w_j * mean_j((x - x_eval)^m) = 0^m,  m = 0, ..., size - 1
+        each row is scaled by (m + 1) * h so that the matrix is integer for
+        face and center evaluations
         """
-        solve for a reconstruction scheme of a given order and save to a
-        """
-        if reconstruct_here == "r":
-            reconstruct_here = "right"
-        if reconstruct_here == "l":
-            reconstruct_here = "left"
-        save_path = directory_path + f"order{order}_{reconstruct_here}.csv"
-        if os.path.isfile(save_path):
-            coeffs = {}
-            with open(save_path, mode="r") as infile:
-                for row in csv.reader(infile):
-                    coeffs[int(row[0])] = Fraction(int(row[1]), int(row[2]))
-                interface_scheme = cls(coeffs)
-            print(
-                f"Read a {reconstruct_here} interface reconstruction scheme "
-                f"of order {order} from {save_path}"
+        y = [x_face - x_eval for x_face in kernel.x_cell_faces]
+        matrix = [
+            [y[j + 1] ** (m + 1) - y[j] ** (m + 1) for j in range(kernel.size)]
+            for m in range(kernel.size)
+        ]
+        rhs = [kernel.h] + [0] * (kernel.size - 1)
+        weights = solve_exact(matrix, rhs)
+        return cls(
+            dict(
+                [
+                    (i, Fraction(w.numerator, w.denominator))
+                    for i, w in zip(kernel.indices, weights)
+                ]
+            )
+        )
+
+    @classmethod
+    def subinterval_from_kernel(cls, kernel: Kernel, start, end):
+        """
+        integral of the reconstruction from start to end divided by the cell
+        width, the differences of the cumulative Lagrange interpolant at the
+        kernel faces. start and end are offsets accepted by
+        x_eval_from_kernel, from -1/2 to 1/2 gives the average of the
+        central cell
+        """
+        x0 = (kernel.x_cell_faces[0] + kernel.x_cell_faces[-1]) // 2
+        x_evals = [
+            cls.x_eval_from_kernel(kernel, point) - x0
+            for point in [start, end]
+        ]
+        weights = lagrange_weights(
+            tuple(x_face - x0 for x_face in kernel.x_cell_faces)
+        )
+        coeffs = {}
+        for i, polynome in zip(kernel.indices, weights):
+            at_start, at_end = polynome.eval_many(x_evals)
+            coeff = at_end - at_start
+            coeffs[i] = Fraction(coeff.numerator, coeff.denominator)
+        return cls(coeffs)
+
+    @classmethod
+    def construct_shifted_average(cls, order: int, shift):
+        """
+        scheme of the average of the cell moved right by 0 <= shift < 1
+        cells, from -1/2 - shift to 1/2 - shift, in flux form
+            u_0 - F_1/2 + F_-1/2
+        where F_1/2 is the integral of the reconstruction of cell 0 over its
+        rightmost shift, so the scheme conserves the sum of the cells
+        the kernels of an order are those of compute_from_order, shift is
+        converted exactly to a Fraction and the schemes are cached
+        """
+        shift = fractions.Fraction(shift)
+        shift = Fraction(shift.numerator, shift.denominator)
+        key = (order, shift)
+        if key not in shifted_schemes:
+            if order % 2 != 0:
+                kernels = [Kernel(order // 2, order // 2)]
+            else:
+                kernels = [
+                    Kernel(order // 2, order // 2 - 1),
+                    Kernel(order // 2 - 1, order // 2),
+                ]
+            start = Fraction(1, 2) - shift
+            flux = sum(
+                (
+                    cls.subinterval_from_kernel(kernel, start, Fraction(1, 2))
+                    for kernel in kernels
+                ),
+                cls({}),
+            ) / len(kernels)
+            scheme = cls({0: Fraction(1)}) - flux + flux.shift(-1)
+            shifted_schemes[key] = cls(
+                dict((i, c) for i, c in scheme.coeffs.items() if c != 0)
             )
+        return shifted_schemes[key]
+
+    @classmethod
+    def weight_matrix(
+        cls, kernel: Kernel, points: list, mode: str = "fraction"
+    ):
+        """
+        reconstruction weights at many points from one kernel
+        points: list of "right", "left", "center" or offsets accepted by
+                x_eval_from_kernel, e.g. Gauss-Legendre nodes / 2
+        mode:   "fraction" returns an object array of exact Fractions,
+                "float" returns a float64 array
+        returns a (len(points), kernel.size) array whose columns follow
+        kernel.indices. row i holds the coefficients of
+        construct_from_kernel(kernel, points[i]), including zeros
+        """
+        x0 = (kernel.x_cell_faces[0] + kernel.x_cell_faces[-1]) // 2
+        polynomial_weights_prime = lagrange_weight_primes(
+            tuple(x_face - x0 for x_face in kernel.x_cell_faces)
+        )
+        x_evals = [
+            cls.x_eval_from_kernel(kernel, point) - x0 for point in points
+        ]
+        if mode == "float":
+            x_evals = np.array([float(x) for x in x_evals])
+            matrix = np.empty((len(points), kernel.size))
+        elif mode == "fraction":
+            matrix = np.empty((len(points), kernel.size), dtype=object)
         else:
-            if order % 2 != 0:  # odd order
-                kern = Kernel(order // 2, order // 2)
-                interface_scheme = cls.construct_from_kernel(
-                    kern, reconstruct_here
-                )
-            else:  # even order
-                long_length = order // 2  # long length
-                short_length = order // 2 - 1  # short length
-                interface_scheme = (
-                    cls.construct_from_kernel(
-                        Kernel(long_length, short_length), reconstruct_here
-                    )
-                    + cls.construct_from_kernel(
-                        Kernel(short_length, long_length), reconstruct_here
-                    )
-                ) / 2
-            with open(save_path, "w+") as the_file:
-                writer = csv.writer(the_file)
-                for key, val in interface_scheme.coeffs.items():
-                    writer.writerow([key, val.numerator, val.denominator])
-            print(
-                f"Wrote a {reconstruct_here} interface reconstruction scheme "
-                f"of order {order} to {save_path}"
+            raise BaseException(f"Invalid weight matrix mode: {mode}.")
+        for j, polynome in enumerate(polynomial_weights_prime):
+            values = polynome.eval_many(x_evals)
+            if mode == "float":
+                matrix[:, j] = kernel.h * values
+            else:
+                matrix[:, j] = [kernel.h * value for value in values]
+        return matrix
+
+    def reflect(self):
+        """
+        mirror the scheme about cell 0, u_i -> u_-i
+        """
+        return self.__class__(
+            dict([(-i, coeff) for i, coeff in self.coeffs.items()])
+        )
+
+    def shift(self, k: int):
+        """
+        relabel the cells of the scheme, u_i -> u_i+k
+        """
+        return self.__class__(
+            dict([(i + k, coeff) for i, coeff in self.coeffs.items()])
+        )
+
+    @classmethod
+    def canonical_geometry(cls, kernel: Kernel, reconstruct_here="right"):
+        """
+        a scheme only depends on the kernel size and on where the evaluation
+        point sits relative to the leftmost cell, up to a shift of the cell
+        labels and a reflection. returns
+            size:       number of cells in the kernel
+            offset:     evaluation point relative to the center of the
+                        leftmost cell, in cell widths, reflected if that
+                        makes it smaller
+            reflected:  whether the geometry was reflected
+            first:      index of the leftmost cell
+        """
+        x_eval = cls.x_eval_from_kernel(kernel, reconstruct_here)
+        offset = Fraction(1, kernel.h) * (x_eval - kernel.x_cell_centers[0])
+        reflected_offset = (kernel.size - 1) - offset
+        reflected = reflected_offset < offset
+        if reflected:
+            offset = reflected_offset
+        return kernel.size, offset, reflected, kernel.indices[0]
+
+    @classmethod
+    def construct_by_symmetry(
+        cls,
+        kernel: Kernel,
+        reconstruct_here="right",
+        method: str = "lagrange",
+    ):
+        """
+        same result as construct_from_kernel, but kernels and evaluation
+        points related by a reflection or a shift share a single generated
+        scheme, which is remapped onto the requested cell indices
+        """
+        size, offset, reflected, first = cls.canonical_geometry(
+            kernel, reconstruct_here
+        )
+        key = (size, offset, method)
+        if key not in canonical_schemes:
+            # center the canonical kernel on the cell holding the point so
+            # that faces and centers are evaluated with integer arithmetic
+            floor = offset.numerator // offset.denominator
+            center = min(max(floor, 0), size - 1)
+            local_offset = offset - center
+            local_offset = {
+                Fraction(1, 2): "right",
+                Fraction(-1, 2): "left",
+                0: "center",
+            }.get(local_offset, local_offset)
+            canonical_schemes[key] = cls.construct_from_kernel(
+                Kernel(center, size - 1 - center), local_offset, method
+            ).shift(center)
+        scheme = canonical_schemes[key]
+        if reflected:  # cell i of the canonical kernel is cell size - 1 - i
+            scheme = scheme.reflect().shift(size - 1)
+        return scheme.shift(first)
+
+    @classmethod
+    def compute_from_order(
+        cls,
+        order: int = 1,
+        reconstruct_here: str = "right",
+        method: str = "lagrange",
+    ):
+        """
+        solve for a reconstruction scheme of a given order without reading
+        or writing any saved schemes
+        """
+        if order % 2 != 0:  # odd order
+            kern = Kernel(order // 2, order // 2)
+            return cls.construct_by_symmetry(kern, reconstruct_here, method)
+        # even order
+        long_length = order // 2  # long length
+        short_length = order // 2 - 1  # short length
+        return (
+            cls.construct_by_symmetry(
+                Kernel(long_length, short_length), reconstruct_here, method
+            )
+            + cls.construct_by_symmetry(
+                Kernel(short_length, long_length), reconstruct_here, method
             )
-        return interface_scheme
+        ) / 2
+
+    @classmethod
+    def construct_from_order(
+        cls,
+        order: int = 1,
+        reconstruct_here: str = "right",
+        method: str = "lagrange",
+        cache: SchemeCache = None,
+    ):
+        """
+        read the reconstruction scheme of a given order from a scheme cache,
+        solving for it and saving it to the cache if it is missing
+        cache:  defaults to default_scheme_cache()
+        """
+        cache, key, compute = cls._order_lookup(
+            order, reconstruct_here, method, cache
+        )
+        return cls(cache.get_or_compute(key, compute))
+
+    @classmethod
+    def weights_from_order(
+        cls,
+        order: int = 1,
+        reconstruct_here: str = "right",
+        method: str = "lagrange",
+        cache: SchemeCache = None,
+    ) -> tuple:
+        """
+        float64 weights of the scheme of a given order as (first cell index,
+        array), read from the scheme store like construct_from_order
+        """
+        cache, key, compute = cls._order_lookup(
+            order, reconstruct_here, method, cache
+        )
+        return cache.weights(key, compute)
+
+    @classmethod
+    def _order_lookup(cls, order, reconstruct_here, method, cache) -> tuple:
+        """
+        (cache, key, compute) of the scheme of an order
+        """
+        reconstruct_here = normalize_point(reconstruct_here)
+        cache = default_scheme_cache() if cache is None else cache
+        return (
+            cache,
+            ("order", order, reconstruct_here),
+            lambda: cls.compute_from_order(
+                order, reconstruct_here, method
+            ).coeffs,
+        )
 
     def nparray(self):
         """
         convert a reconstruction scheme to an array of weights
         """
-        denoms = [frac.denominator for frac in self.coeffs.values()]
-        denom_lcm = 1
-        for i in denoms:
-            denom_lcm = lcm(denom_lcm, i)
+        denom_lcm = lcm_many(
+            [frac.denominator for frac in self.coeffs.values()]
+        )
         mylist = []
         for i in range(min(self.coeffs.keys()), max(self.coeffs.keys()) + 1):
             if i in self.coeffs.keys():
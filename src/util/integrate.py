@@ -1,50 +1,372 @@
 import dataclasses
 import numpy as np
 import abc
+import functools
+from util.rungekutta import EmbeddedTableau, evaluate, tableaus
+from util.trajectory import TrajectoryWriter
 
 
 @dataclasses.dataclass
 class Integrator:
     """
     for a system with a state vector x and a state derivate xdot = f(x),
-    solve for x at every t given an initial state vector x0
+    solve for x at every t given an initial state vector x0, which may also
+    be a batch of states of any shape
+    an inplace integrator's xdot writes into its out argument, then the
+    Runge-Kutta stages run in persistent buffers and allocate nothing
+    snapshots selects the states that are kept in x
+        None        every step, x is the full x0.shape x len(t) history
+        int k       every k-th step and the last step
+        times       the first step at or after each of the output times
+    the times of the kept states are t_snapshots. with snapshots, only the
+    current state is held while integrating, so memory is O(n) apart from
+    the kept states
+    with a trajectory path, the kept states are written to that file
+    instead, see util.trajectory, and x only holds the latest one
     """
 
-    def __init__(self, x0: np.ndarray, t: np.ndarray):
-        self.x0 = x0
+    inplace = False
+
+    def __init__(
+        self,
+        x0: np.ndarray,
+        t: np.ndarray,
+        snapshots=None,
+        trajectory: str = None,
+    ):
+        self.x0 = np.asarray(x0)
         self.t = t
-        self.x = np.concatenate(
-            (np.array([x0]).T, np.zeros([len(x0), len(t) - 1])), axis=1
+        self.snapshots = snapshots
+        self.trajectory = trajectory
+        self.snapshot_indices = self.select_snapshots(snapshots)
+        self.t_snapshots = np.asarray(t)[self.snapshot_indices]
+        if trajectory is not None and np.ndim(x0) > 1:
+            raise BaseException("Trajectories of a batch are not supported.")
+        n_columns = 1 if trajectory else len(self.snapshot_indices)
+        # x[..., i] is the i-th kept state
+        self.x = self.allocate_history(
+            self.x0.shape + (n_columns,),
+            np.result_type(self.x0.dtype, float),
         )
+        self.x[..., 0] = self.x0
+
+    def allocate_history(self, shape: tuple, dtype) -> np.ndarray:
+        """
+        array of the kept states x, zeros unless a subclass keeps them
+        elsewhere
+        """
+        return np.zeros(shape, dtype=dtype)
+
+    def select_snapshots(self, snapshots) -> np.ndarray:
+        """
+        sorted indices of the steps kept in x, always including step 0
+        """
+        n_steps = len(self.t)
+        if snapshots is None:
+            return np.arange(n_steps)
+        if isinstance(snapshots, (int, np.integer)):
+            if snapshots < 1:
+                raise BaseException("Snapshot interval must be at least 1.")
+            return np.union1d(np.arange(0, n_steps, snapshots), [n_steps - 1])
+        times = np.asarray(snapshots, dtype=float)
+        if np.any(times > self.t[-1]):
+            raise BaseException("Output times must not exceed t[-1].")
+        indices = np.searchsorted(self.t, times, side="left")
+        return np.union1d([0], indices)
 
     @abc.abstractmethod
-    def xdot(self, x: np.ndarray, t_i: float) -> np.ndarray:
+    def xdot(
+        self, x: np.ndarray, t_i: float, out: np.ndarray = None
+    ) -> np.ndarray:
         """
-        the state derivate at a given value of time
+        the state derivate at a given value of time, written into out if
+        given
         """
         pass
 
-    def euler(self):
+    def solve_implicit(
+        self, rhs: np.ndarray, t_i: float, gamma_dt: float, out: np.ndarray
+    ):
         """
-        4th order Runge-Kutta integrator
+        write the y with y = rhs + gamma_dt xdot(y, t_i) into out, the stage
+        equation of an implicit method. subclasses that can solve it support
+        the methods of util.rungekutta.DiagonallyImplicitTableau
+        """
+        raise BaseException(
+            f"{self.__class__.__name__} has no implicit solver."
+        )
+
+    def trajectory_writer(self, path: str) -> TrajectoryWriter:
+        """
+        writer for the kept states, subclasses add their grid and metadata
+        """
+        return TrajectoryWriter(path, self.t_snapshots, len(self.x0))
+
+    def stage_buffers(self, count: int) -> np.ndarray:
+        """
+        persistent (count, *x0.shape) array of stage buffers
+        """
+        stages = getattr(self, "_stages", None)
+        if stages is None or len(stages) < count:
+            stages = np.empty((count,) + np.shape(self.x0))
+            self._stages = stages
+        return stages
+
+    def step_function(self, method: str):
+        """
+        euler and rk4 have their own steps, every other method is run from
+        its tableau in util.rungekutta.tableaus
+        """
+        if method == "euler":
+            return self.euler_step
+        if method == "rk4":
+            return self.rk4_step
+        if method in tableaus:
+            return functools.partial(tableaus[method].step, self)
+        raise BaseException(f"Invalid integration method: {method}")
+
+    def euler_step(
+        self, x: np.ndarray, t_i: float, dt: float, out: np.ndarray
+    ):
+        """
+        write the state one Euler step after x at t_i into out
+        """
+        if not self.inplace:
+            out[:] = x + dt * self.xdot(x, t_i)
+            return
+        k0 = self.stage_buffers(1)[0]
+        self.xdot(x, t_i, out=k0)
+        k0 *= dt
+        np.add(x, k0, out=out)
+
+    def rk4_step(self, x: np.ndarray, t_i: float, dt: float, out: np.ndarray):
         """
+        write the state one 4th order Runge-Kutta step after x at t_i into
+        out
+        """
+        if not self.inplace:
+            k0 = self.xdot(x, t_i)
+            k1 = self.xdot(x + dt * k0 / 2, t_i + dt / 2)
+            k2 = self.xdot(x + dt * k1 / 2, t_i + dt / 2)
+            k3 = self.xdot(x + dt * k2, t_i + dt)
+            out[:] = x + (1 / 6) * (k0 + 2 * k1 + 2 * k2 + k3) * dt
+            return
+        # the operations above in the same order, so results are identical
+        k0, k1, k2, k3, stage = self.stage_buffers(5)[:5]
+        self.xdot(x, t_i, out=k0)
+        np.multiply(k0, dt, out=stage)
+        stage /= 2
+        stage += x
+        self.xdot(stage, t_i + dt / 2, out=k1)
+        np.multiply(k1, dt, out=stage)
+        stage /= 2
+        stage += x
+        self.xdot(stage, t_i + dt / 2, out=k2)
+        np.multiply(k2, dt, out=stage)
+        stage += x
+        self.xdot(stage, t_i + dt, out=k3)
+        k1 *= 2
+        k2 *= 2
+        np.add(k0, k1, out=stage)
+        stage += k2
+        stage += k3
+        stage *= 1 / 6
+        stage *= dt
+        np.add(x, stage, out=out)
+
+    def steps(self, method: str = "rk4"):
+        """
+        generator of (step index, time, state) from x0 at t[0] to t[-1]
+        holding only two state vectors. the yielded state is overwritten by
+        the next step, copy it to keep it
+        """
+        step = self.step_function(method)
+        x = np.array(self.x0, dtype=np.result_type(self.x0.dtype, float))
+        x_next = np.empty_like(x)
+        yield 0, self.t[0], x
         for i in range(len(self.t) - 1):
-            dt = self.t[i + 1] - self.t[i]
-            self.x[:, i + 1] = self.x[:, i] + dt * self.xdot(
-                self.x[:, i], self.t[i]
-            )
+            step(x, self.t[i], self.t[i + 1] - self.t[i], out=x_next)
+            x, x_next = x_next, x
+            yield i + 1, self.t[i + 1], x
+
+    def integrate(self, method: str = "rk4", callback=None):
+        """
+        integrate over t with "euler", "rk4" or a method registered in
+        util.rungekutta.tableaus, e.g. "ssprk3", and keep the selected
+        snapshots in x. callback(step index, time, state) is called on
+        every kept snapshot
+        """
+        if self.snapshots is None and self.trajectory is None:
+            # full history, step from column to column of x
+            step = self.step_function(method)
+            for i in range(len(self.t) - 1):
+                dt = self.t[i + 1] - self.t[i]
+                step(self.x[..., i], self.t[i], dt, out=self.x[..., i + 1])
+            if callback is not None:
+                for i, t_i in enumerate(self.t):
+                    callback(i, t_i, self.x[..., i])
+            return
+        writer = None
+        if self.trajectory is not None:
+            writer = self.trajectory_writer(self.trajectory)
+        try:
+            column = 0
+            for i, t_i, x in self.steps(method):
+                if i != self.snapshot_indices[column]:
+                    continue
+                self.keep_snapshot(column, x, writer)
+                if callback is not None:
+                    callback(i, t_i, x)
+                column += 1
+                if column == len(self.snapshot_indices):
+                    break
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def keep_snapshot(self, column: int, x: np.ndarray, writer):
+        """
+        store the kept state of a column in x, or write it to the trajectory
+        """
+        if writer is None:
+            self.x[..., column] = x
+        else:
+            writer.append(x)
+            self.x[..., 0] = x
 
-    def rk4(self):
+    def max_dt(self, method: str) -> float:
+        """
+        largest stable time step of a method, the ceiling of adaptive steps.
+        unbounded unless a subclass knows the spectrum of its xdot
+        """
+        return np.inf
+
+    def integrate_adaptive(
+        self,
+        method: str = "dp54",
+        rtol: float = 1e-6,
+        atol: float = 1e-9,
+        dt: float = None,
+        callback=None,
+    ):
+        """
+        integrate with an embedded pair such as "bs32" or "dp54", choosing
+        the steps by error control. a step is accepted if the rms norm of
+        its error estimate weighted by atol + rtol |x| is at most 1, and
+        steps never exceed max_dt(method)
+        t only sets the output times: the kept states at t_snapshots are
+        interpolated within the steps by the continuous extension of the
+        method if it has one (4th order for dp54), else by cubic Hermite
+        interpolation
+        the times of the accepted steps are t_steps, step_counts holds the
+        number of accepted and rejected steps. raises if the error estimate
+        is not finite or the step falls below 1e-14 of the time span
+        """
+        tableau = tableaus.get(method)
+        if not isinstance(tableau, EmbeddedTableau):
+            raise BaseException(f"Not an embedded method: {method}")
+        exponent = 1 / (min(tableau.order, tableau.embedded_order) + 1)
+        dt_max = self.max_dt(method)
+        t_outputs = self.t_snapshots
+        t_i, t_end = self.t[0], t_outputs[-1]
+        if dt is None:
+            dt = (t_end - t_i) / 100
+        dt_min = 1e-14 * (t_end - t_i)
+        x = np.array(self.x0, dtype=np.result_type(self.x0.dtype, float))
+        x_new, error, f0, f1 = (np.empty_like(x) for _ in range(4))
+        evaluate(self, x, t_i, f0)
+        self.t_steps = [t_i]
+        self.step_counts = {"accepted": 0, "rejected": 0}
+        writer = None
+        if self.trajectory is not None:
+            writer = self.trajectory_writer(self.trajectory)
+        try:
+            column = 0
+            while column < len(t_outputs) and t_outputs[column] <= t_i:
+                self.keep_snapshot(column, x, writer)
+                if callback is not None:
+                    callback(self.snapshot_indices[column], t_i, x)
+                column += 1
+            while column < len(t_outputs):
+                dt = min(dt, dt_max, t_end - t_i)
+                last_stage = tableau.step_embedded(
+                    self, x, t_i, dt, x_new, error, f0
+                )
+                scale = atol + rtol * np.maximum(np.abs(x), np.abs(x_new))
+                error /= scale
+                error_norm = np.sqrt(np.mean(error**2))
+                if not np.isfinite(error_norm):
+                    raise BaseException(
+                        f"Error estimate is not finite at t = {t_i}."
+                    )
+                if error_norm <= 1:
+                    if tableau.fsal:
+                        f1[...] = last_stage
+                    else:
+                        evaluate(self, x_new, t_i + dt, f1)
+                    t_new = t_i + dt if dt < t_end - t_i else t_end
+                    while column < len(t_outputs) and (
+                        t_outputs[column] <= t_new
+                    ):
+                        t_output = t_outputs[column]
+                        theta = (t_output - t_i) / dt
+                        if tableau.dense:
+                            dense = tableau.dense_output(self, x, dt, theta)
+                        else:
+                            dense = self.hermite(x, x_new, f0, f1, dt, theta)
+                        self.keep_snapshot(column, dense, writer)
+                        if callback is not None:
+                            callback(
+                                self.snapshot_indices[column], t_output, dense
+                            )
+                        column += 1
+                    x, x_new = x_new, x
+                    f0, f1 = f1, f0
+                    t_i = t_new
+                    self.t_steps.append(t_i)
+                    self.step_counts["accepted"] += 1
+                else:
+                    self.step_counts["rejected"] += 1
+                if error_norm == 0:
+                    dt *= 5
+                else:
+                    dt *= min(5, max(0.2, 0.9 * error_norm**-exponent))
+                if error_norm > 1 and dt < dt_min:
+                    raise BaseException(
+                        f"Step size {dt} too small at t = {t_i}."
+                    )
+        finally:
+            if writer is not None:
+                writer.close()
+        self.t_steps = np.array(self.t_steps)
+
+    @staticmethod
+    def hermite(
+        x0: np.ndarray,
+        x1: np.ndarray,
+        f0: np.ndarray,
+        f1: np.ndarray,
+        dt: float,
+        theta: float,
+    ) -> np.ndarray:
+        """
+        cubic Hermite interpolant at t0 + theta dt of a step from x0 to x1
+        with derivatives f0 and f1
+        """
+        h00 = (1 + 2 * theta) * (1 - theta) ** 2
+        h10 = theta * (1 - theta) ** 2
+        h01 = theta**2 * (3 - 2 * theta)
+        h11 = theta**2 * (theta - 1)
+        return h00 * x0 + h01 * x1 + (h10 * dt) * f0 + (h11 * dt) * f1
+
+    def euler(self, callback=None):
+        """
+        1st order Euler integrator
+        """
+        self.integrate("euler", callback)
+
+    def rk4(self, callback=None):
         """
         4th order Runge-Kutta integrator
         """
-        for i in range(len(self.t) - 1):
-            dt = self.t[i + 1] - self.t[i]
-
-            k0 = self.xdot(self.x[:, i], self.t[i])
-            k1 = self.xdot(self.x[:, i] + dt * k0 / 2, self.t[i] + dt / 2)
-            k2 = self.xdot(self.x[:, i] + dt * k1 / 2, self.t[i] + dt / 2)
-            k3 = self.xdot(self.x[:, i] + dt * k2, self.t[i] + dt)
-            self.x[:, i + 1] = (
-                self.x[:, i] + (1 / 6) * (k0 + 2 * k1 + 2 * k2 + k3) * dt
-            )
+        self.integrate("rk4", callback)
@@ -0,0 +1,161 @@
+import fractions
+import numpy as np
+
+
+def solve_exact(matrix: list, rhs: list) -> list:
+    """
+    solve the square system matrix @ x = rhs with exact rational arithmetic
+    matrix: list of rows of ints/fractions
+    rhs:    list of ints/fractions
+    returns x as a list of fractions.Fraction
+    """
+    size = len(matrix)
+    if any(len(row) != size for row in matrix) or len(rhs) != size:
+        raise BaseException("Matrix must be square and match the rhs.")
+    # augmented matrix of exact rationals
+    aug = [
+        [fractions.Fraction(entry) for entry in row]
+        + [fractions.Fraction(rhs[i])]
+        for i, row in enumerate(matrix)
+    ]
+    # forward elimination, pivoting on the first nonzero entry
+    for col in range(size):
+        pivot = next((r for r in range(col, size) if aug[r][col] != 0), None)
+        if pivot is None:
+            raise BaseException("Singular matrix.")
+        if pivot != col:
+            aug[col], aug[pivot] = aug[pivot], aug[col]
+        pivot_row = aug[col]
+        pivot_value = pivot_row[col]
+        for r in range(col + 1, size):
+            row = aug[r]
+            if row[col] == 0:
+                continue
+            factor = row[col] / pivot_value
+            for c in range(col, size + 1):
+                row[c] -= factor * pivot_row[c]
+    # back substitution
+    x = [fractions.Fraction(0)] * size
+    for r in range(size - 1, -1, -1):
+        row = aug[r]
+        acc = row[size]
+        for c in range(r + 1, size):
+            acc -= row[c] * x[c]
+        x[r] = acc / row[r]
+    return x
+
+
+class BandedLU:
+    """
+    LU factorization of a stack of banded matrices, computed once and
+    reused for every solve
+    bands:  (batch, n, 2 p + 1) array, bands[b, i, p + m] is the entry of
+            matrix b in row i and column i + m, entries outside the matrix
+            are ignored
+    the rows are grouped into blocks of block_size >= p cells, so the
+    matrix is block tridiagonal, and factored by block elimination
+        S_0 = D_0,  S_i = D_i - L_i S_i-1^-1 U_i-1
+    the inverses of the Schur complements S_i are computed by LAPACK with
+    partial pivoting within each block, there is no pivoting across blocks
+    a solve is then O(n block_size) with a loop over n / block_size blocks
+    """
+
+    def __init__(self, bands: np.ndarray, block_size: int = 32):
+        batch, n, width = bands.shape
+        p = (width - 1) // 2
+        b = min(max(p, block_size), n)
+        blocks = -(-n // b)
+        self.n, self.p, self.b, self.blocks = n, p, b, blocks
+        # row i as a strip over the blocks I - 1, I, I + 1, I = i // b,
+        # rows past n are identity rows
+        strip = np.zeros((batch, blocks * b, 3 * b))
+        rows = np.arange(n)[:, np.newaxis]
+        columns = rows + np.arange(-p, p + 1)
+        inside = (columns >= 0) & (columns < n)
+        positions = columns - (rows // b - 1) * b
+        row_index = np.broadcast_to(rows, columns.shape)[inside]
+        strip[:, row_index, positions[inside]] = bands[:, inside]
+        padding = np.arange(n, blocks * b)
+        strip[:, padding, padding % b + b] = 1
+        strip = strip.reshape(batch, blocks, b, 3 * b)
+        end = 2 * b
+        self.lower = strip[..., :b]
+        diagonal = strip[..., b:end]
+        self.upper = strip[..., end:]
+        inverses = np.empty((batch, blocks, b, b))
+        factors = np.zeros((batch, blocks, b, b))
+        try:
+            inverses[:, 0] = np.linalg.inv(diagonal[:, 0])
+            for i in range(1, blocks):
+                factors[:, i] = self.lower[:, i] @ inverses[:, i - 1]
+                schur = diagonal[:, i] - factors[:, i] @ self.upper[:, i - 1]
+                inverses[:, i] = np.linalg.inv(schur)
+        except np.linalg.LinAlgError:
+            raise BaseException("Singular matrix.")
+        self.inverses, self.factors = inverses, factors
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """
+        solution of the (batch, n, columns) right-hand sides
+        """
+        n, b, blocks = self.n, self.b, self.blocks
+        y = np.zeros((rhs.shape[0], blocks * b) + rhs.shape[2:])
+        y[:, :n] = rhs
+        y = y.reshape((rhs.shape[0], blocks, b) + rhs.shape[2:])
+        for i in range(1, blocks):
+            y[:, i] -= self.factors[:, i] @ y[:, i - 1]
+        y[:, -1] = self.inverses[:, -1] @ y[:, -1]
+        for i in range(blocks - 2, -1, -1):
+            y[:, i] -= self.upper[:, i] @ y[:, i + 1]
+            y[:, i] = self.inverses[:, i] @ y[:, i]
+        return y.reshape((rhs.shape[0], blocks * b) + rhs.shape[2:])[:, :n]
+
+
+class CyclicBandedLU:
+    """
+    solver of a stack of cyclic banded matrices, banded apart from the
+    corner blocks that wrap the band around as on a periodic grid
+    bands:  (batch, n, 2 p + 1) array, bands[b, i, p + m] is the entry of
+            matrix b in row i and column (i + m) mod n, n > 2 p
+    the matrix is the banded matrix A without the corners plus the corners
+    U W, U selecting the first and last p rows. A is factored by BandedLU
+    and the corners are handled by the Woodbury identity
+        M^-1 b = A^-1 b - Z (I + W Z)^-1 W A^-1 b,  Z = A^-1 U
+    with Z and the 2 p x 2 p capacitance matrix computed once
+    """
+
+    def __init__(self, bands: np.ndarray, block_size: int = 32):
+        batch, n, width = bands.shape
+        p = (width - 1) // 2
+        if n <= 2 * p:
+            raise BaseException("Matrix is smaller than its band.")
+        self.n, self.p = n, p
+        self.banded = BandedLU(bands, block_size)
+        # the rows with corner entries and the columns they reach
+        self.rows = np.concatenate((np.arange(p), np.arange(n - p, n)))
+        corner = np.zeros((batch, 2 * p, 2 * p))
+        for q, i in enumerate(self.rows):
+            for m in range(-p, p + 1):
+                if 0 <= i + m < n:
+                    continue
+                column = (i + m) % n
+                # position of the column in self.rows
+                position = column if column < p else column - n + 2 * p
+                corner[:, q, position] += bands[:, i, p + m]
+        self.corner = corner
+        selection = np.zeros((batch, n, 2 * p))
+        selection[:, self.rows, np.arange(2 * p)] = 1
+        self.z = self.banded.solve(selection)
+        capacitance = np.eye(2 * p) + corner @ self.z[:, self.rows]
+        self.capacitance_inverse = np.linalg.inv(capacitance)
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """
+        solution of the (batch, n, columns) right-hand sides
+        """
+        y = self.banded.solve(rhs)
+        if self.p == 0:
+            return y
+        correction = self.capacitance_inverse @ (self.corner @ y[:, self.rows])
+        y -= self.z @ correction
+        return y
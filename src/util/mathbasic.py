@@ -1,4 +1,33 @@
-import dataclasses
+import fractions
+import math
+import numbers
+import operator
+import sys
+
+
+def gcd_many(mylist: list[int]) -> int:
+    """
+    returns the nonnegative gcd of a list of integers, reducing pairwise with
+    Euclid's algorithm and stopping as soon as the running gcd reaches 1
+    """
+    result = 0
+    for i in mylist:
+        result = math.gcd(result, i)
+        if result == 1:
+            break
+    return result
+
+
+def lcm_many(mylist: list[int]) -> int:
+    """
+    returns the nonnegative lcm of a list of integers
+    """
+    result = 1
+    for i in mylist:
+        if i == 0:
+            return 0
+        result = result // math.gcd(result, i) * abs(i)
+    return result
 
 
 def gcf(mylist: list[int]) -> int:
@@ -9,11 +38,7 @@ def gcf(mylist: list[int]) -> int:
         if 0 in mylist:
             raise BaseException("0 has no greatest factor.")
         else:
-            cf = 1
-            for i in range(2, min(abs(j) for j in mylist) + 1):
-                if all(abs(k) % i == 0 for k in mylist):
-                    cf = i
-            return cf
+            return gcd_many(mylist)
     raise TypeError("Input is not a list of integers.")
 
 
@@ -26,38 +51,124 @@ def lcm(a: int, b: int) -> int:
     raise TypeError("Input is not a pair of integers.")
 
 
-@dataclasses.dataclass
+def _as_pair(other) -> tuple:
+    """
+    returns (numerator, denominator) of an int or rational, or None
+    """
+    if isinstance(other, Fraction):
+        return other._numerator, other._denominator
+    elif isinstance(other, int):
+        return other, 1
+    elif isinstance(other, fractions.Fraction):
+        return other.numerator, other.denominator
+    return None
+
+
+# results whose denominator would be longer are computed from reduced
+# operands and come out reduced
+reduce_bits = 64
+
+
 class Fraction:
-    numerator: int
-    denominator: int
+    """
+    immutable rational number numerator/denominator
+    the denominator is kept positive, but arithmetic results are not reduced
+    until their numerator, denominator, hash, string or an ordering is
+    requested. results whose denominator would pass reduce_bits bits are
+    computed from the reduced operands with the gcd of their denominators
+    (Knuth, TAOCP 4.5.1) and are reduced, which bounds the operands of
+    chained arithmetic. 0, 1, -1, 1/2 and -1/2 are interned
+    """
+
+    __slots__ = ("_numerator", "_denominator", "_reduced")
+    _interned = {}
 
-    def __post_init__(self):
-        if not isinstance(self.numerator, int) or not isinstance(
-            self.denominator, int
-        ):
+    def __new__(cls, numerator: int, denominator: int = 1):
+        if not isinstance(numerator, int) or not isinstance(denominator, int):
             raise TypeError("Input is not an int tuple.")
-        if self.denominator == 0:
+        if denominator == 0:
             raise BaseException("Invalid case: zero denominator.")
-        if (self.numerator, self.denominator) == (
-            0,
-            1,
-        ):  # zero instance, do nothing
-            pass
-        elif self.numerator == 0 and self.denominator != 1:
-            # if the numerator is zero, assign the zero instance
-            object.__setattr__(self, "numerator", 0)
-            object.__setattr__(self, "denominator", 1)
-        else:  # reduce fraction if possible
-            factor = gcf([self.numerator, self.denominator])
-            if factor > 1:
-                object.__setattr__(self, "numerator", self.numerator // factor)
-                object.__setattr__(
-                    self, "denominator", self.denominator // factor
-                )
-            # move negative sign from denominator
-            if self.denominator < 0:
-                object.__setattr__(self, "numerator", -self.numerator)
-                object.__setattr__(self, "denominator", abs(self.denominator))
+        interned = cls._interned.get((numerator, denominator))
+        if interned is not None:
+            return interned
+        if denominator < 0:  # move negative sign from denominator
+            numerator, denominator = -numerator, -denominator
+        return cls._raw(numerator, denominator)
+
+    @classmethod
+    def _raw(cls, numerator: int, denominator: int):
+        """
+        construct without checks from an int pair with denominator > 0
+        """
+        self = object.__new__(cls)
+        object.__setattr__(self, "_numerator", numerator)
+        object.__setattr__(self, "_denominator", denominator)
+        object.__setattr__(self, "_reduced", denominator == 1)
+        return self
+
+    @classmethod
+    def _reduced_raw(cls, numerator: int, denominator: int):
+        """
+        _raw of an int pair known to be reduced
+        """
+        self = cls._raw(numerator, denominator)
+        object.__setattr__(self, "_reduced", True)
+        return self
+
+    def _reduced_pairs(self, other) -> tuple:
+        """
+        reduced (numerator, denominator) pairs of self and other
+        """
+        if not self._reduced:
+            self._reduce()
+        if isinstance(other, Fraction) and not other._reduced:
+            other._reduce()
+        return (self._numerator, self._denominator), _as_pair(other)
+
+    @staticmethod
+    def _long(denominator: int, other_denominator: int) -> bool:
+        """
+        whether the product of two denominators passes reduce_bits bits
+        """
+        return (
+            denominator.bit_length() + other_denominator.bit_length()
+            > reduce_bits
+        )
+
+    def _reduce(self):
+        factor = math.gcd(self._numerator, self._denominator)
+        if factor > 1:
+            object.__setattr__(self, "_numerator", self._numerator // factor)
+            object.__setattr__(
+                self, "_denominator", self._denominator // factor
+            )
+        object.__setattr__(self, "_reduced", True)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable.")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        return (self.__class__, (self.numerator, self.denominator))
+
+    @property
+    def numerator(self) -> int:
+        if not self._reduced:
+            self._reduce()
+        return self._numerator
+
+    @property
+    def denominator(self) -> int:
+        if not self._reduced:
+            self._reduce()
+        return self._denominator
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(numerator={self.numerator}, "
+            f"denominator={self.denominator})"
+        )
 
     def __str__(self):
         if self.numerator == 1 and self.denominator == 1:
@@ -71,44 +182,218 @@ class Fraction:
     def zero(cls):
         return cls(0, 1)
 
+    def __eq__(self, other):
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        return self._numerator * pair[1] == pair[0] * self._denominator
+
+    def __hash__(self):
+        """
+        matches the hash of an equal int or fractions.Fraction
+        """
+        numerator, denominator = self.numerator, self.denominator
+        if denominator == 1:
+            return hash(numerator)
+        modulus = sys.hash_info.modulus
+        try:
+            inverse = pow(denominator, -1, modulus)
+        except ValueError:  # denominator is divisible by the modulus
+            result = sys.hash_info.inf
+        else:
+            result = hash(abs(numerator)) * inverse % modulus
+        result = result if numerator >= 0 else -result
+        return -2 if result == -1 else result
+
+    def _compare(self, other, op):
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        return op(self._numerator * pair[1], pair[0] * self._denominator)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __bool__(self):
+        return self._numerator != 0
+
+    def __float__(self):
+        return self._numerator / self._denominator
+
+    def __abs__(self):
+        return self._raw(abs(self._numerator), self._denominator)
+
+    def __pos__(self):
+        return self
+
+    def __trunc__(self) -> int:
+        if self._numerator < 0:
+            return -(-self._numerator // self._denominator)
+        return self._numerator // self._denominator
+
+    __int__ = __trunc__
+
+    def __floor__(self) -> int:
+        return self._numerator // self._denominator
+
+    def __ceil__(self) -> int:
+        return -(-self._numerator // self._denominator)
+
+    def __round__(self, ndigits: int = None):
+        """
+        nearest int, ties to even, or the nearest Fraction with ndigits
+        decimal digits
+        """
+        if ndigits is None:
+            floor, remainder = divmod(self._numerator, self._denominator)
+            if 2 * remainder < self._denominator:
+                return floor
+            if 2 * remainder > self._denominator:
+                return floor + 1
+            return floor + floor % 2
+        shift = 10 ** abs(ndigits)
+        if ndigits > 0:
+            return self.__class__(round(self * shift), shift)
+        return self.__class__(round(self / shift) * shift)
+
     def __add__(self, other):
-        denominator = lcm(self.denominator, other.denominator)
-        numerator = (self.numerator * (denominator // self.denominator)) + (
-            other.numerator * (denominator // other.denominator)
-        )
-        return self.__class__(numerator, denominator)
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        numerator, denominator = pair
+        if denominator == self._denominator:
+            return self._raw(self._numerator + numerator, denominator)
+        if not self._long(self._denominator, denominator):
+            return self._raw(
+                self._numerator * denominator + numerator * self._denominator,
+                self._denominator * denominator,
+            )
+        (n1, d1), (n2, d2) = self._reduced_pairs(other)
+        factor = math.gcd(d1, d2)
+        if factor == 1:
+            return self._reduced_raw(n1 * d2 + n2 * d1, d1 * d2)
+        d1 //= factor
+        numerator = n1 * (d2 // factor) + n2 * d1
+        common = math.gcd(numerator, factor)
+        return self._reduced_raw(numerator // common, d1 * (d2 // common))
+
+    __radd__ = __add__
 
     def __neg__(self):
-        return self.__class__(-self.numerator, self.denominator)
+        return self._raw(-self._numerator, self._denominator)
 
     def __sub__(self, other):
-        return self + -other
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        return self + self._raw(-pair[0], pair[1])
+
+    def __rsub__(self, other):
+        return -self + other
 
     def __mul__(self, other):
-        if isinstance(other, Fraction):
-            return self.__class__(
-                self.numerator * other.numerator,
-                self.denominator * other.denominator,
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        if not self._long(self._denominator, pair[1]):
+            return self._raw(
+                self._numerator * pair[0], self._denominator * pair[1]
             )
-        elif isinstance(other, int):
-            return self.__class__(other * self.numerator, self.denominator)
-        TypeError(
-            f"Illegal multiplication between types {self.__class__.__name__}"
-            f" and {other.__class__.__name__}."
-        )
+        (n1, d1), (n2, d2) = self._reduced_pairs(other)
+        return self._product(n1, d1, n2, d2)
+
+    @classmethod
+    def _product(cls, n1: int, d1: int, n2: int, d2: int):
+        """
+        reduced product of two reduced fractions, d1 and d2 nonzero
+        """
+        first = math.gcd(n1, d2)
+        second = math.gcd(n2, d1)
+        numerator = (n1 // first) * (n2 // second)
+        denominator = (d1 // second) * (d2 // first)
+        if denominator < 0:
+            numerator, denominator = -numerator, -denominator
+        return cls._reduced_raw(numerator, denominator)
 
     __rmul__ = __mul__
 
     def __truediv__(self, other):
-        if isinstance(other, Fraction):
-            return self.__class__(
-                self.numerator * other.denominator,
-                self.denominator * other.numerator,
-            )
-        elif isinstance(other, int):
-            return self.__class__(self.numerator, other * self.denominator)
-        else:
-            TypeError(
-                f"Illegal division between types {self.__class__.__name__}"
-                f" and {other.__class__.__name__}."
-            )
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        if pair[0] == 0:
+            raise BaseException("Invalid case: zero denominator.")
+        if self._long(self._denominator, pair[0]):
+            (n1, d1), (n2, d2) = self._reduced_pairs(other)
+            return self._product(n1, d1, d2, n2)
+        numerator = self._numerator * pair[1]
+        denominator = self._denominator * pair[0]
+        if denominator < 0:
+            numerator, denominator = -numerator, -denominator
+        return self._raw(numerator, denominator)
+
+    def __rtruediv__(self, other):
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        return self._raw(pair[0], pair[1]) / self
+
+    def __floordiv__(self, other):
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        if pair[0] == 0:
+            raise BaseException("Invalid case: zero denominator.")
+        return (self._numerator * pair[1]) // (self._denominator * pair[0])
+
+    def __rfloordiv__(self, other):
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        return self._raw(pair[0], pair[1]) // self
+
+    def __mod__(self, other):
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        if pair[0] == 0:
+            raise BaseException("Invalid case: zero denominator.")
+        return self._raw(
+            (self._numerator * pair[1]) % (self._denominator * pair[0]),
+            self._denominator * pair[1],
+        )
+
+    def __rmod__(self, other):
+        pair = _as_pair(other)
+        if pair is None:
+            return NotImplemented
+        return self._raw(pair[0], pair[1]) % self
+
+    def __divmod__(self, other):
+        quotient = self.__floordiv__(other)
+        if quotient is NotImplemented:
+            return NotImplemented
+        return quotient, self % other
+
+    def __pow__(self, other: int):
+        if not isinstance(other, int):
+            return NotImplemented
+        if other < 0:
+            return 1 / self ** (-other)
+        return self._raw(self._numerator**other, self._denominator**other)
+
+
+numbers.Rational.register(Fraction)
+Fraction._interned.update(
+    (pair, Fraction._raw(*pair))
+    for pair in [(0, 1), (1, 1), (-1, 1), (1, 2), (-1, 2)]
+)
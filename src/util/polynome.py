@@ -1,8 +1,54 @@
 import dataclasses
-from util.mathbasic import gcf, lcm, Fraction
+import fractions
+import numpy as np
+from util.mathbasic import gcd_many, lcm, Fraction
 from util.lincom import LinearCombination
 
 
+def horner(coeffs: list, x):
+    """
+    evaluate the polynomial with coefficients coeffs (highest degree first)
+    at x using Horner's rule
+    """
+    result = coeffs[0]
+    for coeff in coeffs[1:]:
+        result = result * x + coeff
+    return result
+
+
+def horner_many(coeffs: list, points, denominator: int = 1):
+    """
+    evaluate (polynomial with integer coefficients coeffs, highest degree
+    first) / denominator at many points
+    integer or rational points return a list of exact Fractions, float points
+    return a float64 array computed with one vectorized Horner pass
+    """
+    points = np.asarray(points)
+    if points.dtype.kind == "O" and any(
+        isinstance(x, (float, np.floating)) for x in points.flat
+    ):
+        points = points.astype(np.float64)
+    if points.dtype.kind == "f":
+        result = np.full(points.shape, coeffs[0] / denominator)
+        for coeff in coeffs[1:]:
+            result *= points
+            result += coeff / denominator
+        return result
+    values = []
+    for x in points.flat:
+        if isinstance(x, (fractions.Fraction, Fraction)):
+            # homogeneous Horner: q^n p(r/q) = sum_i c_i r^(n-i) q^i
+            numerator, scale = int(x.numerator), 1
+            result = coeffs[0]
+            for coeff in coeffs[1:]:
+                scale *= int(x.denominator)
+                result = result * numerator + coeff * scale
+            values.append(Fraction(result, scale * denominator))
+        else:
+            values.append(Fraction(horner(coeffs, int(x)), denominator))
+    return values
+
+
 @dataclasses.dataclass
 class Polynome(LinearCombination):
     """
@@ -116,9 +162,24 @@ class Polynome(LinearCombination):
 
     def eval(self, x: float) -> float:
         """
-        returns p(x) as an int/float
+        returns p(x) as an int/float using Horner's rule
+        """
+        return horner(self.dense_coeffs(), x)
+
+    def eval_many(self, points):
+        """
+        returns p(x) at every x in points, see horner_many
+        """
+        return horner_many(self.dense_coeffs(), points)
+
+    def dense_coeffs(self) -> list:
+        """
+        list of all coefficients, highest degree first
         """
-        return sum([coeff * x**deg for deg, coeff in self.coeffs.items()])
+        return [
+            self.coeffs.get(deg, 0)
+            for deg in range(max(self.coeffs.keys()), -1, -1)
+        ]
 
 
 @dataclasses.dataclass
@@ -164,7 +225,7 @@ class Lagrange(Polynome):
                 new_numerator = self.numerator
                 new_denominator = self.denominator
             # factor gcf out of numerator and denominator if it is > 1
-            gcf_fraction = gcf(
+            gcf_fraction = gcd_many(
                 list(new_numerator.coeffs.values()) + [new_denominator]
             )
             if gcf_fraction > 1:
@@ -225,3 +286,257 @@ class Lagrange(Polynome):
             return Fraction(self.numerator.eval(x), self.denominator)
         else:
             raise BaseException("Invalid division type.")
+
+    def eval_many(self, points):
+        """
+        returns the polynomial fraction at every x in points, as exact
+        Fractions for integer or rational points and as a float64 array for
+        float points
+        """
+        return horner_many(
+            self.numerator.dense_coeffs(), points, self.denominator
+        )
+
+
+@dataclasses.dataclass
+class DensePolynome:
+    """
+    express a polynomial
+    a_0 + a_1*x + a_2*x^2 + ... + a_n*x^n
+    as a contiguous list, lowest degree first
+    [a_0, a_1, a_2, ..., a_n]
+    drop-in for Polynome where multiplication is a convolution
+    """
+
+    array: list[int]
+
+    def __post_init__(self):
+        """
+        trailing zeros are removed, the zero instance is [0]
+        """
+        array = list(self.array)
+        while len(array) > 1 and array[-1] == 0:
+            array.pop()
+        object.__setattr__(self, "array", array if array else [0])
+
+    @classmethod
+    def from_polynome(cls, polynome: Polynome):
+        array = [0] * (max(polynome.coeffs.keys()) + 1)
+        for deg, coeff in polynome.coeffs.items():
+            array[deg] = coeff
+        return cls(array)
+
+    @property
+    def coeffs(self) -> dict:
+        """
+        the Polynome dictionary {n: a, n-1: b, ...}
+        """
+        return Polynome(dict(enumerate(self.array))).coeffs
+
+    @property
+    def degree(self) -> int:
+        return len(self.array) - 1
+
+    def __str__(self):
+        return str(Polynome(self.coeffs))
+
+    @classmethod
+    def zero(cls):
+        return cls([0])
+
+    @classmethod
+    def one(cls):
+        return cls([1])
+
+    def __add__(self, other):
+        if len(self.array) < len(other.array):
+            self, other = other, self
+        array = list(self.array)
+        for deg, coeff in enumerate(other.array):
+            array[deg] += coeff
+        return self.__class__(array)
+
+    def __iadd__(self, other):
+        """
+        accumulate other into self without building a new list
+        """
+        array = self.array
+        if len(array) < len(other.array):
+            array.extend([0] * (len(other.array) - len(array)))
+        for deg, coeff in enumerate(other.array):
+            array[deg] += coeff
+        while len(array) > 1 and array[-1] == 0:
+            array.pop()
+        return self
+
+    def __neg__(self):
+        return self.__class__([-coeff for coeff in self.array])
+
+    def __sub__(self, other):
+        return self + -other
+
+    def __mul__(self, other):
+        if isinstance(other, self.__class__):
+            product = [0] * (len(self.array) + len(other.array) - 1)
+            for i, a in enumerate(self.array):
+                if a == 0:
+                    continue
+                for j, b in enumerate(other.array):
+                    product[i + j] += a * b
+            return self.__class__(product)
+        elif isinstance(other, int):
+            return self.__class__([other * coeff for coeff in self.array])
+        raise TypeError(
+            f"Cannot multiply a {self.__class__.__name__} with"
+            + f"a {type(other)}"
+        )
+
+    __rmul__ = __mul__
+
+    def mul_linear(self, root: int):
+        """
+        multiply self by (x - root) in place in O(n)
+        """
+        array = self.array
+        if len(array) == 1 and array[0] == 0:  # zero stays [0]
+            return self
+        array.append(0)
+        for deg in range(len(array) - 1, 0, -1):
+            array[deg] = array[deg - 1] - root * array[deg]
+        array[0] = -root * array[0]
+        return self
+
+    def __floordiv__(self, other: int):
+        if isinstance(other, int):
+            if other == 0:
+                raise BaseException(
+                    f"Cannot divide a {self.__class__.__name__} by 0."
+                )
+            return self.__class__([coeff // other for coeff in self.array])
+        else:
+            raise TypeError(
+                f"Cannot divide a {self.__class__.__name__} by a {type(other)}"
+            )
+
+    def prime(self):
+        """
+        returns the first derivative of a polynomial
+        """
+        return self.__class__(
+            [deg * coeff for deg, coeff in enumerate(self.array)][1:]
+        )
+
+    def eval(self, x: float) -> float:
+        """
+        returns p(x) as an int/float using Horner's rule
+        """
+        return horner(self.array[::-1], x)
+
+    def eval_many(self, points):
+        """
+        returns p(x) at every x in points, see horner_many
+        """
+        return horner_many(self.array[::-1], points)
+
+
+@dataclasses.dataclass
+class DenseLagrange:
+    """
+    DenseLagrange() := DensePolynome()/int
+    drop-in for Lagrange backed by a DensePolynome numerator
+    """
+
+    array: list[int]
+    denominator: int
+
+    def __post_init__(self):
+        """
+        denominator should not be negative or zero. gcf of numerator and
+        denominator should be factored out of both when applicable
+        """
+        numerator = DensePolynome(self.array)
+        if not isinstance(self.denominator, int):
+            raise BaseException("Invalid denominator type.")
+        if self.denominator == 0:
+            raise BaseException("Lagrange instance with 0 denominator.")
+        denominator = self.denominator
+        if denominator < 0:
+            numerator = -numerator
+            denominator = -denominator
+        if denominator != 1 and numerator != DensePolynome.zero():
+            factor = gcd_many(numerator.array + [denominator])
+            if factor > 1:
+                numerator = numerator // factor
+                denominator = denominator // factor
+        object.__setattr__(self, "array", numerator.array)
+        object.__setattr__(self, "denominator", denominator)
+
+    @property
+    def numerator(self) -> DensePolynome:
+        return DensePolynome(self.array)
+
+    @property
+    def coeffs(self) -> dict:
+        return self.numerator.coeffs
+
+    def __str__(self):
+        return f"({self.numerator})/{self.denominator}"
+
+    @classmethod
+    def from_lagrange(cls, lagrange: Lagrange):
+        return cls(
+            DensePolynome.from_polynome(lagrange.numerator).array,
+            lagrange.denominator,
+        )
+
+    @classmethod
+    def Lagrange_i(cls, x_values: list[int], i: int):
+        """
+        find the ith Lagrange polynomial from a set of x points
+        """
+        numerator = DensePolynome.one()
+        denominator = 1
+        for j in range(len(x_values)):
+            if j != i:
+                numerator.mul_linear(x_values[j])
+                denominator *= x_values[i] - x_values[j]
+        return cls(numerator.array, denominator)
+
+    def zero(self):
+        return self.__class__([0], self.denominator)
+
+    def __add__(self, other):
+        denominator = lcm(self.denominator, other.denominator)
+        numerator = self.numerator * (denominator // self.denominator)
+        numerator += other.numerator * (denominator // other.denominator)
+        return self.__class__(numerator.array, denominator)
+
+    def __neg__(self):
+        return self.__class__([-i for i in self.array], self.denominator)
+
+    def __sub__(self, other):
+        return self + -other
+
+    def prime(self):
+        return self.__class__(self.numerator.prime().array, self.denominator)
+
+    def eval(self, x: float, div: str = "true") -> float:
+        """
+        returns the result of the polynomial fraction evaluated at x
+        """
+        if div == "true":
+            return self.numerator.eval(x) / self.denominator
+        elif div == "floor":
+            return self.numerator.eval(x) // self.denominator
+        elif div == "fraction":
+            return Fraction(self.numerator.eval(x), self.denominator)
+        else:
+            raise BaseException("Invalid division type.")
+
+    def eval_many(self, points):
+        """
+        returns the polynomial fraction at every x in points, as exact
+        Fractions for integer or rational points and as a float64 array for
+        float points
+        """
+        return horner_many(self.array[::-1], points, self.denominator)
@@ -0,0 +1,692 @@
+import abc
+import dataclasses
+import fractions
+import json
+import numpy as np
+
+
+def evaluate(integrator, x: np.ndarray, t_i: float, out: np.ndarray):
+    """
+    write integrator.xdot(x, t_i) into out
+    """
+    if integrator.inplace:
+        integrator.xdot(x, t_i, out=out)
+    else:
+        out[...] = integrator.xdot(x, t_i)
+
+
+class _LinearTestProblem:
+    """
+    u' = z u for a state u given by its polynomial coefficients in z, so one
+    step of length 1 from u = 1 gives the stability polynomial R(z)
+    """
+
+    inplace = True
+
+    def __init__(self, degree: int):
+        self.degree = degree
+
+    def xdot(self, x: np.ndarray, t_i: float, out: np.ndarray = None):
+        shifted = np.concatenate(([0], x[:-1]))
+        out[...] = shifted
+        return out
+
+    def stage_buffers(self, count: int) -> np.ndarray:
+        return np.zeros((count, self.degree + 1))
+
+
+class RungeKuttaTableau(abc.ABC):
+    """
+    a Runge-Kutta method, the step runs on an Integrator and takes its
+    stage vectors from integrator.stage_buffers
+    registers is the number of state-sized vectors a step holds besides the
+    state x and the next state out
+    """
+
+    name: str
+    order: int
+    ssp_coefficient: float  # 0 for methods that are not SSP
+
+    @property
+    @abc.abstractmethod
+    def stages(self) -> int:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def registers(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def step(
+        self,
+        integrator,
+        x: np.ndarray,
+        t_i: float,
+        dt: float,
+        out: np.ndarray,
+    ):
+        """
+        write the state one step of length dt after x at t_i into out
+        """
+        pass
+
+    def stability_polynomial(self) -> np.ndarray:
+        """
+        coefficients of R(z), lowest degree first, such that one step of
+        u' = lambda u multiplies u by R(lambda dt)
+        """
+        problem = _LinearTestProblem(self.stages)
+        x = np.zeros(self.stages + 1)
+        x[0] = 1
+        out = np.zeros(self.stages + 1)
+        self.step(problem, x, 0, 1, out)
+        return out
+
+    def stability_function(self, z) -> np.ndarray:
+        """
+        R(z) at each z
+        """
+        return np.polynomial.Polynomial(self.stability_polynomial())(z)
+
+    def stability_limit(self, direction=-1) -> float:
+        """
+        largest r such that |R(s direction)| <= 1 for all 0 <= s <= r, e.g.
+        direction -1 for the negative real axis and 1j for the imaginary
+        axis. for an array of directions, such as the Fourier symbol of a
+        spatial operator, all of them have to be stable
+        the rays are scanned in steps of 0.01 and the first crossing is
+        refined by bisection
+        """
+        directions = np.ravel(direction)
+        tolerance = 1e-14
+
+        def stable(radii):
+            values = self.stability_function(
+                np.multiply.outer(radii, directions)
+            )
+            return np.max(np.abs(values), axis=-1) <= 1 + tolerance
+
+        step = 1e-2
+        block = 256
+        last = 4 * self.stages + 4
+        for first in range(0, int(last / step), block):
+            radii = (first + np.arange(block)) * step
+            unstable = np.flatnonzero(~stable(radii))
+            if len(unstable) == 0:
+                continue
+            index = first + unstable[0]
+            if index <= 1:
+                # unstable arbitrarily close to 0
+                return 0.0
+            low, high = (index - 1) * step, index * step
+            for _ in range(40):
+                middle = (low + high) / 2
+                if stable(np.array([middle]))[0]:
+                    low = middle
+                else:
+                    high = middle
+            return float(low)
+        return float(last)
+
+
+@dataclasses.dataclass
+class ButcherTableau(RungeKuttaTableau):
+    """
+    explicit method with a strictly lower triangular a, weights b and nodes
+    c. holds every stage derivative, registers = stages + 1
+    """
+
+    name: str
+    a: list
+    b: list
+    c: list
+    order: int
+    ssp_coefficient: float = 0.0
+
+    @property
+    def stages(self) -> int:
+        return len(self.b)
+
+    @property
+    def registers(self) -> int:
+        return self.stages + 1
+
+    def step(self, integrator, x, t_i, dt, out):
+        s = self.stages
+        buffers = integrator.stage_buffers(s + 1)
+        k, stage = buffers[:s], buffers[s]
+        for i in range(s):
+            stage[...] = x
+            for j in range(i):
+                if self.a[i][j] != 0:
+                    # out is free until the end of the step
+                    np.multiply(k[j], dt * self.a[i][j], out=out)
+                    stage += out
+            evaluate(integrator, stage, t_i + self.c[i] * dt, k[i])
+        out[...] = x
+        for i in range(s):
+            if self.b[i] != 0:
+                np.multiply(k[i], dt * self.b[i], out=stage)
+                out += stage
+
+
+@dataclasses.dataclass
+class EmbeddedTableau(ButcherTableau):
+    """
+    Butcher tableau with a second set of weights b_hat of embedded_order,
+    the difference of the two solutions estimates the local error. step()
+    advances with b
+    the method is first same as last (FSAL) if its last stage is the
+    derivative at the next state, which then starts the next step
+    dense holds for each stage the coefficients of theta, theta^2, ... of
+    the weight b_i(theta) of a continuous extension
+        x(t + theta dt) = x + dt sum_i b_i(theta) k_i
+    if the method has one
+    """
+
+    b_hat: list = dataclasses.field(default_factory=list)
+    embedded_order: int = 0
+    dense: list = dataclasses.field(default_factory=list)
+
+    @property
+    def fsal(self) -> bool:
+        return (
+            self.c[-1] == 1
+            and self.b[-1] == 0
+            and list(self.a[-1][:-1]) == list(self.b[:-1])
+        )
+
+    @property
+    def registers(self) -> int:
+        # the stages, the stage vector and the error estimate
+        return self.stages + 2
+
+    def step_embedded(
+        self,
+        integrator,
+        x: np.ndarray,
+        t_i: float,
+        dt: float,
+        out: np.ndarray,
+        error: np.ndarray,
+        f0: np.ndarray = None,
+    ) -> np.ndarray:
+        """
+        write the state one step of length dt after x at t_i into out and
+        the local error estimate into error. f0 is the derivative at x if
+        known. returns a view of the last stage derivative, the derivative
+        at out for an FSAL method, which is overwritten by the next step
+        """
+        s = self.stages
+        buffers = integrator.stage_buffers(s + 1)
+        k, stage = buffers[:s], buffers[s]
+        for i in range(s):
+            if i == 0 and f0 is not None:
+                k[0] = f0
+                continue
+            stage[...] = x
+            for j in range(i):
+                if self.a[i][j] != 0:
+                    np.multiply(k[j], dt * self.a[i][j], out=out)
+                    stage += out
+            evaluate(integrator, stage, t_i + self.c[i] * dt, k[i])
+        out[...] = x
+        error[...] = 0
+        for i in range(s):
+            if self.b[i] != 0:
+                np.multiply(k[i], dt * self.b[i], out=stage)
+                out += stage
+            if self.b[i] != self.b_hat[i]:
+                np.multiply(k[i], dt * (self.b[i] - self.b_hat[i]), out=stage)
+                error += stage
+        return k[s - 1]
+
+    def dense_output(
+        self, integrator, x: np.ndarray, dt: float, theta: float
+    ) -> np.ndarray:
+        """
+        state at theta in [0, 1] within the last step of step_embedded from
+        x, from the stage derivatives left in the integrator's buffers
+        """
+        k = integrator.stage_buffers(self.stages + 1)
+        out = np.array(x)
+        for i, row in enumerate(self.dense):
+            weight = sum(c * theta ** (j + 1) for j, c in enumerate(row))
+            if weight != 0:
+                out += (dt * weight) * k[i]
+        return out
+
+
+@dataclasses.dataclass
+class DiagonallyImplicitTableau(ButcherTableau):
+    """
+    diagonally implicit method, a is lower triangular with a nonzero
+    diagonal entry in every implicit stage. the stage values are solved by
+    integrator.solve_implicit, for each stage i
+        Y_i = x + dt sum_j<i a[i][j] k_j + dt a[i][i] f(Y_i, t + c[i] dt)
+    and k_i = f(Y_i) follows from Y_i without evaluating f. a step that is
+    stable for every z with Re z <= 0 is a_stable
+    registers = stages + 1
+    """
+
+    a_stable: bool = False
+
+    def stability_polynomial(self) -> np.ndarray:
+        raise BaseException(f"{self.name} has a rational stability function.")
+
+    def stability_function(self, z) -> np.ndarray:
+        """
+        R(z) = 1 + z b (I - z a)^-1 1 at each z
+        """
+        z = np.asarray(z)
+        flat = np.ravel(z)
+        s = self.stages
+        matrices = np.eye(s) - np.multiply.outer(flat, np.array(self.a))
+        y = np.linalg.solve(matrices, np.ones((len(flat), s, 1)))[..., 0]
+        return np.reshape(1 + flat * (y @ np.array(self.b)), z.shape)
+
+    def stability_limit(self, direction=-1) -> float:
+        """
+        unlimited for an A-stable method along directions in the left half
+        plane, up to real parts of rounding size relative to the largest
+        direction
+        """
+        directions = np.ravel(direction)
+        tolerance = 1e-12 * np.max(np.abs(directions), initial=0)
+        if self.a_stable and np.all(np.real(directions) <= tolerance):
+            return np.inf
+        return super().stability_limit(direction)
+
+    def step(self, integrator, x, t_i, dt, out):
+        s = self.stages
+        buffers = integrator.stage_buffers(s + 1)
+        k, stage = buffers[:s], buffers[s]
+        for i in range(s):
+            stage[...] = x
+            for j in range(i):
+                if self.a[i][j] != 0:
+                    np.multiply(k[j], dt * self.a[i][j], out=out)
+                    stage += out
+            t_stage = t_i + self.c[i] * dt
+            if self.a[i][i] == 0:
+                evaluate(integrator, stage, t_stage, k[i])
+                continue
+            integrator.solve_implicit(stage, t_stage, dt * self.a[i][i], k[i])
+            # k_i = (Y_i - stage) / (dt a[i][i])
+            k[i] -= stage
+            k[i] /= dt * self.a[i][i]
+        out[...] = x
+        for i in range(s):
+            if self.b[i] != 0:
+                np.multiply(k[i], dt * self.b[i], out=stage)
+                out += stage
+
+
+@dataclasses.dataclass
+class LowStorage2N(RungeKuttaTableau):
+    """
+    Williamson 2N-storage form, for each stage i
+        dq := A[i] dq + dt f(x, t + C[i] dt)
+        x := x + B[i] dq
+    registers = 2, dq and the stage derivative
+    """
+
+    name: str
+    A: list
+    B: list
+    C: list
+    order: int
+    ssp_coefficient: float = 0.0
+
+    @property
+    def stages(self) -> int:
+        return len(self.B)
+
+    @property
+    def registers(self) -> int:
+        return 2
+
+    def step(self, integrator, x, t_i, dt, out):
+        dq, f = integrator.stage_buffers(2)[:2]
+        out[...] = x
+        dq[...] = 0
+        for i in range(self.stages):
+            evaluate(integrator, out, t_i + self.C[i] * dt, f)
+            dq *= self.A[i]
+            f *= dt
+            dq += f
+            np.multiply(dq, self.B[i], out=f)
+            out += f
+
+
+@dataclasses.dataclass
+class LowStorage2S(RungeKuttaTableau):
+    """
+    Ketcheson 2S-storage form, starting from S1 = x and S2 = 0, for each
+    stage i
+        S2 := S2 + delta[i] S1
+        S1 := gamma1[i] S1 + gamma2[i] S2 + beta[i] dt f(S1, t + c[i] dt)
+    and the next state is S1. covers the SSP methods in Shu-Osher form that
+    only combine the current stage with one saved register
+    registers = 2, S2 and the stage derivative
+    """
+
+    name: str
+    gamma1: list
+    gamma2: list
+    beta: list
+    delta: list
+    c: list
+    order: int
+    ssp_coefficient: float = 0.0
+
+    @property
+    def stages(self) -> int:
+        return len(self.beta)
+
+    @property
+    def registers(self) -> int:
+        return 2
+
+    def step(self, integrator, x, t_i, dt, out):
+        S2, f = integrator.stage_buffers(2)[:2]
+        out[...] = x
+        S2[...] = 0
+        for i in range(self.stages):
+            if self.delta[i] != 0:
+                np.multiply(out, self.delta[i], out=f)
+                S2 += f
+            evaluate(integrator, out, t_i + self.c[i] * dt, f)
+            out *= self.gamma1[i]
+            f *= self.beta[i] * dt
+            out += f
+            if self.gamma2[i] != 0:
+                np.multiply(S2, self.gamma2[i], out=f)
+                out += f
+
+
+# registry of the methods by name
+tableaus = {}
+forms = {
+    "butcher": ButcherTableau,
+    "embedded": EmbeddedTableau,
+    "2N": LowStorage2N,
+    "2S": LowStorage2S,
+    "dirk": DiagonallyImplicitTableau,
+}
+
+
+def register(tableau: RungeKuttaTableau) -> RungeKuttaTableau:
+    tableaus[tableau.name] = tableau
+    return tableau
+
+
+def _number(value):
+    """
+    a float from a number or a string like "1/6"
+    """
+    if isinstance(value, str):
+        return float(fractions.Fraction(value))
+    return float(value)
+
+
+def _numbers(value):
+    if isinstance(value, list):
+        return [_numbers(v) for v in value]
+    return _number(value)
+
+
+def tableau_from_dict(spec: dict) -> RungeKuttaTableau:
+    """
+    {"form": "butcher", "embedded", "2N", "2S" or "dirk", "name": ...,
+    "order": ..., and the coefficients of the form}, coefficients may be
+    strings like "1/6"
+    """
+    spec = dict(spec)
+    form = spec.pop("form")
+    if form not in forms:
+        raise BaseException(f"Invalid tableau form: {form}")
+    kwargs = {}
+    for key, value in spec.items():
+        if key in ["name", "order", "embedded_order", "a_stable"]:
+            kwargs[key] = value
+        else:
+            kwargs[key] = _numbers(value)
+    return forms[form](**kwargs)
+
+
+def load_tableaus(path: str) -> list:
+    """
+    register the tableaus of a json file holding a list of
+    tableau_from_dict specs. returns their names
+    """
+    with open(path) as infile:
+        specs = json.load(infile)
+    return [register(tableau_from_dict(spec)).name for spec in specs]
+
+
+register(ButcherTableau("euler", [[0]], [1], [0], order=1, ssp_coefficient=1))
+register(
+    ButcherTableau(
+        "rk4",
+        [[0, 0, 0, 0], [1 / 2, 0, 0, 0], [0, 1 / 2, 0, 0], [0, 0, 1, 0]],
+        [1 / 6, 1 / 3, 1 / 3, 1 / 6],
+        [0, 1 / 2, 1 / 2, 1],
+        order=4,
+    )
+)
+# Shu and Osher
+register(
+    LowStorage2S(
+        "ssprk2",
+        gamma1=[1, 1 / 2],
+        gamma2=[0, 1 / 2],
+        beta=[1, 1 / 2],
+        delta=[1, 0],
+        c=[0, 1],
+        order=2,
+        ssp_coefficient=1,
+    )
+)
+register(
+    LowStorage2S(
+        "ssprk3",
+        gamma1=[1, 1 / 4, 2 / 3],
+        gamma2=[0, 3 / 4, 1 / 3],
+        beta=[1, 1 / 4, 2 / 3],
+        delta=[1, 0, 0],
+        c=[0, 1, 1 / 2],
+        order=3,
+        ssp_coefficient=1,
+    )
+)
+# Ketcheson's SSPRK(10,4), with S2 = -2 times the register of his
+# two-register implementation after the fifth stage
+register(
+    LowStorage2S(
+        "ssprk104",
+        gamma1=[1, 1, 1, 1, 2 / 5, 1, 1, 1, 1, 3 / 5],
+        gamma2=[0, 0, 0, 0, 3 / 5, 0, 0, 0, 0, -1 / 2],
+        beta=[1 / 6, 1 / 6, 1 / 6, 1 / 6, 1 / 15, 1 / 6, 1 / 6, 1 / 6, 1 / 6]
+        + [1 / 10],
+        delta=[1, 0, 0, 0, 0, -9 / 5, 0, 0, 0, 0],
+        c=[0, 1 / 6, 1 / 3, 1 / 2, 2 / 3, 1 / 3, 1 / 2, 2 / 3, 5 / 6, 1],
+        order=4,
+        ssp_coefficient=6,
+    )
+)
+# Williamson's 3rd order 2N method
+register(
+    LowStorage2N(
+        "lsrk3",
+        A=[0, -5 / 9, -153 / 128],
+        B=[1 / 3, 15 / 16, 8 / 15],
+        C=[0, 1 / 3, 3 / 4],
+        order=3,
+    )
+)
+# Carpenter and Kennedy's 5 stage 4th order 2N method
+register(
+    LowStorage2N(
+        "lsrk54",
+        A=[
+            0,
+            -567301805773 / 1357537059087,
+            -2404267990393 / 2016746695238,
+            -3550918686646 / 2091501179385,
+            -1275806237668 / 842570457699,
+        ],
+        B=[
+            1432997174477 / 9575080441755,
+            5161836677717 / 13612068292357,
+            1720146321549 / 2090206949498,
+            3134564353537 / 4481467310338,
+            2277821191437 / 14882151754819,
+        ],
+        C=[
+            0,
+            1432997174477 / 9575080441755,
+            2526269341429 / 6820363962896,
+            2006345519317 / 3224310063776,
+            2802321613138 / 2924317926251,
+        ],
+        order=4,
+    )
+)
+# Bogacki and Shampine's 3(2) pair
+register(
+    EmbeddedTableau(
+        "bs32",
+        [
+            [0, 0, 0, 0],
+            [1 / 2, 0, 0, 0],
+            [0, 3 / 4, 0, 0],
+            [2 / 9, 1 / 3, 4 / 9, 0],
+        ],
+        [2 / 9, 1 / 3, 4 / 9, 0],
+        [0, 1 / 2, 3 / 4, 1],
+        order=3,
+        b_hat=[7 / 24, 1 / 4, 1 / 3, 1 / 8],
+        embedded_order=2,
+    )
+)
+# Dormand and Prince's 5(4) pair
+register(
+    EmbeddedTableau(
+        "dp54",
+        [
+            [0, 0, 0, 0, 0, 0, 0],
+            [1 / 5, 0, 0, 0, 0, 0, 0],
+            [3 / 40, 9 / 40, 0, 0, 0, 0, 0],
+            [44 / 45, -56 / 15, 32 / 9, 0, 0, 0, 0],
+            [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0, 0, 0],
+            [
+                9017 / 3168,
+                -355 / 33,
+                46732 / 5247,
+                49 / 176,
+                -5103 / 18656,
+                0,
+                0,
+            ],
+            [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0],
+        ],
+        [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0],
+        [0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1],
+        order=5,
+        b_hat=[
+            5179 / 57600,
+            0,
+            7571 / 16695,
+            393 / 640,
+            -92097 / 339200,
+            187 / 2100,
+            1 / 40,
+        ],
+        embedded_order=4,
+        # Shampine's 4th order continuous extension
+        dense=[
+            [
+                1,
+                -8048581381 / 2820520608,
+                8663915743 / 2820520608,
+                -12715105075 / 11282082432,
+            ],
+            [0, 0, 0, 0],
+            [
+                0,
+                131558114200 / 32700410799,
+                -68118460800 / 10900136933,
+                87487479700 / 32700410799,
+            ],
+            [
+                0,
+                -1754552775 / 470086768,
+                14199869525 / 1410260304,
+                -10690763975 / 1880347072,
+            ],
+            [
+                0,
+                127303824393 / 49829197408,
+                -318862633887 / 49829197408,
+                701980252875 / 199316789632,
+            ],
+            [
+                0,
+                -282668133 / 205662961,
+                2019193451 / 616988883,
+                -1453857185 / 822651844,
+            ],
+            [
+                0,
+                40617522 / 29380423,
+                -110615467 / 29380423,
+                69997945 / 29380423,
+            ],
+        ],
+    )
+)
+# implicit methods, A-stable so their steps are limited by accuracy only
+register(
+    DiagonallyImplicitTableau(
+        "backward_euler", [[1]], [1], [1], order=1, a_stable=True
+    )
+)
+register(
+    DiagonallyImplicitTableau(
+        "crank_nicolson",
+        [[0, 0], [1 / 2, 1 / 2]],
+        [1 / 2, 1 / 2],
+        [0, 1],
+        order=2,
+        a_stable=True,
+    )
+)
+# Alexander's L-stable 2 and 3 stage SDIRK methods
+_gamma = 1 - 1 / np.sqrt(2)
+register(
+    DiagonallyImplicitTableau(
+        "sdirk2",
+        [[_gamma, 0], [1 - _gamma, _gamma]],
+        [1 - _gamma, _gamma],
+        [_gamma, 1],
+        order=2,
+        a_stable=True,
+    )
+)
+# the root of 6 gamma^3 - 18 gamma^2 + 9 gamma - 1 in (1/6, 1/2)
+_gamma = 0.4358665215084590
+_tau = (1 + _gamma) / 2
+_b1 = -(6 * _gamma**2 - 16 * _gamma + 1) / 4
+_b2 = (6 * _gamma**2 - 20 * _gamma + 5) / 4
+register(
+    DiagonallyImplicitTableau(
+        "sdirk3",
+        [[_gamma, 0, 0], [_tau - _gamma, _gamma, 0], [_b1, _b2, _gamma]],
+        [_b1, _b2, _gamma],
+        [_gamma, _tau, 1],
+        order=3,
+        a_stable=True,
+    )
+)
@@ -0,0 +1,131 @@
+import collections
+import fractions
+import numbers
+from util.mathbasic import Fraction
+from util.schemestore import float_weights, SchemeStore
+
+
+point_names = {"r": "right", "l": "left", "c": "center"}
+
+
+def normalize_point(point):
+    """
+    "right", "left" or "center" for the faces and the center of the cell,
+    given by name, initial or offset, and any other offset from the cell
+    center as an exact Fraction. offsets may be numbers or strings like
+    "1/3", so "1/2" and "right" are the same point
+    """
+    point = point_names.get(point, point)
+    if point in ("right", "left", "center"):
+        return point
+    try:
+        if isinstance(point, (str, float, numbers.Rational)):
+            offset = fractions.Fraction(point)
+        else:
+            raise ValueError
+    except ValueError:
+        raise BaseException(f"Invalid reconstruction point: {point}")
+    offset = Fraction(offset.numerator, offset.denominator)
+    return {
+        Fraction(1, 2): "right",
+        Fraction(-1, 2): "left",
+        0: "center",
+    }.get(offset, offset)
+
+
+class SchemeCache:
+    """
+    two-level cache of reconstruction schemes: an in-process LRU in front of
+    a SchemeStore on disk. a scheme missing from both is computed while an
+    advisory lock on its key is held, so concurrent processes on a host
+    wait for the first one and read its result instead of computing it
+    again, while schemes of other keys are computed in parallel. the lock
+    of the whole store is only taken by save()
+    counters
+        memory_hits:    found in the LRU
+        disk_hits:      found in the store
+        misses:         computed
+    """
+
+    def __init__(self, store: SchemeStore = None, maxsize: int = 256):
+        self.store = SchemeStore() if store is None else store
+        self.maxsize = maxsize
+        self._lru = collections.OrderedDict()  # key: {cell index: Fraction}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "size": len(self._lru),
+        }
+
+    def clear(self):
+        """
+        empty the LRU, leaving the store on disk untouched
+        """
+        self._lru.clear()
+
+    def normalize_key(self, key) -> tuple:
+        """
+        key of the store, the point of a scheme is its last entry
+        """
+        key = tuple(key)
+        return self.store.normalize_key(key[:-1] + (normalize_point(key[-1]),))
+
+    def _remember(self, key, coeffs: dict) -> dict:
+        self._lru[key] = coeffs
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+        return dict(coeffs)
+
+    def _read_disk(self, key) -> dict:
+        if key not in self.store:
+            self.store.refresh()
+        if key in self.store:
+            self.disk_hits += 1
+            return self._remember(key, self.store.get(key))
+        return None
+
+    def get_or_compute(self, key, compute, force: bool = False) -> dict:
+        """
+        returns the scheme {cell index: Fraction} saved under key, calling
+        compute() and saving its result on a miss
+        force:  compute and save the scheme even if it is saved
+        """
+        key = self.normalize_key(key)
+        if not force:
+            if key in self._lru:
+                self.memory_hits += 1
+                self._lru.move_to_end(key)
+                return dict(self._lru[key])
+            coeffs = self._read_disk(key)
+            if coeffs is not None:
+                return coeffs
+        with self.store.lock(key):
+            # another process may have finished it while we waited
+            coeffs = None if force else self._read_disk(key)
+            if coeffs is not None:
+                return coeffs
+            self.misses += 1
+            coeffs = dict(compute())
+            self.store.put(key, coeffs)
+            self.store.save()
+        return self._remember(key, coeffs)
+
+    def weights(self, key, compute) -> tuple:
+        """
+        float64 weights of the scheme saved under key as (first cell index,
+        array), read from the store, see get_or_compute
+        """
+        coeffs = self.get_or_compute(key, compute)
+        key = self.normalize_key(key)
+        if key not in self.store:
+            self.store.refresh()
+        if key not in self.store:  # the file on disk was removed
+            return float_weights(coeffs)
+        return self.store.weights(key)
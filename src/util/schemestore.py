@@ -0,0 +1,418 @@
+import contextlib
+import csv
+import hashlib
+import json
+import mmap
+import numbers
+import os
+import struct
+import tempfile
+import numpy as np
+from util.mathbasic import Fraction
+
+try:
+    import fcntl
+except ImportError:  # advisory locking is only available on POSIX
+    fcntl = None
+
+
+# header: magic, version, index offset, index length
+header_format = "<8sIxxxxQQ"
+header_size = struct.calcsize(header_format)
+magic = b"FVSCHEME"
+version = 1
+
+
+def seed_store_path() -> str:
+    """
+    the scheme store shipped with the package, read-only seed data of the
+    default store
+    """
+    return os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "reconstruction_schemes",
+        "schemes.fvs",
+    )
+
+
+def default_store_path() -> str:
+    """
+    location of the default scheme store, a user cache directory
+    ($XDG_CACHE_HOME or ~/.cache) overridden by the FVSCHEME_STORE
+    environment variable
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.environ.get(
+        "FVSCHEME_STORE", os.path.join(cache_home, "fvscheme", "schemes.fvs")
+    )
+
+
+def _encode_int(i: int) -> bytes:
+    """
+    length-prefixed little-endian two's complement bytes of an int
+    """
+    data = i.to_bytes(i.bit_length() // 8 + 1, "little", signed=True)
+    return struct.pack("<I", len(data)) + data
+
+
+def _decode_ints(buffer, start: int, count: int) -> list[int]:
+    ints = []
+    for _ in range(count):
+        (length,) = struct.unpack_from("<I", buffer, start)
+        start, end = start + 4, start + 4 + length
+        ints.append(int.from_bytes(buffer[start:end], "little", signed=True))
+        start = end
+    return ints
+
+
+def float_weights(coeffs: dict) -> tuple:
+    """
+    (first cell index, float64 weights) of a scheme {cell index: Fraction}
+    over its contiguous cells
+    """
+    first = min(coeffs.keys())
+    return first, np.array(
+        [float(coeffs.get(i, 0)) for i in range(first, max(coeffs.keys()) + 1)]
+    )
+
+
+class SchemeStore:
+    """
+    single-file store of reconstruction schemes
+    each scheme is saved under a key, (left, right, point) for a kernel
+    scheme or ("order", order, point) for the scheme of an order, as the
+    exact numerators and denominators of its weights and as a float64 weight
+    vector over the contiguous cells first, ..., first + size - 1
+    the file is memory-mapped once when the store is opened and weights are
+    decoded lazily on lookup
+    file layout
+        header      magic, version, index offset, index length
+        records     float64 weights (8 byte aligned), then the exact weights
+                    as length-prefixed signed ints, numerator first
+        index       json list of {key, first, size, floats, exact}
+    the file is only ever replaced as a whole: save() merges with the file
+    on disk under an advisory lock and renames a complete new file into
+    place, so readers in other processes never see a partial write. the
+    saved records are copied byte for byte and only the pending schemes
+    are encoded, unless one replaces a saved scheme
+    seed is a store that is read while the file at path does not exist and
+    merged into it on the first save, it is never written. the default
+    store is seeded with seed_store_path()
+    """
+
+    def __init__(self, path: str = None, seed: str = None):
+        if path is None:
+            path = default_store_path()
+            seed = seed_store_path() if seed is None else seed
+        self.path = path
+        self.seed = seed
+        self._file = None
+        self._mmap = None
+        self._stat = None  # (inode, mtime, size) of the mapped file
+        self._index = {}  # key: index entry on disk
+        self._records_end = header_size  # offset of the index on disk
+        self._pending = {}  # key: coeffs not yet saved
+        self._locks = {}  # lock path: [open lock file, depth]
+        self.open()
+
+    @staticmethod
+    def normalize_key(key) -> tuple:
+        """
+        keys are tuples of ints and strings. integers like numpy.int64 are
+        ints, otherwise an order looped over with numpy would be saved as
+        the string "3" under a key that misses the int order 3
+        """
+        normalized = []
+        for i in key:
+            if isinstance(i, numbers.Integral):
+                normalized.append(int(i))
+            elif isinstance(i, str):
+                normalized.append(i)
+            else:
+                normalized.append(str(i))
+        return tuple(normalized)
+
+    def open(self):
+        """
+        (re)map the file on disk and read its index
+        """
+        self.close()
+        self._index = {}
+        self._records_end = header_size
+        seeded = False
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            if self.seed is None or not os.path.exists(self.seed):
+                return
+            self._file = open(self.seed, "rb")
+            seeded = True
+        stat = os.fstat(self._file.fileno())
+        if not seeded:  # a seed is replaced once the file at path appears
+            self._stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stat.st_size == 0:
+            return
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            file_magic,
+            file_version,
+            index_offset,
+            index_length,
+        ) = struct.unpack_from(header_format, self._mmap, 0)
+        if file_magic != magic or file_version != version:
+            raise BaseException(f"{self._file.name} is not a scheme store.")
+        index_end = index_offset + index_length
+        index = json.loads(self._mmap[index_offset:index_end])
+        self._records_end = index_offset
+        for entry in index:
+            self._index[self.normalize_key(entry["key"])] = entry
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # weight views are still alive, the map is released with them
+                pass
+        if self._file is not None:
+            self._file.close()
+        self._mmap = None
+        self._file = None
+        self._stat = None
+
+    def refresh(self) -> bool:
+        """
+        reopen the store if another process replaced the file on disk.
+        returns whether it was reopened
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        if stat is not None:
+            stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stat == self._stat:
+            return False
+        self.open()
+        return True
+
+    def lock_path(self, key=None) -> str:
+        """
+        path + ".lock" for the whole store, path + ".<digest>.lock" for a
+        single key
+        """
+        if key is None:
+            return self.path + ".lock"
+        name = json.dumps(list(self.normalize_key(key)))
+        digest = hashlib.sha1(name.encode()).hexdigest()[:16]
+        return f"{self.path}.{digest}.lock"
+
+    @staticmethod
+    def _acquire(path: str):
+        """
+        open and exclusively lock the file at path. a file removed by its
+        previous holder while we waited for it is closed and the file now
+        at path is locked instead
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        while True:
+            lock_file = open(path, "a")
+            if fcntl is None:
+                return lock_file
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                if os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    @contextlib.contextmanager
+    def lock(self, key=None):
+        """
+        hold an exclusive advisory lock on the whole store, or only on key
+        (reentrant within a store instance). the lock file of a key is
+        removed on release. a no-op where fcntl is not available
+        """
+        path = self.lock_path(key)
+        if path not in self._locks:
+            self._locks[path] = [self._acquire(path), 0]
+        self._locks[path][1] += 1
+        try:
+            yield
+        finally:
+            self._locks[path][1] -= 1
+            if self._locks[path][1] == 0:
+                lock_file, _ = self._locks.pop(path)
+                if fcntl is not None:
+                    if key is not None:  # removed while still locked
+                        os.remove(path)
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                lock_file.close()
+
+    def __contains__(self, key) -> bool:
+        key = self.normalize_key(key)
+        return key in self._pending or key in self._index
+
+    def keys(self) -> list:
+        return list(self._index.keys()) + [
+            key for key in self._pending.keys() if key not in self._index
+        ]
+
+    def get(self, key) -> dict:
+        """
+        exact weights of a scheme as {cell index: Fraction}
+        """
+        key = self.normalize_key(key)
+        if key in self._pending:
+            return dict(self._pending[key])
+        entry = self._index[key]
+        ints = _decode_ints(self._mmap, entry["exact"], 2 * entry["size"])
+        return dict(
+            (entry["first"] + i, Fraction(ints[2 * i], ints[2 * i + 1]))
+            for i in range(entry["size"])
+        )
+
+    def weights(self, key) -> tuple:
+        """
+        float64 weights of a scheme as (first cell index, array), the array
+        is a read-only view of the memory-mapped file
+        """
+        key = self.normalize_key(key)
+        if key in self._pending:
+            return float_weights(self._pending[key])
+        entry = self._index[key]
+        return entry["first"], np.frombuffer(
+            self._mmap, np.float64, entry["size"], entry["floats"]
+        )
+
+    def put(self, key, coeffs: dict):
+        """
+        add a scheme {cell index: Fraction}, written on the next save().
+        cell indices like numpy.int64 are saved as ints
+        """
+        self._pending[self.normalize_key(key)] = dict(
+            (int(i), coeff) for i, coeff in coeffs.items()
+        )
+
+    def save(self):
+        """
+        merge the pending schemes with the file on disk and atomically
+        replace it
+        """
+        with self.lock():
+            self.refresh()
+            if any(key in self._index for key in self._pending):
+                # rewrite all schemes, dropping the replaced records
+                schemes = dict(
+                    (key, self.get(key)) for key in self._index.keys()
+                )
+                schemes.update(self._pending)
+                self.write(self.path, schemes)
+            else:
+                records_end = self._records_end
+                records = b""
+                if self._mmap is not None:
+                    records = self._mmap[header_size:records_end]
+                body, index = self.encode(self._pending, records_end)
+                self.replace(
+                    self.path,
+                    records + body,
+                    list(self._index.values()) + index,
+                )
+            self._pending = {}
+            self.open()
+
+    @staticmethod
+    def encode(schemes: dict, start: int) -> tuple:
+        """
+        (record bytes, index entries) of {key: {cell index: Fraction}}
+        written from the file offset start on
+        """
+        body = bytearray()
+        index = []
+        for key, coeffs in schemes.items():
+            first = min(coeffs.keys())
+            size = max(coeffs.keys()) - first + 1
+            weights = [
+                coeffs.get(first + i, Fraction(0, 1)) for i in range(size)
+            ]
+            body.extend(b"\0" * (-(start + len(body)) % 8))
+            floats = start + len(body)
+            body.extend(np.array([float(w) for w in weights]).tobytes())
+            exact = start + len(body)
+            for w in weights:
+                body.extend(_encode_int(w.numerator))
+                body.extend(_encode_int(w.denominator))
+            index.append(
+                {
+                    "key": list(key),
+                    "first": first,
+                    "size": size,
+                    "floats": floats,
+                    "exact": exact,
+                }
+            )
+        return body, index
+
+    @classmethod
+    def write(cls, path: str, schemes: dict):
+        """
+        write {key: {cell index: Fraction}} to a new store file at path
+        """
+        body, index = cls.encode(schemes, header_size)
+        cls.replace(path, body, index)
+
+    @staticmethod
+    def replace(path: str, records: bytes, index: list):
+        """
+        atomically replace the file at path by a store of the records
+        following the header and their index entries
+        """
+        index_bytes = json.dumps(index).encode()
+        header = struct.pack(
+            header_format,
+            magic,
+            version,
+            header_size + len(records),
+            len(index_bytes),
+        )
+        # write then rename so that the file at path is always complete
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as the_file:
+                the_file.write(header)
+                the_file.write(records)
+                the_file.write(index_bytes)
+                the_file.flush()
+                os.fsync(the_file.fileno())
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def import_csv(self, directory: str) -> list:
+        """
+        add the order{n}_{side}.csv schemes found in a directory under the
+        keys ("order", n, side) and save. returns the imported keys
+        """
+        imported = []
+        for filename in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(filename)
+            if extension != ".csv" or not name.startswith("order"):
+                continue
+            order, side = name.replace("order", "", 1).split("_")
+            coeffs = {}
+            with open(os.path.join(directory, filename)) as infile:
+                for row in csv.reader(infile):
+                    coeffs[int(row[0])] = Fraction(int(row[1]), int(row[2]))
+            key = ("order", int(order), side)
+            self.put(key, coeffs)
+            imported.append(self.normalize_key(key))
+        self.save()
+        return imported
@@ -1,13 +1,55 @@
+import fractions
+import functools
 import numpy as np
 from util.integrate import Integrator
+from util.linalg import CyclicBandedLU
+from util.rungekutta import tableaus
 from util.fvscheme import PolynomialReconstruction
+from util.mathbasic import Fraction
+from util.stencil import correlate
+from util.trajectory import TrajectoryWriter
 
 
 class AdvectionSolver(Integrator):
-    def __init__(self, x0, t, h, a, order):
-        super().__init__(x0, t)
-        self.a = a  # velocity field
+    """
+    finite volume solver of u_t + (a u)_x = 0 on a periodic grid
+    x0 is one state of n cells or a (batch, n) array of states that share
+    the grid, order and time steps. a is a scalar, the n + 1 face speeds,
+    or for a batch the speed of each member (batch,) or (batch, 1) or of
+    each member and face (batch, n + 1)
+    """
+
+    inplace = True
+
+    def __init__(
+        self, x0, t, h, a, order, snapshots=None, trajectory: str = None
+    ):
+        super().__init__(x0, t, snapshots, trajectory)
+        self.a = a  # velocity
+        # speeds broadcastable against the (..., n + 1) face values
+        self._a = np.asarray(a, dtype=float)
+        if np.ndim(x0) == 2 and self._a.shape == (len(x0),):
+            self._a = self._a[:, np.newaxis]
         self.h = h  # mesh size
+        self.order = order
+        self.setup_schemes(order)
+        self._cfl_limits = {}  # method: Courant number
+        self._fused_weights = {}  # (method, Courant number): weights
+        self._shift_stencils = {}  # shift in cells: (weights, gather)
+        self._implicit_factors = {}  # gamma dt: CyclicBandedLU
+        # upwind scheme of each face, chosen once per solver
+        self._groups = self.upwind_groups()
+        # persistent workspace, the ghost-padded state and the face values
+        batch_shape, n = np.shape(x0)[:-1], np.shape(x0)[-1]
+        self._x_extended = np.zeros(batch_shape + (n + 2 * self._gw,))
+        self._faces = np.zeros(batch_shape + (n + 1,))
+        self._work = np.zeros(batch_shape + (n + 1,))
+
+    def setup_schemes(self, order: int):
+        """
+        the interface schemes of an order, their float weights and the
+        ghost width
+        """
         # devise a scheme for reconstructed values at cell interfaces
         right_interface_scheme_original = (
             PolynomialReconstruction.construct_from_order(order, "right")
@@ -15,6 +57,11 @@ class AdvectionSolver(Integrator):
         left_interface_scheme_original = (
             PolynomialReconstruction.construct_from_order(order, "left")
         )
+        # exact schemes of each order, for stencils built from them
+        self._orders = [order]
+        self._schemes = [
+            (right_interface_scheme_original, left_interface_scheme_original)
+        ]
         self.right_interface_scheme = right_interface_scheme_original.nparray()
         self.left_interface_scheme = left_interface_scheme_original.nparray()
         # number of kernel cells from center referenced by a scheme
@@ -22,36 +69,582 @@ class AdvectionSolver(Integrator):
         self._k = max(right_interface_scheme_original.coeffs.keys())
         # number of ghost cells on either side of the extended state vector
         self._gw = self._k + 1
+        # normalized float weights over cells -k, ..., k
+        self._right_weights = self.order_weights(order, "right")
+        self._left_weights = self.order_weights(order, "left")
 
-    def periodic_boundary(self, x_extended: np.ndarray):
-        gw = self._gw
+    def trajectory_writer(self, path: str) -> TrajectoryWriter:
+        """
+        the cell centers of the periodic domain [0, n h) are the grid
+        """
+        n = np.shape(self.x0)[-1]
+        return TrajectoryWriter(
+            path,
+            self.t_snapshots,
+            n,
+            grid=(np.arange(n) + 0.5) * self.h,
+            metadata={
+                "h": self.h,
+                "a": np.asarray(self.a).tolist(),
+                "order": self.order,
+            },
+        )
+
+    def fourier_symbol(self, theta: np.ndarray) -> np.ndarray:
+        """
+        z such that dt xdot = nu z u for the Fourier mode u_i = exp(1j theta
+        i) at the Courant number nu = |a| dt / h, for each upwind direction
+        in a and each order, as (..., len(theta)). a non-constant a is
+        frozen at the sign of each face
+        """
+        theta = np.asarray(theta, dtype=float)
+        cells = np.arange(-self._k, self._k + 1)
+        # sum_j w_j exp(1j theta j) for each theta and stencil
+        phases = np.exp(1j * np.multiply.outer(theta, cells))
+        symbols = []
+        if np.any(self._a > 0):
+            right = phases @ np.atleast_2d(self._right_weights).T
+            symbols.append(-(1 - np.exp(-1j * theta)) * right.T)
+        if np.any(self._a < 0):
+            left = phases @ np.atleast_2d(self._left_weights).T
+            symbols.append((np.exp(1j * theta) - 1) * left.T)
+        if not symbols:
+            return np.zeros((1, len(theta)), dtype=complex)
+        return np.concatenate(symbols)
+
+    def cfl_limit(self, method: str) -> float:
+        """
+        largest stable Courant number |a| dt / h of an integration method
+        with this solver's schemes, from the stability polynomial of the
+        method over the Fourier symbol at the wavenumbers of the grid
+        """
+        if method not in self._cfl_limits:
+            n = np.shape(self.x0)[-1]
+            theta = 2 * np.pi * np.arange(n) / n
+            if n > 1024:
+                theta = np.linspace(0, 2 * np.pi, 1024, endpoint=False)
+            self._cfl_limits[method] = tableaus[method].stability_limit(
+                self.fourier_symbol(theta)
+            )
+        return self._cfl_limits[method]
+
+    def max_dt(self, method: str) -> float:
+        """
+        time step at the CFL limit of a method
+        """
+        speed = np.max(np.abs(self._a))
+        if speed == 0:
+            return np.inf
+        return self.cfl_limit(method) * self.h / speed
+
+    def amplification(self, method: str, dt: float) -> np.ndarray:
+        """
+        factor by which one step of length dt multiplies each Fourier mode,
+        R(nu z(theta)) at the wavenumbers theta = 2 pi m / n of
+        numpy.fft.rfft, m = 0, ..., n // 2, for a constant speed a. one row
+        per order for a multi-order solver
+        """
+        if self._a.size != 1:
+            raise BaseException("Spectral propagation needs a constant a.")
+        n = np.shape(self.x0)[-1]
+        theta = 2 * np.pi * np.arange(n // 2 + 1) / n
+        nu = abs(float(self._a.flat[0])) * dt / self.h
+        return tableaus[method].stability_function(
+            nu * self.fourier_symbol(theta)
+        )
+
+    def integrate_spectral(self, method: str = "rk4", callback=None):
+        """
+        jump to every kept time with one FFT of the initial state, the
+        amplification factors to the power of the number of steps and an
+        inverse FFT, which equals stepping with the method to rounding.
+        needs a constant a and uniform steps in t
+        """
+        dt = np.diff(self.t)
+        if not np.allclose(dt, dt[0], rtol=1e-6, atol=0):
+            raise BaseException("Spectral propagation needs uniform steps.")
+        n = np.shape(self.x0)[-1]
+        gain = self.amplification(method, (self.t[-1] - self.t[0]) / len(dt))
+        if np.ndim(self.x0) == 1:
+            gain = gain[0]
+        spectrum = np.fft.rfft(self.x0)
+        writer = None
+        if self.trajectory is not None:
+            writer = self.trajectory_writer(self.trajectory)
+        try:
+            for column, i in enumerate(self.snapshot_indices):
+                x = np.fft.irfft(spectrum * gain**i, n)
+                self.keep_snapshot(column, x, writer)
+                if callback is not None:
+                    callback(i, self.t[i], x)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def operator_bands(self) -> np.ndarray:
+        """
+        xdot as a cyclic banded matrix, (..., n, 2 gw + 1) with entry
+        [..., i, gw + m] in row i and column (i + m) mod n, one matrix per
+        batch member that has its own speeds or order
+        """
+        n = np.shape(self.x0)[-1]
+        gw, k = self._gw, self._k
+        face_shape = np.shape(self.x0)[:-1] + (n + 1,)
+        batch_shape = np.broadcast_shapes(
+            np.shape(self._a)[:-1], np.shape(self._right_weights)[:-1]
+        )
+        a = np.broadcast_to(self._a, batch_shape + face_shape[-1:])
+        # upwind face values over the cells -gw, ..., gw from each face,
+        # face j is the left face of cell j
+        right = np.zeros(batch_shape + (2 * gw + 1,))
+        left = np.zeros(batch_shape + (2 * gw + 1,))
+        right_start, right_end = gw - 1 - k, gw + k
+        left_start, left_end = gw - k, gw + k + 1
+        right[..., right_start:right_end] = self._right_weights
+        left[..., left_start:left_end] = self._left_weights
+        a = a[..., np.newaxis]
+        faces = a * np.where(
+            a > 0,
+            right[..., np.newaxis, :],
+            np.where(a < 0, left[..., np.newaxis, :], 0),
+        )
+        # row i is face i minus face i + 1, whose offsets are one cell more
+        bands = np.array(faces[..., :-1, :])
+        bands[..., 1:] -= faces[..., 1:, :-1]
+        return bands / self.h
+
+    def operator_matrix(self) -> np.ndarray:
+        """
+        xdot as a dense (..., n, n) matrix, see operator_bands
+        """
+        n = np.shape(self.x0)[-1]
+        bands = self.operator_bands()
+        matrix = np.zeros(bands.shape[:-2] + (n, n))
+        rows = np.arange(n)[:, np.newaxis]
+        offsets = np.arange(-self._gw, self._gw + 1)
+        np.add.at(
+            matrix,
+            (
+                ...,
+                np.broadcast_to(rows, (n, len(offsets))),
+                (rows + offsets) % n,
+            ),
+            bands,
+        )
+        return matrix
+
+    def solve_implicit(
+        self, rhs: np.ndarray, t_i: float, gamma_dt: float, out: np.ndarray
+    ):
+        """
+        (I - gamma_dt xdot) y = rhs. for a constant a xdot is circulant and
+        the solve is a division of the Fourier modes by its eigenvalues,
+        otherwise the cyclic banded matrix is factored by
+        util.linalg.CyclicBandedLU once per _step_key of gamma_dt
+        """
+        n = np.shape(self.x0)[-1]
+        if self._a.size == 1:
+            eigenvalues = getattr(self, "_eigenvalues", None)
+            if eigenvalues is None:
+                theta = 2 * np.pi * np.arange(n // 2 + 1) / n
+                speed = abs(float(self._a.flat[0])) / self.h
+                eigenvalues = speed * self.fourier_symbol(theta)
+                if np.ndim(self.x0) == 1:
+                    eigenvalues = eigenvalues[0]
+                self._eigenvalues = eigenvalues
+            spectrum = np.fft.rfft(rhs)
+            spectrum /= 1 - gamma_dt * eigenvalues
+            out[...] = np.fft.irfft(spectrum, n)
+            return
+        key = self._step_key(gamma_dt)
+        if key not in self._implicit_factors:
+            bands = -gamma_dt * self.operator_bands()
+            bands[..., self._gw] += 1
+            self._implicit_factors[key] = CyclicBandedLU(
+                np.reshape(bands, (-1,) + bands.shape[-2:])
+            )
+        factors = self._implicit_factors[key]
+        if len(factors.z) == 1:
+            # one matrix, the members of a batch are its columns
+            columns = np.reshape(rhs, (-1, n)).T[np.newaxis]
+            y = factors.solve(columns)[0].T
+        else:
+            y = factors.solve(np.reshape(rhs, (-1, n, 1)))[..., 0]
+        out[...] = np.reshape(y, np.shape(rhs))
+
+    def step_function(self, method: str):
+        """
+        "fused-<method>" steps with the fused stencil of a method, see
+        fused_step, and "semi-lagrangian" with semi_lagrangian_step
+        """
+        if method.startswith("fused-"):
+            return functools.partial(self.fused_step, method=method[6:])
+        if method == "semi-lagrangian":
+            return self.semi_lagrangian_step
+        return super().step_function(method)
+
+    def operator_stencils(self, cfl) -> list:
+        """
+        exact stencil {cell offset: Fraction} of dt xdot for each order at
+        the Courant number cfl = |a| dt / h of a constant a, a flux
+        difference of the upwind face stencils over cells -k - 1, ..., k
+        for a > 0 and -k, ..., k + 1 for a < 0
+        """
+        if self._a.size != 1:
+            raise BaseException("Fused stencils need a constant a.")
+        nu = fractions.Fraction(cfl)
+        nu = Fraction(nu.numerator, nu.denominator)
+        sign = np.sign(float(self._a.flat[0]))
+        stencils = []
+        for right, left in self._schemes:
+            k = max(right.coeffs.keys())
+            stencil = {}
+            for m in range(-k - 1, k + 2):
+                if sign > 0:
+                    coeff = -nu * (
+                        right.coeffs.get(m, 0) - right.coeffs.get(m + 1, 0)
+                    )
+                elif sign < 0:
+                    coeff = nu * (
+                        left.coeffs.get(m - 1, 0) - left.coeffs.get(m, 0)
+                    )
+                else:
+                    coeff = 0
+                if coeff != 0:
+                    stencil[m] = coeff
+            stencils.append(stencil)
+        return stencils
+
+    def fused_stencils(self, method: str, cfl) -> list:
+        """
+        exact stencil {cell offset: Fraction} of one step of a method for
+        each order, R(dt xdot) as the polynomial R of the method applied to
+        the operator stencil. for rk4 and a scheme over cells -k, ..., k
+        its width is 4 (2 k + 2) - 3. the coefficients of R are taken as the
+        nearest fractions with denominators up to 10^12, which are exact
+        for tableaus with rational entries, and cfl is converted exactly,
+        a float as its binary value
+        """
+        polynomial = [
+            fractions.Fraction(float(r)).limit_denominator(10**12)
+            for r in tableaus[method].stability_polynomial()
+        ]
+        fused_stencils = []
+        for stencil in self.operator_stencils(cfl):
+            fused = {}
+            power = {0: Fraction(1)}
+            for r in polynomial:
+                r = Fraction(r.numerator, r.denominator)
+                for m, coeff in power.items():
+                    fused[m] = fused.get(m, 0) + r * coeff
+                # next power of the operator, a convolution of the stencils
+                product = {}
+                for m, coeff in power.items():
+                    for j, d in stencil.items():
+                        product[m + j] = product.get(m + j, 0) + coeff * d
+                power = product
+            fused_stencils.append(
+                dict((m, coeff) for m, coeff in fused.items() if coeff != 0)
+            )
+        return fused_stencils
+
+    @staticmethod
+    def _step_key(value: float) -> float:
+        """
+        cache key of a step length or a value proportional to it. steps of
+        t = arange(...) differ in their last bits, rounded to 12 significant
+        digits they share one entry, which is computed from the exact value
+        of the first of them
+        """
+        return float(f"{value:.12g}")
+
+    def fused_weights(self, method: str, cfl: float) -> np.ndarray:
+        """
+        float64 weights over cells -g, ..., g of the fused stencils of a
+        method at a Courant number, (2 g + 1,) or (orders, 2 g + 1) like the
+        interface weights. cached per method and _step_key of the Courant
+        number
+        """
+        key = (method, self._step_key(cfl))
+        if key not in self._fused_weights:
+            stencils = self.fused_stencils(method, cfl)
+            g = max(max(abs(m) for m in stencil) for stencil in stencils)
+            weights = np.array(
+                [
+                    [float(stencil.get(m, 0)) for m in range(-g, g + 1)]
+                    for stencil in stencils
+                ]
+            )
+            if np.ndim(self._right_weights) == 1:
+                weights = weights[0]
+            self._fused_weights[key] = weights
+        return self._fused_weights[key]
+
+    def fused_step(
+        self,
+        x: np.ndarray,
+        t_i: float,
+        dt: float,
+        out: np.ndarray,
+        method: str = "rk4",
+    ):
+        """
+        write the state one step of a method after x at t_i into out with
+        one ghost fill and one pass of the fused stencil, which equals the
+        stages of the method to rounding. needs a constant a
+        """
+        cfl = abs(float(self._a.flat[0])) * dt / self.h
+        weights = self.fused_weights(method, cfl)
+        gw = weights.shape[-1] // 2
+        n = x.shape[-1]
+        extended_shape = x.shape[:-1] + (n + 2 * gw,)
+        x_extended = getattr(self, "_fused_extended", None)
+        if x_extended is None or x_extended.shape != extended_shape:
+            x_extended = np.zeros(extended_shape)
+            self._fused_extended = x_extended
+            self._fused_work = np.zeros(x.shape)
+        if n < gw:
+            raise BaseException("Grid is smaller than the fused stencil.")
+        end = gw + n
+        x_extended[..., gw:end] = x
+        self.periodic_boundary(x_extended, gw)
+        correlate(x_extended, weights, out=out, work=self._fused_work)
+
+    def integrate_fused(self, method: str = "rk4", callback=None):
+        """
+        integrate like integrate(method), advancing each step with the
+        fused stencil of the method for its Courant number, built once per
+        distinct step length. needs a constant a
+        """
+        self.integrate(f"fused-{method}", callback)
+
+    def shift_stencil(self, shift: float) -> tuple:
+        """
+        (weights, gather) of the exact update of a constant a over a shift
+        of a dt / h cells. the shift is split into the integer m and the
+        fraction f of m + f, the weights over cells -g, ..., g are those of
+        PolynomialReconstruction.construct_shifted_average(order, f) and
+        gather holds the cells (i - m) mod n of the ghost-padded state
+        shifted by m. cached per _step_key of the shift
+        """
+        key = self._step_key(shift)
+        if key not in self._shift_stencils:
+            m = int(np.floor(shift))
+            schemes = [
+                PolynomialReconstruction.construct_shifted_average(
+                    order, shift - m
+                )
+                for order in self._orders
+            ]
+            g = max(max(abs(i) for i in scheme.coeffs) for scheme in schemes)
+            weights = np.array(
+                [
+                    [float(scheme.coeffs.get(i, 0)) for i in range(-g, g + 1)]
+                    for scheme in schemes
+                ]
+            )
+            if np.ndim(self._right_weights) == 1:
+                weights = weights[0]
+            n = np.shape(self.x0)[-1]
+            gather = (np.arange(-g, n + g) - m) % n
+            self._shift_stencils[key] = weights, gather
+        return self._shift_stencils[key]
+
+    def semi_lagrangian_step(
+        self, x: np.ndarray, t_i: float, dt: float, out: np.ndarray
+    ):
+        """
+        write the state one step after x at t_i into out as the average of
+        the reconstruction over each cell traced back by a dt, one gather of
+        the shifted and ghost-padded state and one stencil pass at any
+        Courant number. needs a constant a
+        """
+        if self._a.size != 1:
+            raise BaseException("Semi-Lagrangian steps need a constant a.")
+        shift = float(self._a.flat[0]) * dt / self.h
+        weights, gather = self.shift_stencil(shift)
+        extended_shape = x.shape[:-1] + gather.shape
+        x_extended = getattr(self, "_shifted_extended", None)
+        if x_extended is None or x_extended.shape != extended_shape:
+            x_extended = np.zeros(extended_shape)
+            self._shifted_extended = x_extended
+            self._shifted_work = np.zeros(x.shape)
+        np.take(x, gather, axis=-1, out=x_extended)
+        correlate(x_extended, weights, out=out, work=self._shifted_work)
+
+    def integrate_semi_lagrangian(self, callback=None):
+        """
+        integrate like integrate(method) with semi_lagrangian_step, whose
+        steps are not limited by a CFL condition
+        """
+        self.integrate("semi-lagrangian", callback)
+
+    def order_weights(self, order: int, reconstruct_here: str) -> np.ndarray:
+        """
+        float64 weights of the scheme of an order over the cells -k, ..., k,
+        as saved in the scheme store
+        """
+        first, weights = PolynomialReconstruction.weights_from_order(
+            order, reconstruct_here
+        )
+        padded = np.zeros(2 * self._k + 1)
+        start = first + self._k
+        end = start + len(weights)
+        padded[start:end] = weights
+        return padded
+
+    def periodic_boundary(self, x_extended: np.ndarray, gw: int = None):
+        """
+        fill gw ghost cells on either side, by default the solver's _gw
+        """
+        if gw is None:
+            gw = self._gw
         negative_gw = -gw
         left_index = -2 * gw
-        x_extended[:gw] = x_extended[left_index:negative_gw]
+        x_extended[..., :gw] = x_extended[..., left_index:negative_gw]
         right_index = 2 * gw
-        x_extended[negative_gw:] = x_extended[gw:right_index]
-
-    def xdot(self, x: np.ndarray, t_i: float) -> np.ndarray:
-        x_extended = np.concatenate(
-            (np.zeros(self._gw), x, np.zeros(self._gw))
-        )
-        self.periodic_boundary(x_extended)
-        a = []
-        n = len(x)
-        for i in range(2 * self._k + 1):
-            right_ind = i + n + 2
-            a.append(x_extended[i:right_ind])
-        A = np.array(a).T
-        x_interface_right = (
-            A @ self.right_interface_scheme / sum(self.right_interface_scheme)
-        )
-        x_interface_left = (
-            A @ self.left_interface_scheme / sum(self.left_interface_scheme)
-        )
-        Delta_x = np.zeros(n)
-        for i in range(n):
-            if self.a > 0:
-                Delta_x[i] = x_interface_right[i + 1] - x_interface_right[i]
-            elif self.a < 0:
-                Delta_x[i] = x_interface_left[i + 2] - x_interface_left[i + 1]
-        return -(self.a / self.h) * Delta_x
+        x_extended[..., negative_gw:] = x_extended[..., gw:right_index]
+
+    @staticmethod
+    def sign_regions(signs: np.ndarray) -> list:
+        """
+        list of (first face, end face, sign) of the runs of faces on which
+        the velocity keeps its sign, face j is the left face of cell j
+        """
+        ends = np.flatnonzero(np.diff(signs)) + 1
+        firsts = np.concatenate(([0], ends))
+        ends = np.concatenate((ends, [len(signs)]))
+        return [
+            (int(first), int(end), int(signs[first]))
+            for first, end in zip(firsts, ends)
+        ]
+
+    def upwind_groups(self) -> list:
+        """
+        list of (members, sign regions), batch members with the same sign
+        pattern over the faces share their regions. members is Ellipsis
+        when all members do
+        """
+        face_shape = np.shape(self.x0)[:-1] + (np.shape(self.x0)[-1] + 1,)
+        signs = np.sign(np.broadcast_to(self._a, face_shape)).astype(int)
+        if signs.ndim == 1:
+            return [(Ellipsis, self.sign_regions(signs))]
+        patterns, inverse = np.unique(signs, axis=0, return_inverse=True)
+        if len(patterns) == 1:
+            return [(Ellipsis, self.sign_regions(patterns[0]))]
+        inverse = inverse.ravel()
+        return [
+            (np.flatnonzero(inverse == i), self.sign_regions(pattern))
+            for i, pattern in enumerate(patterns)
+        ]
+
+    def upwind_faces(
+        self,
+        x_extended: np.ndarray,
+        out: np.ndarray = None,
+        work: np.ndarray = None,
+    ) -> np.ndarray:
+        """
+        reconstructed values at the n + 1 faces of the extended state vector
+        from the upwind cell of each face, zero where the velocity is zero
+        out and work are optional (..., n + 1) arrays as in correlate
+        """
+        face_shape = x_extended.shape[:-1] + (
+            x_extended.shape[-1] - 2 * self._gw + 1,
+        )
+        faces = np.empty(face_shape) if out is None else out
+        width = 2 * self._k
+        for members, regions in self._groups:
+            for first, end, sign in regions:
+                if sign > 0:
+                    # right face of cell j - 1, kernel starts at ghost index j
+                    start, weights = first, self._right_weights
+                elif sign < 0:
+                    # left face of cell j, kernel starts at ghost index j + 1
+                    start, weights = first + 1, self._left_weights
+                else:
+                    faces[members, first:end] = 0
+                    continue
+                stop = start + end - first + width
+                if members is Ellipsis:
+                    correlate(
+                        x_extended[..., start:stop],
+                        weights,
+                        out=faces[..., first:end],
+                        work=None if work is None else work[..., first:end],
+                    )
+                else:
+                    if weights.ndim > 1:
+                        weights = weights[members]
+                    faces[members, first:end] = correlate(
+                        x_extended[members, start:stop], weights
+                    )
+        return faces
+
+    def xdot(
+        self, x: np.ndarray, t_i: float, out: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        conservative flux difference of the upwind face values, computed in
+        the solver's workspace and written into out if given
+        """
+        gw = self._gw
+        end = gw + x.shape[-1]
+        self._x_extended[..., gw:end] = x
+        self.periodic_boundary(self._x_extended)
+        flux = self.upwind_faces(self._x_extended, self._faces, self._work)
+        flux *= self._a
+        if out is None:
+            out = np.empty(x.shape)
+        np.subtract(flux[..., 1:], flux[..., :-1], out=out)
+        out *= -1
+        out /= self.h
+        return out
+
+
+class MultiOrderSolver(AdvectionSolver):
+    """
+    advance one initial state with the schemes of several orders in a single
+    time loop. the states of the orders are stacked as a batch, x[o] being
+    that of orders[o], and the weights of every order are padded to the
+    widest stencil so one pass of the stencil covers all orders
+    """
+
+    def __init__(self, x0, t, h, a, orders, snapshots=None):
+        if np.ndim(x0) != 1:
+            raise BaseException("x0 of a multi-order solver must be 1D.")
+        self.orders = [int(order) for order in orders]
+        super().__init__(
+            np.tile(x0, (len(self.orders), 1)), t, h, a, self.orders, snapshots
+        )
+
+    def setup_schemes(self, orders: list):
+        """
+        stacked (orders, 2 k + 1) weights of all orders, k being that of the
+        widest stencil
+        """
+        schemes = [
+            (
+                PolynomialReconstruction.construct_from_order(order, "right"),
+                PolynomialReconstruction.construct_from_order(order, "left"),
+            )
+            for order in orders
+        ]
+        self._orders = orders
+        self._schemes = schemes
+        self.right_interface_scheme = [right.nparray() for right, _ in schemes]
+        self.left_interface_scheme = [left.nparray() for _, left in schemes]
+        self._k = max(max(right.coeffs.keys()) for right, _ in schemes)
+        self._gw = self._k + 1
+        self._right_weights = np.array(
+            [self.order_weights(order, "right") for order in orders]
+        )
+        self._left_weights = np.array(
+            [self.order_weights(order, "left") for order in orders]
+        )
+
+    def results(self) -> dict:
+        """
+        {order: kept states of that order}
+        """
+        return dict((order, self.x[i]) for i, order in enumerate(self.orders))
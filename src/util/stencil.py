@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def correlate(
+    x: np.ndarray,
+    weights: np.ndarray,
+    out: np.ndarray = None,
+    work: np.ndarray = None,
+) -> np.ndarray:
+    """
+    apply a stencil along the last axis of x
+        out[..., i] = sum_j weights[..., j] * x[..., i + j]
+    as a fused weighted sum of shifted slices of x, so no window matrix is
+    built and no Python loop runs over the cells
+    x:          (..., m + width - 1) array
+    weights:    (width,) array, or (..., width) with a stencil for each row
+                of x, e.g. the stencils of several orders padded to one width
+    out:        optional (..., m) array to write into
+    work:       optional (..., m) scratch array, with out this makes the
+                call allocation-free
+    """
+    width = weights.shape[-1]
+    m = x.shape[-1] - width + 1
+    if out is None:
+        out = np.empty(x.shape[:-1] + (m,))
+    # weights[..., j] as a column that broadcasts against the rows of x
+    columns = weights[..., np.newaxis]
+    np.multiply(x[..., :m], columns[..., 0, :], out=out)
+    for j in range(1, width):
+        if not np.any(columns[..., j, :]):
+            continue
+        end = j + m
+        shifted = x[..., j:end]
+        if work is None:
+            out += columns[..., j, :] * shifted
+        else:
+            np.multiply(shifted, columns[..., j, :], out=work)
+            out += work
+    return out
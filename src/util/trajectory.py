@@ -0,0 +1,196 @@
+import json
+import os
+import struct
+import numpy as np
+
+
+# header: magic, version, metadata length, cells, times, written states,
+# offset of the states
+header_format = "<8sIIQQQQ"
+header_size = struct.calcsize(header_format)
+magic = b"FVTRAJEC"
+version = 1
+
+
+def _map(path: str, offset: int, shape: tuple) -> np.ndarray:
+    """
+    read-only float64 memory map, np.memmap can not map zero bytes
+    """
+    if 0 in shape:
+        return np.empty(shape)
+    return np.memmap(path, np.float64, "r", offset, shape)
+
+
+def _layout(metadata_length: int, n_times: int, n: int) -> tuple:
+    """
+    (times offset, grid offset, states offset) of a trajectory file, each
+    8 byte aligned
+    """
+    times_offset = header_size + metadata_length
+    times_offset += -times_offset % 8
+    grid_offset = times_offset + 8 * n_times
+    states_offset = grid_offset + 8 * n
+    return times_offset, grid_offset, states_offset
+
+
+class TrajectoryWriter:
+    """
+    write the states of an integration to a binary file, time-major
+    file layout
+        header      magic, version, metadata length, cells, times, written
+                    states, offset of the states
+        metadata    json object, e.g. {"h": ..., "a": ..., "order": ...}
+        times       float64 times of the states that will be written
+        grid        float64 cell positions
+        states      float64 (written states, cells), appended in chunks
+    states are buffered in RAM chunk_size at a time, every full chunk is
+    appended to the file and the count of written states in the header is
+    updated, so the file is readable while it is written
+    """
+
+    def __init__(
+        self,
+        path: str,
+        t: np.ndarray,
+        n: int,
+        grid: np.ndarray = None,
+        metadata: dict = None,
+        chunk_size: int = 64,
+    ):
+        self.path = path
+        self.t = np.asarray(t, dtype=np.float64)
+        self.n = n
+        self.grid = (
+            np.arange(n, dtype=np.float64)
+            if grid is None
+            else np.asarray(grid, dtype=np.float64)
+        )
+        if len(self.grid) != n:
+            raise BaseException("Grid size does not match number of cells.")
+        metadata_bytes = json.dumps(metadata or {}).encode()
+        times_offset, grid_offset, self._states_offset = _layout(
+            len(metadata_bytes), len(self.t), n
+        )
+        self._metadata_length = len(metadata_bytes)
+        self._chunk = np.empty((chunk_size, n))
+        self._buffered = 0
+        self.n_written = 0
+        self._file = open(path, "wb")
+        self._write_header()
+        self._file.write(metadata_bytes)
+        self._file.write(b"\0" * (times_offset - self._file.tell()))
+        self._file.write(self.t.tobytes())
+        self._file.write(self.grid.tobytes())
+        self._file.flush()
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(
+            struct.pack(
+                header_format,
+                magic,
+                version,
+                self._metadata_length,
+                self.n,
+                len(self.t),
+                self.n_written,
+                self._states_offset,
+            )
+        )
+
+    def append(self, x: np.ndarray):
+        """
+        buffer the next state, the chunk is written once it is full
+        """
+        if self.n_written + self._buffered == len(self.t):
+            raise BaseException("All states of the trajectory are written.")
+        self._chunk[self._buffered] = x
+        self._buffered += 1
+        if self._buffered == len(self._chunk):
+            self.flush()
+
+    def __call__(self, i: int, t_i: float, x: np.ndarray):
+        """
+        append as an integrator callback
+        """
+        self.append(x)
+
+    def flush(self):
+        """
+        append the buffered states to the file and update the header
+        """
+        buffered = self._buffered
+        if buffered:
+            end = self._states_offset + 8 * self.n * self.n_written
+            self._file.seek(end)
+            self._file.write(self._chunk[:buffered].tobytes())
+            self.n_written += buffered
+            self._buffered = 0
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Trajectory:
+    """
+    read-only view of a trajectory file, states are memory-mapped so
+    slicing a cell or a time window only reads those parts of the file
+        trajectory[i]       state i
+        trajectory[:, j]    time series of cell j
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as the_file:
+            header = the_file.read(header_size)
+            (
+                file_magic,
+                file_version,
+                metadata_length,
+                self.n,
+                n_times,
+                self.n_written,
+                states_offset,
+            ) = struct.unpack(header_format, header)
+            if file_magic != magic or file_version != version:
+                raise BaseException(f"{path} is not a trajectory file.")
+            self.metadata = json.loads(the_file.read(metadata_length))
+        times_offset, grid_offset, _ = _layout(metadata_length, n_times, 0)
+        # the times of all planned states, of which n_written are written
+        self.t_planned = _map(path, times_offset, (n_times,))
+        n_written = self.n_written
+        self.t = self.t_planned[:n_written]
+        self.grid = _map(path, grid_offset, (self.n,))
+        self.states = _map(path, states_offset, (n_written, self.n))
+
+    def __len__(self) -> int:
+        return self.n_written
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self.states[index]
+
+    def cell(self, j: int) -> np.ndarray:
+        """
+        time series of cell j
+        """
+        return self.states[:, j]
+
+    def window(self, t_start: float, t_end: float) -> tuple:
+        """
+        (times, states) of the states with t_start <= t <= t_end
+        """
+        first = np.searchsorted(self.t, t_start, side="left")
+        end = np.searchsorted(self.t, t_end, side="right")
+        return self.t[first:end], self.states[first:end]
@@ -0,0 +1,14 @@
+import pytest
+from util import fvscheme
+
+
+@pytest.fixture(autouse=True)
+def scheme_store(monkeypatch, tmp_path):
+    """
+    every test saves schemes to its own default store, seeded like the
+    user's, instead of the user cache directory
+    """
+    path = str(tmp_path / "fvscheme" / "schemes.fvs")
+    monkeypatch.setenv("FVSCHEME_STORE", path)
+    monkeypatch.setattr(fvscheme, "scheme_cache", None)
+    return path
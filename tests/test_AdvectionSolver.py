@@ -0,0 +1,668 @@
+import pytest
+import tracemalloc
+import numpy as np
+from util.mathbasic import Fraction
+from util.fvscheme import PolynomialReconstruction
+from util.solve import AdvectionSolver, MultiOrderSolver
+
+
+n_tests = 5
+n_cells = 32
+
+
+# helper functions
+def reference_xdot(solver, x):
+    """
+    the original window matrix and per-cell loop implementation of xdot
+    """
+    x_extended = np.concatenate(
+        (np.zeros(solver._gw), x, np.zeros(solver._gw))
+    )
+    solver.periodic_boundary(x_extended)
+    n = len(x)
+    a = []
+    for i in range(2 * solver._k + 1):
+        right_ind = i + n + 2
+        a.append(x_extended[i:right_ind])
+    A = np.array(a).T
+    right = (
+        A @ solver.right_interface_scheme / sum(solver.right_interface_scheme)
+    )
+    left = A @ solver.left_interface_scheme / sum(solver.left_interface_scheme)
+    Delta_x = np.zeros(n)
+    for i in range(n):
+        if solver.a > 0:
+            Delta_x[i] = right[i + 1] - right[i]
+        elif solver.a < 0:
+            Delta_x[i] = left[i + 2] - left[i + 1]
+    return -(solver.a / solver.h) * Delta_x
+
+
+def reference_faces(solver, x):
+    """
+    upwind face values by a per-face loop, face j is the left face of cell j
+    """
+    n = len(x)
+    a = np.broadcast_to(solver.a, n + 1)
+    k = solver._k
+    faces = np.zeros(n + 1)
+    for j in range(n + 1):
+        if a[j] > 0:
+            cells, weights = range(j - 1 - k, j + k), solver._right_weights
+        elif a[j] < 0:
+            cells, weights = range(j - k, j + k + 1), solver._left_weights
+        else:
+            continue
+        faces[j] = sum(w * x[c % n] for w, c in zip(weights, cells))
+    return faces
+
+
+def sinus_solver(order, a=1, n=n_cells, orbits=1):
+    h = 1 / n
+    x = np.arange(n) * h + h / 2
+    t = np.arange(0, orbits / abs(a) + 1e-12, 0.4 * h / abs(a))
+    u0 = np.sin(2 * np.pi * x)
+    return AdvectionSolver(x0=u0, t=t, h=h, a=a, order=order)
+
+
+# tests
+@pytest.mark.parametrize("order", range(1, 8))
+@pytest.mark.parametrize("a", [1, -0.5, 0])
+def test_xdot_matches_reference(order, a):
+    """
+    the vectorized stencil should reproduce the original implementation
+    """
+    x = np.random.rand(n_cells)
+    solver = AdvectionSolver(
+        x0=x, t=np.array([0, 1]), h=1 / n_cells, a=a, order=order
+    )
+    assert solver.xdot(x, 0) == pytest.approx(
+        reference_xdot(solver, x), rel=1e-12, abs=1e-12
+    )
+
+
+@pytest.mark.parametrize("order", range(1, 8))
+def test_xdot_scalar_matches_uniform_face_speeds(order):
+    """
+    a scalar velocity is the same as equal speeds at every face
+    """
+    x = np.random.rand(n_cells)
+    a = np.random.choice([-1, 1]) * np.random.rand()
+    scalar = AdvectionSolver(
+        x0=x, t=np.array([0, 1]), h=1 / n_cells, a=a, order=order
+    )
+    uniform = AdvectionSolver(
+        x0=x,
+        t=np.array([0, 1]),
+        h=1 / n_cells,
+        a=np.full(n_cells + 1, a),
+        order=order,
+    )
+    assert uniform.xdot(x, 0) == pytest.approx(scalar.xdot(x, 0), rel=1e-12)
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_upwind_faces_variable_speed(unused_parameter):
+    """
+    each face is reconstructed from its own upwind side
+    """
+    order = np.random.randint(1, 8)
+    x = np.random.rand(n_cells)
+    a = np.random.choice([-1, 0, 1], n_cells + 1) * np.random.rand(n_cells + 1)
+    a[-1] = a[0]
+    solver = AdvectionSolver(
+        x0=x, t=np.array([0, 1]), h=1 / n_cells, a=a, order=order
+    )
+    x_extended = np.concatenate(
+        (np.zeros(solver._gw), x, np.zeros(solver._gw))
+    )
+    solver.periodic_boundary(x_extended)
+    assert solver.upwind_faces(x_extended) == pytest.approx(
+        reference_faces(solver, x), rel=1e-12, abs=1e-12
+    )
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_xdot_conservative_variable_speed(unused_parameter):
+    """
+    the flux differences of periodic face speeds sum to zero
+    """
+    order = np.random.randint(1, 8)
+    x = np.random.rand(n_cells)
+    a = np.random.randn(n_cells + 1)
+    a[-1] = a[0]
+    solver = AdvectionSolver(
+        x0=x, t=np.array([0, 1]), h=1 / n_cells, a=a, order=order
+    )
+    assert np.sum(solver.xdot(x, 0)) == pytest.approx(0, abs=1e-10)
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_conservation(unused_parameter):
+    """
+    the total of the cell averages should not change in time
+    """
+    order = np.random.randint(1, 8)
+    a = np.random.choice([-1, 1])
+    solver = sinus_solver(order, a)
+    solver.x[:, 0] += np.random.rand(n_cells)
+    solver.rk4()
+    assert np.sum(solver.x[:, -1]) == pytest.approx(np.sum(solver.x[:, 0]))
+
+
+@pytest.mark.parametrize("order", [1, 3, 5])
+def test_convergence(order):
+    """
+    the error after one orbit should shrink at roughly the scheme's order
+    """
+    errors = []
+    for n in [16, 32]:
+        solver = sinus_solver(order, n=n)
+        solver.rk4()
+        errors.append(np.max(np.abs(solver.x[:, -1] - solver.x[:, 0])))
+    assert np.log2(errors[0] / errors[1]) > order - 0.5
+
+
+@pytest.mark.parametrize("method", ["euler", "rk4"])
+@pytest.mark.parametrize("a", [1, -0.5])
+def test_inplace_integration_matches_allocating(method, a):
+    """
+    the in-place stages should reproduce the allocating integrator exactly
+    """
+    order = np.random.randint(1, 8)
+    inplace = sinus_solver(order, a, orbits=0.25)
+    allocating = sinus_solver(order, a, orbits=0.25)
+    allocating.inplace = False
+    getattr(inplace, method)()
+    getattr(allocating, method)()
+    assert np.array_equal(inplace.x, allocating.x)
+
+
+@pytest.mark.parametrize("method", ["euler", "rk4"])
+def test_steady_state_stepping_allocates_nothing(method):
+    """
+    after the first run, time stepping should not allocate any n-sized array
+    """
+    n = 2**14
+    solver = AdvectionSolver(
+        x0=np.random.rand(n),
+        t=np.linspace(0, 0.01, 20),
+        h=1 / n,
+        a=1,
+        order=np.random.randint(1, 8),
+    )
+    getattr(solver, method)()  # allocate the stage buffers
+    tracemalloc.start()
+    try:
+        getattr(solver, method)()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 8 * n // 4
+
+
+def test_streamed_final_state_matches_history():
+    """
+    keeping only the final state should not change it
+    """
+    order = np.random.randint(1, 8)
+    full = sinus_solver(order, orbits=0.25)
+    streamed = AdvectionSolver(
+        x0=full.x0,
+        t=full.t,
+        h=full.h,
+        a=full.a,
+        order=order,
+        snapshots=[full.t[-1]],
+    )
+    full.rk4()
+    streamed.rk4()
+    assert streamed.x.shape == (n_cells, 2)
+    assert np.array_equal(streamed.x[:, -1], full.x[:, -1])
+
+
+@pytest.mark.parametrize("speeds", ["shared", "member", "member and face"])
+def test_batch_matches_individual_solvers(speeds):
+    """
+    a batch should advance every member as its own solver would
+    """
+    batch = 6
+    order = np.random.randint(1, 8)
+    h = 1 / n_cells
+    x0 = np.random.rand(batch, n_cells)
+    t = np.arange(0, 0.1, 0.4 * h)
+    if speeds == "shared":
+        a = 0.5
+        member_speeds = [a] * batch
+    elif speeds == "member":
+        a = np.array([1, -1, 0.5, 0, -0.25, 1])
+        member_speeds = list(a)
+    else:
+        a = np.random.randn(batch, n_cells + 1)
+        a[:, -1] = a[:, 0]
+        member_speeds = list(a)
+    batched = AdvectionSolver(x0, t, h, a, order)
+    batched.rk4()
+    for member in range(batch):
+        single = AdvectionSolver(
+            x0[member], t, h, member_speeds[member], order
+        )
+        single.rk4()
+        assert batched.x[member] == pytest.approx(single.x, rel=1e-12)
+
+
+@pytest.mark.parametrize("a", [1, -0.5])
+def test_multi_order_matches_single_orders(a):
+    """
+    every order of a multi-order run should match its own solver
+    """
+    orders = sorted(np.random.choice(range(1, 10), 4, replace=False))
+    h = 1 / n_cells
+    x0 = np.random.rand(n_cells)
+    t = np.arange(0, 0.1, 0.4 * h)
+    multi = MultiOrderSolver(x0, t, h, a, orders)
+    multi.rk4()
+    results = multi.results()
+    assert list(results.keys()) == orders
+    for order in orders:
+        single = AdvectionSolver(x0, t, h, a, order)
+        single.rk4()
+        assert results[order] == pytest.approx(single.x, rel=1e-12)
+
+
+def test_multi_order_requires_one_state():
+    with pytest.raises(BaseException, match="1D"):
+        MultiOrderSolver(
+            np.random.rand(2, n_cells), np.array([0, 1]), 1, 1, [1, 3]
+        )
+
+
+@pytest.mark.parametrize(
+    "method, order, limit",
+    [("euler", 1, 1), ("rk4", 1, 1.3925), ("ssprk104", 1, 6)],
+)
+def test_cfl_limit(method, order, limit):
+    """
+    known Courant number limits of first order upwinding
+    """
+    solver = sinus_solver(order)
+    assert solver.cfl_limit(method) == pytest.approx(limit, abs=3e-3)
+    assert solver.max_dt(method) == solver.cfl_limit(method) * solver.h
+
+
+@pytest.mark.parametrize("method", ["rk4", "ssprk3", "dp54"])
+def test_stable_at_cfl_limit(method):
+    """
+    stepping just below the limit should stay bounded, above it not
+    """
+    order = np.random.randint(1, 8)
+    h = 1 / n_cells
+    x0 = np.random.rand(n_cells)
+    peaks = []
+    for factor in [0.98, 1.1]:
+        solver = AdvectionSolver(x0, np.array([0, 1]), h, 1, order)
+        t = np.arange(0, 500) * factor * solver.max_dt(method)
+        solver = AdvectionSolver(x0, t, h, 1, order, snapshots=[t[-1]])
+        with np.errstate(all="ignore"):
+            solver.integrate(method)
+        peaks.append(np.max(np.abs(solver.x[:, -1])))
+    assert peaks[0] < 2
+    assert not peaks[1] < 2  # large or nan
+
+
+def test_adaptive_advection():
+    """
+    an adaptive run should stay below the CFL ceiling and need fewer steps
+    than the fixed 0.4 h / a of sinus_solver
+    """
+    order = 5
+    solver = sinus_solver(order, orbits=1)
+    solver.integrate_adaptive("dp54", rtol=1e-5, atol=1e-5)
+    steps = np.diff(solver.t_steps)
+    assert np.all(steps <= solver.max_dt("dp54") * (1 + 1e-12))
+    assert len(steps) < len(solver.t) - 1
+    assert np.sum(solver.x[:, -1]) == pytest.approx(np.sum(solver.x[:, 0]))
+    assert np.max(np.abs(solver.x[:, -1] - solver.x[:, 0])) < 1e-2
+
+
+@pytest.mark.parametrize("method", ["euler", "rk4", "ssprk3", "lsrk54"])
+@pytest.mark.parametrize("a", [1, -0.7])
+def test_spectral_matches_stepping(method, a):
+    """
+    jumping with the amplification factors should equal stepping
+    """
+    order = np.random.randint(1, 8)
+    if method == "euler":
+        order = 1
+    h = 1 / n_cells
+    x0 = np.random.rand(n_cells)
+    t = np.arange(0, 300) * 0.5 * h
+    stepped = AdvectionSolver(x0, t, h, a, order, snapshots=10)
+    jumped = AdvectionSolver(x0, t, h, a, order, snapshots=10)
+    stepped.integrate(method)
+    jumped.integrate_spectral(method)
+    assert jumped.x == pytest.approx(stepped.x, abs=1e-12)
+
+
+def test_spectral_batch_and_orders():
+    h = 1 / n_cells
+    t = np.arange(0, 100) * 0.5 * h
+    x0 = np.random.rand(3, n_cells)
+    stepped = AdvectionSolver(x0, t, h, 1, 3, snapshots=[t[-1]])
+    jumped = AdvectionSolver(x0, t, h, 1, 3, snapshots=[t[-1]])
+    stepped.rk4()
+    jumped.integrate_spectral()
+    assert jumped.x == pytest.approx(stepped.x, abs=1e-12)
+    stepped = MultiOrderSolver(x0[0], t, h, 1, [1, 4, 7], snapshots=[t[-1]])
+    jumped = MultiOrderSolver(x0[0], t, h, 1, [1, 4, 7], snapshots=[t[-1]])
+    stepped.rk4()
+    jumped.integrate_spectral()
+    assert jumped.x == pytest.approx(stepped.x, abs=1e-12)
+
+
+@pytest.mark.parametrize("method", ["rk4", "ssprk104"])
+def test_amplification_below_cfl_limit(method):
+    """
+    no mode should grow at the CFL limit and the mean should be conserved
+    """
+    solver = sinus_solver(np.random.randint(1, 8))
+    gain = solver.amplification(method, solver.max_dt(method))
+    assert np.all(np.abs(gain) <= 1 + 1e-12)
+    assert gain[0, 0] == pytest.approx(1)
+
+
+def test_spectral_requirements():
+    h = 1 / n_cells
+    x0 = np.random.rand(n_cells)
+    a = np.ones(n_cells + 1)
+    with pytest.raises(BaseException, match="constant a"):
+        AdvectionSolver(x0, np.array([0, 1]), h, a, 3).integrate_spectral()
+    with pytest.raises(BaseException, match="uniform steps"):
+        AdvectionSolver(x0, np.array([0, 1, 3]), h, 1, 3).integrate_spectral()
+
+
+@pytest.mark.parametrize("method", ["euler", "rk4", "ssprk3", "lsrk54"])
+@pytest.mark.parametrize("a", [1, -0.7])
+def test_fused_matches_stepping(method, a):
+    order = np.random.randint(1, 8)
+    h = 1 / n_cells
+    t = np.arange(0, 50) * 0.2 * h / abs(a)
+    x0 = np.random.rand(n_cells)
+    stepped = AdvectionSolver(x0, t, h, a, order, snapshots=10)
+    fused = AdvectionSolver(x0, t, h, a, order, snapshots=10)
+    stepped.integrate(method)
+    fused.integrate_fused(method)
+    assert fused.x == pytest.approx(stepped.x, abs=1e-12)
+    assert len(fused._fused_weights) == 1
+
+
+def test_fused_batch_and_orders():
+    h = 1 / n_cells
+    t = np.arange(0, 50) * 0.5 * h
+    x0 = np.random.rand(3, n_cells)
+    stepped = AdvectionSolver(x0, t, h, -1, 3)
+    fused = AdvectionSolver(x0, t, h, -1, 3)
+    stepped.rk4()
+    fused.integrate_fused()
+    assert fused.x == pytest.approx(stepped.x, abs=1e-12)
+    stepped = MultiOrderSolver(x0[0], t, h, 1, [1, 4, 7], snapshots=[t[-1]])
+    fused = MultiOrderSolver(x0[0], t, h, 1, [1, 4, 7], snapshots=[t[-1]])
+    stepped.rk4()
+    fused.integrate_fused()
+    assert fused.x == pytest.approx(stepped.x, abs=1e-12)
+
+
+@pytest.mark.parametrize("order", range(1, 8))
+@pytest.mark.parametrize("a", [1, -1])
+def test_fused_stencil_is_exact(order, a):
+    """
+    the rk4 stencil spans 4 (2 k + 2) - 3 cells and its weights sum to
+    exactly 1, as the operator conserves the mean
+    """
+    solver = AdvectionSolver(np.zeros(n_cells), [0, 1], 1, a, order)
+    k = solver._k
+    (stencil,) = solver.fused_stencils("rk4", Fraction(1, 3))
+    assert max(stencil) - min(stencil) + 1 == 4 * (2 * k + 2) - 3
+    assert sum(stencil.values()) == 1
+
+
+def test_fused_weights_of_exact_cfl():
+    """
+    Courant numbers equal to 12 digits share the weights of the first,
+    computed from its exact value rather than the rounded key
+    """
+    solver = AdvectionSolver(np.zeros(n_cells), [0, 1], 1, 1, 3)
+    cfl = 1 / 3
+    weights = solver.fused_weights("rk4", cfl)
+    (stencil,) = solver.fused_stencils("rk4", cfl)
+    g = len(weights) // 2
+    exact = [float(stencil.get(m, 0)) for m in range(-g, g + 1)]
+    assert weights.tolist() == exact
+    assert solver.fused_weights("rk4", cfl * (1 + 1e-15)) is weights
+    assert len(solver._fused_weights) == 1
+
+
+def test_fused_first_order_euler_is_a_shift():
+    solver = AdvectionSolver(np.zeros(n_cells), [0, 1], 1, 1, 1)
+    assert solver.fused_stencils("euler", 1) == [{-1: 1}]
+    solver = AdvectionSolver(np.zeros(n_cells), [0, 1], 1, -1, 1)
+    assert solver.fused_stencils("euler", 1) == [{1: 1}]
+
+
+def test_fused_requires_constant_a():
+    h = 1 / n_cells
+    a = np.ones(n_cells + 1)
+    solver = AdvectionSolver(np.random.rand(n_cells), [0, h], h, a, 3)
+    with pytest.raises(BaseException, match="constant a"):
+        solver.integrate_fused()
+
+
+@pytest.mark.parametrize(
+    "a_shape, x_shape",
+    [
+        ((), (n_cells,)),
+        ((n_cells + 1,), (n_cells,)),
+        ((3,), (3, n_cells)),
+        ((3, n_cells + 1), (3, n_cells)),
+    ],
+)
+def test_operator_matrix_matches_xdot(a_shape, x_shape):
+    order = np.random.randint(1, 8)
+    a = np.random.randn(*a_shape)
+    x0 = np.random.rand(*x_shape)
+    solver = AdvectionSolver(x0, [0, 1], 1 / n_cells, a, order)
+    operator = solver.operator_matrix()
+    product = np.einsum("...ij,...j->...i", operator, x0)
+    assert product == pytest.approx(solver.xdot(x0, 0), abs=1e-12)
+
+
+@pytest.mark.parametrize(
+    "method", ["backward_euler", "crank_nicolson", "sdirk2", "sdirk3"]
+)
+@pytest.mark.parametrize("a", [1, -0.7])
+def test_implicit_solvers_agree(method, a):
+    """
+    the circulant solve of a constant a, the matrix solve of the same speed
+    at every face and spectral propagation give the same states at a CFL
+    far beyond the explicit limits
+    """
+    order = np.random.randint(1, 8)
+    h = 1 / n_cells
+    t = np.arange(0, 30) * 4 * h / abs(a)
+    x0 = np.random.rand(n_cells)
+    circulant = AdvectionSolver(x0, t, h, a, order, snapshots=10)
+    matrix = AdvectionSolver(
+        x0, t, h, np.full(n_cells + 1, a), order, snapshots=10
+    )
+    spectral = AdvectionSolver(x0, t, h, a, order, snapshots=10)
+    circulant.integrate(method)
+    matrix.integrate(method)
+    spectral.integrate_spectral(method)
+    assert matrix.x == pytest.approx(circulant.x, abs=1e-12)
+    assert spectral.x == pytest.approx(circulant.x, abs=1e-12)
+    assert circulant.max_dt(method) == np.inf
+
+
+@pytest.mark.parametrize(
+    "method", ["backward_euler", "crank_nicolson", "sdirk2", "sdirk3"]
+)
+@pytest.mark.parametrize("order", range(8, 12))
+def test_implicit_unlimited_on_fine_grids(method, order):
+    """
+    the Fourier symbol of high orders on more than 1024 cells has real
+    parts of rounding size above zero, which must not limit the CFL
+    """
+    solver = AdvectionSolver(np.zeros(2048), [0, 1], 1 / 2048, 1, order)
+    assert solver.cfl_limit(method) == np.inf
+
+
+def test_implicit_convergence_at_large_cfl():
+    """
+    at CFL 4 the error of sdirk3 should fall like dt ** 3 until the
+    spatial error of the 7th order scheme is reached
+    """
+    n = 256
+    h = 1 / n
+    # cell averages of sin(2 pi x)
+    x0 = np.sin(2 * np.pi * (np.arange(n) + 0.5) * h) / (np.pi * h)
+    x0 *= np.sin(np.pi * h)
+    errors = []
+    for cfl in [8, 4]:
+        t = np.linspace(0, 1, round(1 / (cfl * h)) + 1)
+        solver = AdvectionSolver(x0, t, h, 1, 7, snapshots=[t[-1]])
+        solver.integrate("sdirk3")
+        errors.append(np.max(np.abs(solver.x[:, -1] - x0)))
+    assert np.log2(errors[0] / errors[1]) == pytest.approx(3, abs=0.3)
+
+
+@pytest.mark.parametrize("order", range(1, 8))
+@pytest.mark.parametrize("a", [1, -1])
+def test_semi_lagrangian_integer_shifts(order, a):
+    """
+    shifts by whole cells move the state exactly
+    """
+    h = 1 / n_cells
+    t = np.arange(0, 5) * 13 * h
+    x0 = np.random.rand(n_cells)
+    solver = AdvectionSolver(x0, t, h, a, order)
+    solver.integrate_semi_lagrangian()
+    for i in range(len(t)):
+        assert solver.x[:, i] == pytest.approx(np.roll(x0, 13 * i * a))
+
+
+def test_shift_stencil_of_exact_shift():
+    """
+    shifts equal to 12 digits share the stencil of the first, whose
+    weights are those of its exact fraction of a cell
+    """
+    solver = AdvectionSolver(np.zeros(n_cells), [0, 1], 1, 1, 3)
+    shift = 2 + 1 / 3
+    weights, gather = solver.shift_stencil(shift)
+    scheme = PolynomialReconstruction.construct_shifted_average(3, shift - 2)
+    g = len(weights) // 2
+    exact = [float(scheme.coeffs.get(i, 0)) for i in range(-g, g + 1)]
+    assert weights.tolist() == exact
+    assert solver.shift_stencil(shift * (1 + 1e-15))[0] is weights
+    assert len(solver._shift_stencils) == 1
+
+
+@pytest.mark.parametrize("a", [1, -1])
+def test_semi_lagrangian_large_cfl(a):
+    """
+    one orbit in steps of 12.8 cells is conservative and accurate to the
+    order of the scheme
+    """
+    n = 128
+    h = 1 / n
+    # cell averages of sin(2 pi x)
+    x0 = np.sin(2 * np.pi * (np.arange(n) + 0.5) * h) / (np.pi * h)
+    x0 *= np.sin(np.pi * h)
+    t = np.linspace(0, 1, 11)
+    errors = []
+    for order in [1, 3, 5, 7]:
+        solver = AdvectionSolver(x0, t, h, a, order, snapshots=[t[-1]])
+        solver.integrate_semi_lagrangian()
+        assert np.sum(solver.x[:, -1]) == pytest.approx(0, abs=1e-12)
+        errors.append(np.max(np.abs(solver.x[:, -1] - x0)))
+    assert errors[-1] < 1e-11
+    assert np.all(np.diff(np.log10(errors)) < -2)
+
+
+def test_semi_lagrangian_batch_and_orders():
+    h = 1 / n_cells
+    t = np.arange(0, 10) * 3.7 * h
+    x0 = np.random.rand(3, n_cells)
+    batch = AdvectionSolver(x0, t, h, -1, 4, snapshots=[t[-1]])
+    batch.integrate_semi_lagrangian()
+    single = AdvectionSolver(x0[1], t, h, -1, 4, snapshots=[t[-1]])
+    single.integrate_semi_lagrangian()
+    assert batch.x[1] == pytest.approx(single.x, abs=1e-14)
+    orders = MultiOrderSolver(x0[0], t, h, 1, [2, 5], snapshots=[t[-1]])
+    orders.integrate_semi_lagrangian()
+    for i, order in enumerate([2, 5]):
+        single = AdvectionSolver(x0[0], t, h, 1, order, snapshots=[t[-1]])
+        single.integrate_semi_lagrangian()
+        assert orders.x[i] == pytest.approx(single.x, abs=1e-14)
+    assert len(orders._shift_stencils) == 1
+
+
+def test_semi_lagrangian_requires_constant_a():
+    h = 1 / n_cells
+    a = np.ones(n_cells + 1)
+    solver = AdvectionSolver(np.random.rand(n_cells), [0, h], h, a, 3)
+    with pytest.raises(BaseException, match="constant a"):
+        solver.integrate_semi_lagrangian()
+
+
+def test_implicit_banded_batch():
+    """
+    members with their own speeds are solved by their own factorizations,
+    which are computed once per stage coefficient
+    """
+    h = 1 / n_cells
+    t = np.arange(0, 10) * 3 * h
+    x0 = np.random.rand(3, n_cells)
+    a = np.random.rand(3, n_cells + 1) + 0.5
+    batch = AdvectionSolver(x0, t, h, a, 4, snapshots=[t[-1]])
+    batch.integrate("sdirk2")
+    assert len(batch._implicit_factors) == 1
+    for i in range(3):
+        single = AdvectionSolver(x0[i], t, h, a[i], 4, snapshots=[t[-1]])
+        single.integrate("sdirk2")
+        assert batch.x[i] == pytest.approx(single.x, abs=1e-12)
+    shared = AdvectionSolver(x0, t, h, a[0], 4, snapshots=[t[-1]])
+    shared.integrate("sdirk2")
+    single = AdvectionSolver(x0[1], t, h, a[0], 4, snapshots=[t[-1]])
+    single.integrate("sdirk2")
+    assert shared.x[1] == pytest.approx(single.x, abs=1e-12)
+
+
+def test_implicit_factors_of_exact_gamma_dt():
+    """
+    values of gamma_dt equal to 12 digits share one factorization, of the
+    matrix of the exact first value
+    """
+    h = 1 / n_cells
+    a = np.random.rand(n_cells + 1) + 0.5
+    solver = AdvectionSolver(np.zeros(n_cells), [0, h], h, a, 3)
+    rhs = np.random.rand(n_cells)
+    gamma_dt = h / 3
+    y = np.zeros(n_cells)
+    solver.solve_implicit(rhs, 0, gamma_dt, y)
+    matrix = np.eye(n_cells) - gamma_dt * solver.operator_matrix()
+    assert y == pytest.approx(np.linalg.solve(matrix, rhs), abs=1e-12)
+    solver.solve_implicit(rhs, 0, gamma_dt * (1 + 1e-15), y)
+    assert len(solver._implicit_factors) == 1
+
+
+def test_list_x0():
+    """
+    x0 given as a list of numbers keeps the full history
+    """
+    x0 = [0.0] + list(range(1, 10))
+    solver = AdvectionSolver(x0, [0, 0.01, 0.02], 0.1, 1, 3)
+    solver.rk4()
+    reference = AdvectionSolver(np.array(x0), [0, 0.01, 0.02], 0.1, 1, 3)
+    reference.rk4()
+    assert solver.x.shape == (10, 3)
+    assert np.array_equal(solver.x, reference.x)
@@ -0,0 +1,133 @@
+import os
+import signal
+import time
+import pytest
+import numpy as np
+from util.decompose import BlockSolver, DecomposedAdvectionSolver
+from util.solve import AdvectionSolver
+
+
+n_cells = 60
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+@pytest.mark.parametrize("method", ["euler", "rk4", "ssprk3", "dp54"])
+@pytest.mark.parametrize("speeds", ["positive", "negative", "faces"])
+def test_matches_serial_solver(workers, method, speeds):
+    """
+    the halo exchange should reproduce the serial states to the last bit
+    """
+    order = np.random.randint(1, 8)
+    h = 1 / n_cells
+    t = np.arange(0, 20) * 0.3 * h
+    x0 = np.random.rand(n_cells)
+    a = {
+        "positive": 1,
+        "negative": -0.5,
+        "faces": np.random.randn(n_cells + 1),
+    }[speeds]
+    serial = AdvectionSolver(x0, t, h, a, order, snapshots=6)
+    decomposed = DecomposedAdvectionSolver(
+        x0, t, h, a, order, snapshots=6, workers=workers
+    )
+    serial.integrate(method)
+    decomposed.integrate(method)
+    assert np.array_equal(decomposed.x, serial.x)
+    assert np.array_equal(decomposed.t_snapshots, serial.t_snapshots)
+
+
+def test_full_history_with_spawned_workers():
+    h = 1 / n_cells
+    t = np.arange(0, 10) * 0.4 * h
+    x0 = np.random.rand(n_cells)
+    serial = AdvectionSolver(x0, t, h, 1, 5)
+    decomposed = DecomposedAdvectionSolver(
+        x0, t, h, 1, 5, workers=2, start_method="spawn"
+    )
+    serial.rk4()
+    decomposed.rk4()
+    assert np.array_equal(decomposed.x, serial.x)
+
+
+def test_requirements():
+    h = 1 / n_cells
+    x0 = np.random.rand(n_cells)
+    with pytest.raises(BaseException, match="must be 1D"):
+        DecomposedAdvectionSolver(np.zeros((2, n_cells)), [0, h], h, 1, 3)
+    with pytest.raises(BaseException, match="smaller than the ghost width"):
+        DecomposedAdvectionSolver(x0, [0, h], h, 1, 7, workers=20)
+    solver = DecomposedAdvectionSolver(x0, [0, h], h, 1, 3, workers=2)
+    with pytest.raises(BaseException, match="Invalid decomposed method"):
+        solver.integrate("sdirk3")
+
+
+def failing_boundary(signal_number=None, delay=None):
+    """
+    a periodic_boundary that kills or stalls block 1 at its third stage
+    """
+    original = BlockSolver.periodic_boundary
+
+    def periodic_boundary(self, x_extended, gw=None):
+        if self.rank == 1 and self._exchanges == 2:
+            if signal_number is not None:
+                os.kill(os.getpid(), signal_number)
+            time.sleep(delay)
+        original(self, x_extended, gw)
+
+    return periodic_boundary
+
+
+def decomposed_run(monkeypatch, boundary, timeout=60):
+    monkeypatch.setattr(BlockSolver, "periodic_boundary", boundary)
+    h = 1 / n_cells
+    solver = DecomposedAdvectionSolver(
+        np.random.rand(n_cells),
+        np.arange(0, 10) * 0.4 * h,
+        h,
+        1,
+        3,
+        workers=3,
+        start_method="fork",
+        timeout=timeout,
+    )
+    start = time.perf_counter()
+    with pytest.raises(BaseException, match="worker of the decomposed"):
+        solver.rk4()
+    return time.perf_counter() - start
+
+
+def test_killed_worker_fails(monkeypatch):
+    """
+    a worker killed by a signal breaks the barrier of the others at once
+    """
+    boundary = failing_boundary(signal_number=signal.SIGKILL)
+    assert decomposed_run(monkeypatch, boundary) < 30
+
+
+def test_barrier_timeout(monkeypatch):
+    """
+    the others give up on a stalled worker after the timeout
+    """
+    boundary = failing_boundary(delay=2)
+    assert decomposed_run(monkeypatch, boundary, timeout=0.2) < 30
+
+
+def test_block_keeps_shared_states():
+    """
+    a block writes its kept states into the shared array given to it
+    """
+    h = 1 / n_cells
+    x = np.zeros((n_cells, 10))
+    solver = BlockSolver(
+        np.random.rand(n_cells),
+        np.arange(0, 10) * 0.4 * h,
+        h,
+        1,
+        3,
+        None,
+        0,
+        np.zeros((2, 1, 2, 3)),
+        None,
+        x,
+    )
+    assert solver.x is x
@@ -0,0 +1,103 @@
+# test the DensePolynome and DenseLagrange classes against their dictionary
+# backed counterparts
+import pytest
+from random import sample, randint, random
+from util.fvscheme import Kernel
+from util.polynome import Polynome, Lagrange, DensePolynome, DenseLagrange
+
+
+n_tests = 5
+max_degree = 10
+max_coeff = 10
+l_max = 4
+r_max = 4
+
+
+# helper functions
+def create_rand_poly():
+    """
+    generate a random polynomial
+    """
+    degrees = sample(range(max_degree + 1), randint(0, max_degree + 1))
+    coeffs = dict([(i, randint(-max_coeff, max_coeff)) for i in degrees])
+    return Polynome(coeffs)
+
+
+def random_Lagrange_pair():
+    """
+    generate the same random Lagrange polynomial in both representations
+    """
+    kern = Kernel(randint(0, l_max), randint(0, r_max), randint(-l_max, r_max))
+    i = randint(0, kern.size)
+    return (
+        Lagrange.Lagrange_i(kern.x_cell_faces, i),
+        DenseLagrange.Lagrange_i(kern.x_cell_faces, i),
+    )
+
+
+# tests
+def test_zero_init():
+    """
+    creating a 0 polynomial
+    """
+    assert DensePolynome([]) == DensePolynome([0, 0]) == DensePolynome.zero()
+    assert DensePolynome.zero().coeffs == Polynome.zero().coeffs
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_round_trip(unused_parameter):
+    """
+    converting to the dense representation and back is lossless
+    """
+    rand_poly = create_rand_poly()
+    assert DensePolynome.from_polynome(rand_poly).coeffs == rand_poly.coeffs
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_arithmetic_matches_Polynome(unused_parameter):
+    """
+    sums, differences, products and derivatives should match Polynome
+    """
+    p1, p2 = create_rand_poly(), create_rand_poly()
+    d1, d2 = DensePolynome.from_polynome(p1), DensePolynome.from_polynome(p2)
+    assert (d1 + d2).coeffs == (p1 + p2).coeffs
+    assert (d1 - d2).coeffs == (p1 - p2).coeffs
+    assert (d1 * d2).coeffs == (p1 * p2).coeffs
+    assert (3 * d1).coeffs == (3 * p1).coeffs
+    assert d1.prime().coeffs == p1.prime().coeffs
+    x = 3 * (random() - 0.5)
+    assert d1.eval(x) == pytest.approx(p1.eval(x))
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_in_place_operations(unused_parameter):
+    """
+    in-place accumulation and the linear factor fast path match the
+    out-of-place operations
+    """
+    p1, p2 = create_rand_poly(), create_rand_poly()
+    d1 = DensePolynome.from_polynome(p1)
+    d2 = DensePolynome.from_polynome(p2)
+    root = randint(-max_coeff, max_coeff)
+    expected = (d1 + d2) * DensePolynome([-root, 1])
+    d1 += d2
+    assert d1.mul_linear(root) == expected
+    assert DensePolynome([0]).mul_linear(root) == DensePolynome([0])
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_Lagrange_matches(unused_parameter):
+    """
+    Lagrange polynomials, their sums and derivatives should match Lagrange
+    """
+    lagrange1, dense1 = random_Lagrange_pair()
+    lagrange2, dense2 = random_Lagrange_pair()
+    assert dense1 == DenseLagrange.from_lagrange(lagrange1)
+    total, dense_total = lagrange1 + lagrange2, dense1 + dense2
+    assert dense_total.coeffs == total.coeffs
+    assert dense_total.denominator == total.denominator
+    assert (dense1 - dense2).prime().coeffs == (
+        lagrange1 - lagrange2
+    ).prime().coeffs
+    x = randint(-l_max, r_max)
+    assert dense_total.eval(x, div="fraction") == total.eval(x, div="fraction")
@@ -1,6 +1,8 @@
 # test the Fraction module
 import pytest
 import numpy as np
+import fractions
+import math
 from util.mathbasic import Fraction
 
 
@@ -48,7 +50,131 @@ def test_inverse_element(unused_parameter, frac):
     """
     fraction = frac
     while fraction.numerator == 0:
-        fraction.numerator = np.random.randint(-max_int - 1, max_int + 1)
+        fraction = Fraction(
+            np.random.randint(-max_int - 1, max_int + 1), fraction.denominator
+        )
     assert (Fraction(1, 1) / fraction) == Fraction(
         fraction.denominator, fraction.numerator
     )
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_hash_and_interop(unused_parameter, frac):
+    """
+    a fraction should hash and compare like the equal fractions.Fraction and
+    mix with ints and fractions.Fraction in arithmetic
+    """
+    fraction = frac
+    reference = fractions.Fraction(fraction.numerator, fraction.denominator)
+    assert fraction == reference
+    assert hash(fraction) == hash(reference)
+    assert hash(fraction * 3 / 3) == hash(fraction)
+    assert {fraction: 1}[reference] == 1
+    assert fraction + 1 == reference + 1
+    assert 1 - fraction == 1 - reference
+    assert fraction * reference == reference**2
+    assert fraction**3 == reference**3
+    assert fractions.Fraction(fraction) == reference
+    assert (fraction < 1) == (reference < 1)
+    assert float(fraction) == pytest.approx(float(reference))
+
+
+def test_lazy_normalization():
+    """
+    arithmetic results are reduced when their parts are requested
+    """
+    third = Fraction(1, 3)
+    assert third + third + third == 1
+    assert hash(third + third + third) == hash(1)
+    assert (Fraction(2, 6) + Fraction(1, 6)).denominator == 2
+    assert str(Fraction(4, -8)) == "-1/2"
+    assert str(Fraction(6, 3)) == "2/1"
+    assert Fraction(0, 7) == Fraction.zero()
+
+
+def test_immutable_and_interned():
+    """
+    fractions cannot be modified and common values are shared
+    """
+    with pytest.raises(AttributeError):
+        Fraction(1, 2).numerator = 3
+    assert Fraction.zero() is Fraction(0, 1)
+    assert Fraction(1, 2) is Fraction(1, 2)
+    assert Fraction(1, 1) is Fraction(1, 1)
+    with pytest.raises(TypeError):
+        Fraction(1.5, 2)
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_integral_operations(unused_parameter, frac):
+    """
+    a fraction should truncate, round, floor divide and take remainders like
+    the equal fractions.Fraction, as registered with numbers.Rational
+    """
+    fraction = frac
+    reference = fractions.Fraction(fraction.numerator, fraction.denominator)
+    assert math.trunc(fraction) == int(fraction) == int(reference)
+    assert math.floor(fraction) == math.floor(reference)
+    assert math.ceil(fraction) == math.ceil(reference)
+    assert round(fraction) == round(reference)
+    assert round(Fraction(5, 2)) == 2 and round(Fraction(-7, 2)) == -4
+    for ndigits in [-1, 0, 1, 2]:
+        assert round(fraction * 37, ndigits) == round(reference * 37, ndigits)
+    for other in [3, -2, fractions.Fraction(-3, 7), Fraction(5, 4)]:
+        assert fraction // other == reference // other
+        assert fraction % other == reference % other
+        assert other // (fraction or 1) == other // (reference or 1)
+        assert other % (fraction or 1) == other % (reference or 1)
+        assert divmod(fraction, other) == (
+            reference // other,
+            reference % other,
+        )
+    with pytest.raises(BaseException, match="zero denominator"):
+        fraction // 0
+
+
+def test_operand_growth_bounded():
+    """
+    chained arithmetic keeps the operands near the size of the reduced
+    value instead of growing them without bound
+    """
+    total = Fraction(0)
+    for k in range(1, 60):
+        total = total + Fraction(1, k) * Fraction(k, k + 1)
+    reduced = max(total.numerator.bit_length(), total.denominator.bit_length())
+    assert total._numerator.bit_length() <= reduced + 64
+    assert total._denominator.bit_length() <= reduced + 64
+    x = Fraction(1, 3)
+    for _ in range(100):
+        x = x * 3 * Fraction(1, 3)
+        assert x._denominator.bit_length() <= 66
+    assert x == Fraction(1, 3)
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_long_arithmetic(unused_parameter):
+    """
+    results past the reduction threshold match fractions.Fraction and are
+    reduced
+    """
+    pairs = [
+        (
+            np.random.randint(-(2**20), 2**20)
+            * 6 ** np.random.randint(30),
+            np.random.randint(1, 2**20) * 6 ** np.random.randint(30),
+        )
+        for _ in range(2)
+    ]
+    a, b = (Fraction(n, d) for n, d in pairs)
+    ra, rb = (fractions.Fraction(n, d) for n, d in pairs)
+    for result, reference in [
+        (a + b, ra + rb),
+        (a - b, ra - rb),
+        (a * b, ra * rb),
+        (a / b if b else a, ra / rb if rb else ra),
+    ]:
+        assert result == reference
+        assert (result._numerator, result._denominator) == (
+            reference.numerator,
+            reference.denominator,
+        ) or result._denominator.bit_length() <= 64
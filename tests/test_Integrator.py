@@ -2,7 +2,9 @@ import pytest
 import numpy as np
 import math
 import random
+import tracemalloc
 from util.integrate import Integrator
+from util.rungekutta import tableaus
 
 
 n_tests = 5
@@ -49,3 +51,282 @@ def test_damped_oscillator(unused_parameter):
 
     # compare
     assert dho.x[0, -1] == pytest.approx(analytical_solution(t[-1]))
+
+
+class Decay(Integrator):
+    """
+    state vector: independent exponential decays xdot = -rate * x
+    """
+
+    def __init__(self, x0, t, rate, snapshots=None):
+        super().__init__(x0, t, snapshots)
+        self.rate = rate
+
+    def xdot(self, x, t_i):
+        return -self.rate * x
+
+
+def random_decay(snapshots=None, n=8, n_steps=101):
+    x0 = np.random.rand(n)
+    rate = np.random.rand(n)
+    t = np.linspace(0, 1, n_steps)
+    return Decay(x0, t, rate, snapshots)
+
+
+@pytest.mark.parametrize("method", ["euler", "rk4"])
+@pytest.mark.parametrize("k", [1, 3, 7, 100, 1000])
+def test_snapshots_every_k_steps(method, k):
+    """
+    every k-th state and the last should match the full history
+    """
+    full = random_decay()
+    streamed = Decay(full.x0, full.t, full.rate, snapshots=k)
+    getattr(full, method)()
+    getattr(streamed, method)()
+    indices = sorted(set(range(0, len(full.t), k)) | {len(full.t) - 1})
+    assert np.array_equal(streamed.snapshot_indices, indices)
+    assert np.array_equal(streamed.t_snapshots, full.t[indices])
+    assert np.array_equal(streamed.x, full.x[:, indices])
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_snapshots_at_output_times(unused_parameter):
+    """
+    the first step at or after each output time is kept, with step 0
+    """
+    full = random_decay()
+    times = np.sort(np.random.rand(5))
+    streamed = Decay(full.x0, full.t, full.rate, snapshots=times)
+    full.rk4()
+    streamed.rk4()
+    assert streamed.t_snapshots[0] == 0
+    for time in times:
+        assert streamed.t_snapshots[
+            np.searchsorted(streamed.t_snapshots, time)
+        ] == pytest.approx(full.t[np.searchsorted(full.t, time)])
+    assert np.array_equal(streamed.x, full.x[:, streamed.snapshot_indices])
+
+
+def test_invalid_snapshots():
+    with pytest.raises(BaseException, match="interval"):
+        random_decay(snapshots=0)
+    with pytest.raises(BaseException, match="Output times"):
+        random_decay(snapshots=[2])
+
+
+def test_callback():
+    """
+    the callback sees every kept snapshot in order
+    """
+    seen = []
+    decay = random_decay(snapshots=10)
+    decay.rk4(callback=lambda i, t_i, x: seen.append((i, t_i, x.copy())))
+    assert [i for i, _, _ in seen] == list(decay.snapshot_indices)
+    assert np.array_equal(np.array([x for _, _, x in seen]).T, decay.x)
+
+
+def test_list_x0():
+    """
+    x0 given as a list integrates like the equal array
+    """
+    t = np.linspace(0, 1, 11)
+    listed, array = Decay([1.0, 2, 3], t, 0.5), Decay(
+        np.arange(1, 4.0), t, 0.5
+    )
+    listed.rk4()
+    array.rk4()
+    assert listed.x.shape == (3, 11)
+    assert np.array_equal(listed.x, array.x)
+
+
+def test_steps_generator():
+    """
+    the generator yields every step of the full history
+    """
+    decay = random_decay()
+    decay.rk4()
+    for i, t_i, x in decay.steps("rk4"):
+        assert t_i == decay.t[i]
+        assert np.array_equal(x, decay.x[:, i])
+
+
+def test_steps_list_x0():
+    """
+    the generator starts from a list x0 like from the equal array
+    """
+    t = np.linspace(0, 1, 5)
+    listed = list(Decay([1, 2, 3], t, 0.5).steps("rk4"))
+    array = list(Decay(np.arange(1, 4.0), t, 0.5).steps("rk4"))
+    assert listed[0][2].dtype == float
+    assert all(
+        np.array_equal(x, y) for (_, _, x), (_, _, y) in zip(listed, array)
+    )
+
+
+def test_streaming_memory_independent_of_steps():
+    """
+    keeping only the last state should take O(n) memory for any step count
+    """
+    n = 2**12
+    peaks = []
+    for n_steps in [10, 1000]:
+        tracemalloc.start()
+        try:
+            decay = random_decay(snapshots=[1], n=n, n_steps=n_steps)
+            decay.rk4()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peaks.append(peak)
+    assert peaks[1] < 1.5 * peaks[0]
+    assert peaks[1] < 20 * 8 * n
+
+
+class ForcedOscillator(Integrator):
+    """
+    state vector: (x, xdot) of x'' + x = cos t, with x(0) = 1, x'(0) = 0
+    solved by x = cos t + t sin t / 2
+    """
+
+    def xdot(self, x, t_i):
+        return np.array([x[1], -x[0] + np.cos(t_i)])
+
+
+def forced_oscillator_solution(t):
+    return np.cos(t) + t * np.sin(t) / 2
+
+
+@pytest.mark.parametrize("method", ["bs32", "dp54"])
+@pytest.mark.parametrize("rtol", [1e-4, 1e-7])
+def test_adaptive_error_control(method, rtol):
+    """
+    the error at the output times should follow the tolerance
+    """
+    t = np.linspace(0, 10, 7)
+    oscillator = ForcedOscillator(np.array([1.0, 0.0]), t)
+    oscillator.integrate_adaptive(method, rtol=rtol, atol=rtol)
+    error = np.max(np.abs(oscillator.x[0] - forced_oscillator_solution(t)))
+    assert error < 100 * rtol
+    assert oscillator.t_steps[0] == 0
+    assert oscillator.t_steps[-1] == 10
+    assert oscillator.step_counts["accepted"] == len(oscillator.t_steps) - 1
+
+
+def test_adaptive_tighter_tolerance_takes_more_steps():
+    t = np.array([0, 10])
+    counts = []
+    for rtol in [1e-4, 1e-8]:
+        oscillator = ForcedOscillator(np.array([1.0, 0.0]), t)
+        oscillator.integrate_adaptive("dp54", rtol=rtol, atol=rtol)
+        counts.append(oscillator.step_counts["accepted"])
+    assert counts[0] < counts[1]
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_dense_output(unused_parameter):
+    """
+    output times between the steps should be interpolated to about the
+    accuracy of the steps
+    """
+    t = np.concatenate(([0], np.sort(np.random.rand(20)) * 10))
+    oscillator = ForcedOscillator(np.array([1.0, 0.0]), t)
+    oscillator.integrate_adaptive("dp54", rtol=1e-8, atol=1e-8)
+    assert len(oscillator.t_steps) < len(t) * 5
+    assert oscillator.x[0] == pytest.approx(
+        forced_oscillator_solution(t), abs=1e-5
+    )
+
+
+def test_hermite_is_exact_for_cubics():
+    """
+    x = t^3 - t on [1, 3]
+    """
+    theta = np.random.rand()
+    t = 1 + 2 * theta
+    dense = Integrator.hermite(
+        np.array([0.0]),
+        np.array([24.0]),
+        np.array([2.0]),
+        np.array([26.0]),
+        2,
+        theta,
+    )
+    assert dense[0] == pytest.approx(t**3 - t)
+
+
+def test_adaptive_list_x0():
+    t = np.array([0, 10])
+    listed = ForcedOscillator([1, 0], t)
+    listed.integrate_adaptive("dp54")
+    array = ForcedOscillator(np.array([1.0, 0.0]), t)
+    array.integrate_adaptive("dp54")
+    assert np.array_equal(listed.x, array.x)
+
+
+def test_dp54_continuous_extension_order():
+    """
+    the error of the dp54 continuous extension within one step should fall
+    like dt^5, one order faster than cubic Hermite interpolation
+    """
+    tableau = tableaus["dp54"]
+    theta = np.random.uniform(0.2, 0.8)
+    errors = []
+    for dt in [0.4, 0.2, 0.1]:
+        decay = Decay(np.array([1.0]), [0, dt], 1)
+        x, out, error = np.array([1.0]), np.empty(1), np.empty(1)
+        tableau.step_embedded(decay, x, 0, dt, out, error)
+        dense = tableau.dense_output(decay, x, dt, theta)
+        hermite = Integrator.hermite(x, out, -x, -out, dt, theta)
+        exact = np.exp(-theta * dt)
+        assert abs(dense[0] - exact) < abs(hermite[0] - exact)
+        errors.append(abs(dense[0] - exact))
+    assert errors[0] / errors[1] > 24 and errors[1] / errors[2] > 24
+
+
+def test_dp54_dense_output_error():
+    """
+    outputs far denser than the accepted steps should be as accurate as the
+    states at the steps
+    """
+    t = np.linspace(0, 10, 2001)
+    oscillator = ForcedOscillator(np.array([1.0, 0.0]), t)
+    oscillator.integrate_adaptive("dp54", rtol=1e-6, atol=1e-6)
+    assert len(oscillator.t_steps) < len(t) / 10
+    at_steps = ForcedOscillator(np.array([1.0, 0.0]), oscillator.t_steps)
+    at_steps.integrate_adaptive("dp54", rtol=1e-6, atol=1e-6)
+    step_error = np.max(
+        np.abs(at_steps.x[0] - forced_oscillator_solution(at_steps.t))
+    )
+    dense_error = np.max(
+        np.abs(oscillator.x[0] - forced_oscillator_solution(t))
+    )
+    assert dense_error < 2 * step_error
+
+
+def test_adaptive_requires_embedded_method():
+    with pytest.raises(BaseException, match="Not an embedded method"):
+        random_decay().integrate_adaptive("rk4")
+
+
+class Blowup(Integrator):
+    """
+    xdot = x^2 blows up at t = 1 for x0 = 1
+    """
+
+    def xdot(self, x, t_i):
+        return x**2
+
+
+class NotANumber(Integrator):
+    def xdot(self, x, t_i):
+        return np.full_like(x, np.nan)
+
+
+def test_adaptive_stops_at_tiny_steps():
+    with pytest.raises(BaseException, match="too small"):
+        Blowup(np.array([1.0]), [0, 2]).integrate_adaptive("dp54")
+
+
+def test_adaptive_stops_at_nan():
+    with pytest.raises(BaseException, match="not finite"):
+        NotANumber(np.array([1.0]), [0, 1]).integrate_adaptive("bs32")
@@ -2,7 +2,9 @@
 import pytest
 from random import sample, randint
 from util.fvscheme import Kernel
-from util.polynome import Lagrange
+import numpy as np
+from util.mathbasic import Fraction
+from util.polynome import Lagrange, DenseLagrange
 
 
 n_tests = 5
@@ -92,3 +94,24 @@ def test_zero_diff(unused_parameter):
     """
     lagrange = random_Lagrange()
     assert lagrange.zero() - lagrange == -lagrange
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_eval_many(unused_parameter):
+    """
+    batch evaluation should match the exact and true division point
+    evaluations
+    """
+    lagrange = random_Lagrange()
+    dense = DenseLagrange.from_lagrange(lagrange)
+    int_points = list(range(-l_max, r_max + 1))
+    exact = [lagrange.eval(x, div="fraction") for x in int_points]
+    assert lagrange.eval_many(int_points) == exact
+    assert dense.eval_many(int_points) == exact
+    assert (
+        lagrange.eval_many([Fraction(2 * x, 2) for x in int_points]) == exact
+    )
+    float_points = np.array(int_points, dtype=float) + 0.5
+    true_values = [lagrange.eval(x) for x in float_points]
+    assert lagrange.eval_many(float_points) == pytest.approx(true_values)
+    assert dense.eval_many(float_points) == pytest.approx(true_values)
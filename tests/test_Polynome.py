@@ -1,6 +1,8 @@
 # test Polynome class, which also tests the LinearCombination class
 import pytest
 from random import sample, randint, random
+import numpy as np
+from util.mathbasic import Fraction
 from util.polynome import Polynome
 
 
@@ -155,3 +157,26 @@ def test_derivative_of_a_product(unused_parameter):
         rand_poly1 * rand_poly2.prime() + rand_poly1.prime() * rand_poly2
     )
     assert derivative_of_products == product_rule
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_eval_many(unused_parameter):
+    """
+    batch evaluation should match point by point evaluation, exactly for
+    integer and rational points and as a float64 array for float points
+    """
+    rand_poly = create_rand_poly()
+    int_points = [randint(-3, 3) for _ in range(5)]
+    assert rand_poly.eval_many(int_points) == [
+        Fraction(rand_poly.eval(x), 1) for x in int_points
+    ]
+    rational_points = [
+        Fraction(randint(-9, 9), randint(1, 9)) for _ in range(5)
+    ]
+    for x, value in zip(rational_points, rand_poly.eval_many(rational_points)):
+        assert isinstance(value, Fraction)
+        assert float(value) == pytest.approx(rand_poly.eval(float(x)))
+    float_points = np.linspace(-1.5, 1.5, 7)
+    values = rand_poly.eval_many(float_points)
+    assert isinstance(values, np.ndarray) and values.dtype == np.float64
+    assert values == pytest.approx([rand_poly.eval(x) for x in float_points])
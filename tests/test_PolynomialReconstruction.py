@@ -1,6 +1,12 @@
+import pytest
 import numpy as np
 from util.mathbasic import Fraction
-from util.fvscheme import Kernel, PolynomialReconstruction
+from util.fvscheme import (
+    Kernel,
+    PolynomialReconstruction,
+    lagrange_weight_primes,
+    canonical_schemes,
+)
 
 
 n_tests = 5
@@ -209,3 +215,180 @@ def test_nparray():
         )
         == scheme_np / sum(scheme_np)
     )
+
+
+@pytest.mark.parametrize("left", range(4))
+@pytest.mark.parametrize("right", range(4))
+@pytest.mark.parametrize("reconstruct_here", ["right", "left", "center"])
+def test_solve_matches_lagrange_kernel(left, right, reconstruct_here):
+    """
+    the moment system solver should reproduce the Lagrange construction on
+    every kernel shape
+    """
+    kern = Kernel(left, right, np.random.randint(-left - 1, right + 1))
+    assert PolynomialReconstruction.construct_from_kernel(
+        kern, reconstruct_here, method="lagrange"
+    ) == PolynomialReconstruction.construct_from_kernel(
+        kern, reconstruct_here, method="solve"
+    )
+
+
+@pytest.mark.parametrize("order", range(1, 10))
+@pytest.mark.parametrize("reconstruct_here", ["right", "left"])
+def test_solve_matches_saved_schemes(order, reconstruct_here):
+    """
+    the saved schemes were generated with the Lagrange construction
+    """
+    assert PolynomialReconstruction.compute_from_order(
+        order, reconstruct_here, method="solve"
+    ) == PolynomialReconstruction.construct_from_order(order, reconstruct_here)
+
+
+def test_solve_unknown_method():
+    """
+    an unknown generation method should raise
+    """
+    with pytest.raises(
+        BaseException, match="Invalid scheme generation method"
+    ):
+        PolynomialReconstruction.construct_from_kernel(
+            Kernel(1, 1), "right", method="unknown"
+        )
+
+
+def test_lagrange_basis_cache_shared():
+    """
+    both faces, the center and the mirrored kernel of the same size should
+    reuse a single set of weight polynomials
+    """
+    lagrange_weight_primes.cache_clear()
+    for kern in [Kernel(2, 1), Kernel(1, 2), Kernel(1, 2, 3)]:
+        for reconstruct_here in ["right", "left", "center"]:
+            PolynomialReconstruction.construct_from_kernel(
+                kern, reconstruct_here
+            )
+    cache_info = lagrange_weight_primes.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 8
+
+
+@pytest.mark.parametrize("order", range(1, 16))
+@pytest.mark.parametrize("reconstruct_here", ["right", "left", "center"])
+def test_solve_matches_lagrange_order(order, reconstruct_here):
+    """
+    both generation engines should agree on every order up to 15
+    """
+    assert PolynomialReconstruction.compute_from_order(
+        order, reconstruct_here, method="lagrange"
+    ) == PolynomialReconstruction.compute_from_order(
+        order, reconstruct_here, method="solve"
+    )
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_weight_matrix(unused_parameter):
+    """
+    each row of the batched weights should equal the per-point scheme in
+    exact mode and approximate it in float mode
+    """
+    left, right = np.random.randint(0, 4, size=2)
+    kern = Kernel(left, right, np.random.randint(-left - 1, right + 1))
+    nodes, _ = np.polynomial.legendre.leggauss(3)
+    points = ["right", "left", "center", Fraction(1, 3), Fraction(-1, 5)]
+    points += list(nodes / 2)
+    exact = PolynomialReconstruction.weight_matrix(kern, points)
+    floats = PolynomialReconstruction.weight_matrix(kern, points, "float")
+    assert exact.shape == floats.shape == (len(points), kern.size)
+    assert floats.dtype == np.float64
+    for row, float_row, point in zip(exact, floats, points):
+        scheme = PolynomialReconstruction.construct_from_kernel(kern, point)
+        assert PolynomialReconstruction(dict(zip(kern.indices, row))) == scheme
+        assert scheme == PolynomialReconstruction.construct_from_kernel(
+            kern, point, method="solve"
+        )
+        assert float_row == pytest.approx(
+            np.array([float(i) for i in row]), abs=1e-12
+        )
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+@pytest.mark.parametrize("method", ["lagrange", "solve"])
+def test_construct_by_symmetry(unused_parameter, method):
+    """
+    schemes derived by reflection and shift should match the brute force
+    construction
+    """
+    left, right = np.random.randint(0, 5, size=2)
+    kern = Kernel(left, right, np.random.randint(-left - 1, right + 1))
+    for point in ["right", "left", "center", Fraction(1, 3), Fraction(-2, 7)]:
+        assert PolynomialReconstruction.construct_by_symmetry(
+            kern, point, method
+        ) == PolynomialReconstruction.construct_from_kernel(
+            kern, point, method
+        )
+
+
+def test_symmetric_order_schemes():
+    """
+    left and right schemes of an order are mirror images, and an even order
+    shares its sub-kernel schemes between both faces
+    """
+    canonical_schemes.clear()
+    for order in range(1, 8):
+        right = PolynomialReconstruction.compute_from_order(order, "right")
+        left = PolynomialReconstruction.compute_from_order(order, "left")
+        assert left == right.reflect()
+    # odd orders need one scheme, even orders two
+    assert len(canonical_schemes) == 4 * 1 + 3 * 2
+
+
+@pytest.mark.parametrize("left", range(4))
+@pytest.mark.parametrize("right", range(4))
+def test_subinterval_of_whole_cells(left, right):
+    """
+    integrals over whole cells of the kernel are the cell averages
+    """
+    kernel = Kernel(left, right)
+    scheme = PolynomialReconstruction.subinterval_from_kernel(
+        kernel, Fraction(-1, 2), Fraction(3, 2) if right else Fraction(1, 2)
+    )
+    expected = {0: Fraction(1), 1: Fraction(1)} if right else {0: 1}
+    assert dict((i, c) for i, c in scheme.coeffs.items() if c) == expected
+
+
+@pytest.mark.parametrize("order", range(1, 9))
+def test_shifted_average_is_exact_for_polynomials(order):
+    """
+    the shifted average of the cell averages of a polynomial of degree
+    < order is the exact average over the shifted cell
+    """
+    shift = Fraction(np.random.randint(1, 100), 100)
+    scheme = PolynomialReconstruction.construct_shifted_average(order, shift)
+    polynomial = [Fraction(np.random.randint(-9, 10)) for _ in range(order)]
+
+    def average(a, b):
+        # mean of the polynomial from a to b
+        return sum(
+            c * (b ** (m + 1) - a ** (m + 1)) / (m + 1)
+            for m, c in enumerate(polynomial)
+        ) / (b - a)
+
+    half = Fraction(1, 2)
+    value = sum(
+        c * average(i - half, i + half) for i, c in scheme.coeffs.items()
+    )
+    assert value == average(-half - shift, half - shift)
+    assert sum(scheme.coeffs.values()) == 1
+
+
+def test_shifted_average_limits():
+    assert PolynomialReconstruction.construct_shifted_average(5, 0).coeffs == {
+        0: 1
+    }
+    scheme = PolynomialReconstruction.construct_shifted_average(
+        1, Fraction(1, 4)
+    )
+    assert scheme.coeffs == {-1: Fraction(1, 4), 0: Fraction(3, 4)}
+    assert PolynomialReconstruction.construct_shifted_average(
+        3, 0.5
+    ) is PolynomialReconstruction.construct_shifted_average(3, Fraction(1, 2))
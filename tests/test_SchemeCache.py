@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import time
+import pytest
+from util.mathbasic import Fraction
+from util.fvscheme import PolynomialReconstruction
+from util.schemestore import SchemeStore
+from util.schemecache import SchemeCache
+
+
+n_processes = 4
+
+
+def slow_scheme(log_path):
+    """
+    a scheme which takes a while to compute and logs every computation
+    """
+    with open(log_path, "a") as log:
+        log.write("computed\n")
+    time.sleep(0.2)
+    return PolynomialReconstruction.compute_from_order(7, "right").coeffs
+
+
+def worker(store_path, log_path, results):
+    cache = SchemeCache(SchemeStore(store_path))
+    coeffs = cache.get_or_compute(
+        ("order", 7, "right"), lambda: slow_scheme(log_path)
+    )
+    results.put((str(coeffs), cache.stats()))
+
+
+def test_counters(tmp_path):
+    """
+    a miss computes and saves, later lookups hit memory, then disk
+    """
+    store = SchemeStore(str(tmp_path / "schemes.fvs"))
+    cache = SchemeCache(store)
+    key = (1, 1, "right")
+    coeffs = {0: Fraction(1, 2), 1: Fraction(1, 2)}
+    assert cache.get_or_compute(key, lambda: coeffs) == coeffs
+    assert cache.get_or_compute(key, lambda: {}) == coeffs
+    cache.clear()
+    assert cache.get_or_compute(key, lambda: {}) == coeffs
+    assert cache.stats() == {
+        "memory_hits": 1,
+        "disk_hits": 1,
+        "misses": 1,
+        "size": 1,
+    }
+    assert SchemeStore(store.path).get(key) == coeffs
+
+
+def test_lru_eviction(tmp_path):
+    """
+    the least recently used scheme leaves memory first
+    """
+    cache = SchemeCache(SchemeStore(str(tmp_path / "schemes.fvs")), maxsize=2)
+    for i in range(3):
+        cache.get_or_compute((i, i, "right"), lambda: {0: Fraction(1, 1)})
+    assert cache.stats()["size"] == 2
+    cache.get_or_compute((0, 0, "right"), lambda: {})
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_compute_once_per_host(tmp_path):
+    """
+    concurrent processes should compute a missing scheme exactly once and
+    never see a partially written store
+    """
+    store_path = str(tmp_path / "schemes.fvs")
+    log_path = str(tmp_path / "log.txt")
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(store_path, log_path, results))
+        for _ in range(n_processes)
+    ]
+    for process in processes:
+        process.start()
+    outputs = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+    with open(log_path) as log:
+        assert log.read() == "computed\n"
+    assert len(set(coeffs for coeffs, _ in outputs)) == 1
+    assert sum(stats["misses"] for _, stats in outputs) == 1
+    assert sum(stats["disk_hits"] for _, stats in outputs) == n_processes - 1
+    assert not [name for name in os.listdir(tmp_path) if ".tmp" in name]
+    # only the lock file of the whole store is left
+    locks = [name for name in os.listdir(tmp_path) if name.endswith(".lock")]
+    assert locks == ["schemes.fvs.lock"]
+
+
+def other_key_worker(store_path, results):
+    cache = SchemeCache(SchemeStore(store_path))
+    coeffs = cache.get_or_compute((1, 1, "right"), lambda: {0: Fraction(1)})
+    results.put(str(coeffs))
+
+
+def test_other_keys_not_blocked(tmp_path):
+    """
+    a scheme being computed only locks its own key, other processes still
+    compute and save other keys
+    """
+    store = SchemeStore(str(tmp_path / "schemes.fvs"))
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    with store.lock((0, 0, "right")):
+        process = context.Process(
+            target=other_key_worker, args=(store.path, results)
+        )
+        process.start()
+        assert results.get(timeout=30) == str({0: Fraction(1)})
+        process.join()
+    assert (1, 1, "right") in SchemeStore(store.path)
+
+
+def test_normalize_point(tmp_path):
+    cache = SchemeCache(SchemeStore(str(tmp_path / "schemes.fvs")))
+    for point in ["right", "r", "1/2", 0.5, Fraction(1, 2)]:
+        assert cache.normalize_key((2, 2, point)) == (2, 2, "right")
+    assert cache.normalize_key((2, 2, "-2/6")) == (2, 2, "-1/3")
+    assert cache.normalize_key(("order", 3, 0)) == ("order", 3, "center")
+    with pytest.raises(BaseException, match="Invalid reconstruction point"):
+        cache.normalize_key((2, 2, "middle"))
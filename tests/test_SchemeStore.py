@@ -0,0 +1,165 @@
+import os
+import pytest
+import numpy as np
+from util.mathbasic import Fraction
+from util.fvscheme import PolynomialReconstruction
+from util.schemestore import header_size, SchemeStore
+from util.schemecache import SchemeCache
+
+
+csv_directory = os.path.join(
+    os.path.dirname(__file__), "..", "src", "util", "reconstruction_schemes"
+)
+
+
+@pytest.mark.parametrize("order", [1, 4, 9, 25])
+def test_round_trip(order, tmp_path):
+    """
+    exact and float weights should survive saving and reopening the store,
+    including weights which do not fit into 64 bits
+    """
+    path = str(tmp_path / "schemes.fvs")
+    scheme = PolynomialReconstruction.compute_from_order(order, "right")
+    store = SchemeStore(path)
+    store.put(("order", order, "right"), scheme.coeffs)
+    store.put((order // 2, order // 2, Fraction(1, 3)), scheme.coeffs)
+    store.save()
+    reopened = SchemeStore(path)
+    for key in [("order", order, "right"), (order // 2, order // 2, "1/3")]:
+        assert key in reopened
+        assert PolynomialReconstruction(reopened.get(key)) == scheme
+        first, weights = reopened.weights(key)
+        assert first == min(scheme.coeffs.keys())
+        assert weights.dtype == np.float64
+        assert list(weights) == [float(w) for w in scheme.coeffs.values()]
+
+
+def test_import_csv(tmp_path):
+    """
+    the per-order CSV files should import as ("order", n, side) entries
+    """
+    store = SchemeStore(str(tmp_path / "schemes.fvs"))
+    imported = store.import_csv(csv_directory)
+    assert ("order", 5, "left") in imported
+    for key in imported:
+        _, order, side = key
+        assert PolynomialReconstruction(
+            store.get(key)
+        ) == PolynomialReconstruction.compute_from_order(order, side)
+
+
+def test_construct_from_order_store(tmp_path):
+    """
+    construct_from_order should save missing schemes and read them back
+    """
+    store = SchemeStore(str(tmp_path / "schemes.fvs"))
+    assert ("order", 12, "left") not in store
+    scheme = PolynomialReconstruction.construct_from_order(
+        12, "l", cache=SchemeCache(store)
+    )
+    assert ("order", 12, "left") in SchemeStore(store.path)
+    assert (
+        PolynomialReconstruction.construct_from_order(
+            12, "left", cache=SchemeCache(SchemeStore(store.path))
+        )
+        == scheme
+    )
+
+
+def test_numpy_integer_keys(tmp_path):
+    """
+    numpy integers should find the same scheme as ints, before and after
+    the store is saved
+    """
+    assert SchemeStore.normalize_key(("order", np.int64(3), "right")) == (
+        "order",
+        3,
+        "right",
+    )
+    store = SchemeStore(str(tmp_path / "schemes.fvs"))
+    cache = SchemeCache(store)
+    for order in np.arange(1, 4):
+        PolynomialReconstruction.construct_from_order(order, cache=cache)
+    reopened = SchemeStore(store.path)
+    assert sorted(reopened.keys()) == [
+        ("order", i, "right") for i in [1, 2, 3]
+    ]
+    cache = SchemeCache(reopened)
+    PolynomialReconstruction.construct_from_order(np.int32(2), cache=cache)
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_seed(tmp_path):
+    """
+    a store is read from its seed until the first save, which merges the
+    seed into the store and leaves the seed untouched
+    """
+    seed = SchemeStore(str(tmp_path / "seed.fvs"))
+    seed.import_csv(csv_directory)
+    seed_bytes = open(seed.path, "rb").read()
+    store = SchemeStore(str(tmp_path / "user" / "schemes.fvs"), seed.path)
+    assert ("order", 5, "left") in store
+    assert not os.path.exists(store.path)
+    store.put((1, 1, "right"), {0: Fraction(1, 2), 1: Fraction(1, 2)})
+    store.save()
+    reopened = SchemeStore(store.path)
+    assert ("order", 5, "left") in reopened and (1, 1, "right") in reopened
+    assert open(seed.path, "rb").read() == seed_bytes
+
+
+def test_default_store_path(monkeypatch, tmp_path):
+    """
+    the default store lives in the user cache directory and is seeded with
+    the store shipped in the package
+    """
+    monkeypatch.delenv("FVSCHEME_STORE", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    store = SchemeStore()
+    assert store.path == str(tmp_path / "fvscheme" / "schemes.fvs")
+    assert os.path.samefile(
+        store.seed, os.path.join(csv_directory, "schemes.fvs")
+    )
+
+
+def test_solver_reads_store_weights(tmp_path):
+    """
+    the float weights of construct_from_order's schemes are the float64
+    vectors of the store, mapped rather than recomputed
+    """
+    cache = SchemeCache(SchemeStore(str(tmp_path / "schemes.fvs")))
+    first, weights = PolynomialReconstruction.weights_from_order(
+        6, "right", cache=cache
+    )
+    scheme = PolynomialReconstruction.construct_from_order(
+        6, "right", cache=cache
+    )
+    assert first == min(scheme.coeffs.keys())
+    assert list(weights) == [float(w) for w in scheme.coeffs.values()]
+    assert not weights.flags.owndata and not weights.flags.writeable
+
+
+def test_save_appends_records(tmp_path, monkeypatch):
+    """
+    a save copies the saved records without decoding them and appends the
+    new ones, a scheme saved again replaces the old one
+    """
+    store = SchemeStore(str(tmp_path / "schemes.fvs"))
+    store.import_csv(csv_directory)
+    old = SchemeStore(store.path)
+    records = slice(header_size, old._records_end)
+    old_bytes = open(store.path, "rb").read()[records]
+    with monkeypatch.context() as patch:
+        patch.setattr(SchemeStore, "get", None)  # no decoding
+        store.put((4, 4, "right"), {-4: Fraction(2**70, 3), 4: Fraction(1)})
+        store.save()
+    assert open(store.path, "rb").read()[records] == old_bytes
+    store.put(("order", 5, "left"), {0: Fraction(1, 7)})
+    store.save()
+    reopened = SchemeStore(store.path)
+    assert reopened.get((4, 4, "right"))[-4] == Fraction(2**70, 3)
+    assert reopened.get(("order", 5, "left")) == {0: Fraction(1, 7)}
+    assert reopened.weights(("order", 5, "left"))[1][0] == 1 / 7
+    for key in old.keys():
+        if key != ("order", 5, "left"):
+            assert reopened.get(key) == old.get(key)
+            assert list(reopened.weights(key)[1]) == list(old.weights(key)[1])
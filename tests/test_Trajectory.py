@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+from util.trajectory import Trajectory, TrajectoryWriter
+from util.solve import AdvectionSolver
+
+
+n_tests = 5
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_round_trip(tmp_path, chunk_size):
+    """
+    the states written should be read back exactly
+    """
+    path = str(tmp_path / "run.fvt")
+    n, n_times = 10, 20
+    t = np.linspace(0, 1, n_times)
+    states = np.random.rand(n_times, n)
+    grid = np.random.rand(n)
+    with TrajectoryWriter(
+        path, t, n, grid, {"order": 3}, chunk_size
+    ) as writer:
+        for x in states:
+            writer.append(x)
+    trajectory = Trajectory(path)
+    assert len(trajectory) == n_times
+    assert trajectory.metadata == {"order": 3}
+    assert np.array_equal(trajectory.t, t)
+    assert np.array_equal(trajectory.grid, grid)
+    assert np.array_equal(trajectory[:], states)
+    assert np.array_equal(trajectory.cell(4), states[:, 4])
+
+
+def test_readable_while_writing(tmp_path):
+    """
+    only full chunks are on disk before the writer is closed
+    """
+    path = str(tmp_path / "run.fvt")
+    t = np.arange(10.0)
+    states = np.random.rand(10, 5)
+    writer = TrajectoryWriter(path, t, 5, chunk_size=4)
+    assert len(Trajectory(path)) == 0
+    for x in states[:6]:
+        writer.append(x)
+    partial = Trajectory(path)
+    assert np.array_equal(partial.t, t[:4])
+    assert np.array_equal(partial[:], states[:4])
+    for x in states[6:]:
+        writer.append(x)
+    with pytest.raises(BaseException, match="All states"):
+        writer.append(states[0])
+    writer.close()
+    assert np.array_equal(Trajectory(path)[:], states)
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_window(tmp_path, unused_parameter):
+    path = str(tmp_path / "run.fvt")
+    t = np.sort(np.random.rand(30))
+    states = np.random.rand(30, 4)
+    with TrajectoryWriter(path, t, 4) as writer:
+        for x in states:
+            writer.append(x)
+    t_start, t_end = np.sort(np.random.rand(2))
+    times, window = Trajectory(path).window(t_start, t_end)
+    inside = (t >= t_start) & (t <= t_end)
+    assert np.array_equal(times, t[inside])
+    assert np.array_equal(window, states[inside])
+
+
+def test_not_a_trajectory(tmp_path):
+    path = tmp_path / "run.fvt"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(BaseException, match="not a trajectory"):
+        Trajectory(str(path))
+
+
+@pytest.mark.parametrize("snapshots", [None, 3])
+def test_solver_trajectory_matches_history(tmp_path, snapshots):
+    """
+    the states written by the solver should match those kept in memory
+    """
+    path = str(tmp_path / "run.fvt")
+    n = 16
+    h = 1 / n
+    x0 = np.sin(2 * np.pi * (np.arange(n) + 0.5) * h)
+    t = np.arange(0, 0.25, 0.4 * h)
+    in_memory = AdvectionSolver(x0, t, h, 1, 3, snapshots)
+    on_disk = AdvectionSolver(x0, t, h, 1, 3, snapshots, trajectory=path)
+    in_memory.rk4()
+    on_disk.rk4()
+    trajectory = Trajectory(path)
+    assert on_disk.x.shape == (n, 1)
+    assert np.array_equal(on_disk.x[:, 0], in_memory.x[:, -1])
+    assert np.array_equal(trajectory[:], in_memory.x.T)
+    assert np.array_equal(trajectory.t, in_memory.t_snapshots)
+    assert trajectory.grid == pytest.approx((np.arange(n) + 0.5) * h)
+    assert trajectory.metadata == {"h": h, "a": 1, "order": 3}
@@ -0,0 +1,58 @@
+from util.mathbasic import Fraction
+from util.fvscheme import Kernel, PolynomialReconstruction
+from util.schemestore import SchemeStore
+from util.schemecache import SchemeCache
+from generate_schemes import main, make_jobs, parse_orders
+
+
+def test_parse_orders():
+    assert parse_orders("1-3,7") == [1, 2, 3, 7]
+
+
+def test_largest_first():
+    """
+    jobs should be scheduled from the largest kernel down
+    """
+    sizes = [
+        size for size, _ in make_jobs([1, 5, 3], ["right"], ["order", (4, 4)])
+    ]
+    assert sizes == sorted(sizes, reverse=True) == [9, 5, 3, 1]
+
+
+def test_generate(tmp_path):
+    """
+    generate order and kernel schemes in parallel into a store, then skip
+    the saved ones on a second run
+    """
+    path = str(tmp_path / "schemes.fvs")
+    argv = ["--orders", "1-6", "--kernels", "order", "2,1"]
+    argv += ["--points", "right", "1/3", "--workers", "2", "--store", path]
+    jobs = main(argv)
+    assert len(jobs) == 14
+    store = SchemeStore(path)
+    assert PolynomialReconstruction(
+        store.get(("order", 6, "right"))
+    ) == PolynomialReconstruction.compute_from_order(6, "right")
+    assert PolynomialReconstruction(
+        store.get((2, 1, "1/3"))
+    ) == PolynomialReconstruction.construct_from_kernel(
+        Kernel(2, 1), Fraction(1, 3)
+    )
+    assert main(argv) == []
+
+
+def test_points_share_cache_keys(tmp_path):
+    """
+    "1/2" and "right" are the same point, in the generator and the cache
+    """
+    path = str(tmp_path / "schemes.fvs")
+    argv = ["--orders", "3", "--points", "right", "1/2", "0.5"]
+    assert main(argv + ["--workers", "1", "--store", path]) == [
+        ("order", 3, "right")
+    ]
+    cache = SchemeCache(SchemeStore(path))
+    assert cache.get_or_compute(("order", 3, Fraction(1, 2)), dict)
+    assert cache.get_or_compute(("order", 3, "r"), dict)
+    assert cache.stats()["misses"] == 0
+    forced = ["--force", "--workers", "1", "--store", path]
+    assert main(argv + forced) == [("order", 3, "right")]
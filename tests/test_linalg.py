@@ -0,0 +1,99 @@
+import pytest
+import fractions
+from random import randint
+import numpy as np
+from util.linalg import BandedLU, CyclicBandedLU, solve_exact
+
+
+n_tests = 5
+max_size = 8
+max_int = 20
+
+
+@pytest.mark.parametrize("unused_parameter", range(n_tests))
+def test_solve_exact_random(unused_parameter):
+    """
+    multiplying the exact solution back should reproduce the rhs
+    """
+    size = randint(1, max_size)
+    matrix = [
+        [randint(-max_int, max_int) for _ in range(size)] for _ in range(size)
+    ]
+    for i in range(size):  # diagonally dominant, hence nonsingular
+        matrix[i][i] = size * max_int + randint(1, max_int)
+    rhs = [randint(-max_int, max_int) for _ in range(size)]
+    x = solve_exact(matrix, rhs)
+    assert all(isinstance(i, fractions.Fraction) for i in x)
+    for row, b in zip(matrix, rhs):
+        assert sum(a * xi for a, xi in zip(row, x)) == b
+
+
+def test_solve_exact_pivoting():
+    """
+    a zero on the diagonal requires a row swap
+    """
+    assert solve_exact([[0, 1], [1, 0]], [2, 3]) == [3, 2]
+
+
+def test_solve_exact_singular():
+    """
+    singular systems have no unique solution
+    """
+    with pytest.raises(BaseException, match="Singular"):
+        solve_exact([[1, 2], [2, 4]], [1, 2])
+
+
+def dense_from_bands(bands, cyclic):
+    """
+    dense matrices of (batch, n, 2 p + 1) bands
+    """
+    batch, n, width = bands.shape
+    p = (width - 1) // 2
+    matrix = np.zeros((batch, n, n))
+    for i in range(n):
+        for m in range(-p, p + 1):
+            if cyclic or 0 <= i + m < n:
+                matrix[:, i, (i + m) % n] += bands[:, i, p + m]
+    return matrix
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+@pytest.mark.parametrize("p", range(4))
+def test_banded_lu_matches_dense(cyclic, p):
+    n = randint(2 * p + 1, 40)
+    bands = np.random.randn(3, n, 2 * p + 1)
+    rhs = np.random.randn(3, n, 2)
+    solver = CyclicBandedLU(bands) if cyclic else BandedLU(bands)
+    expected = np.linalg.solve(dense_from_bands(bands, cyclic), rhs)
+    assert solver.solve(rhs) == pytest.approx(expected, rel=1e-8, abs=1e-8)
+
+
+@pytest.mark.parametrize("cyclic", [False, True])
+@pytest.mark.parametrize("block_size", [1, 2, 5])
+def test_banded_lu_blocks(cyclic, block_size):
+    """
+    many blocks, diagonally dominant as there is no pivoting across blocks
+    """
+    p = randint(0, 3)
+    n = randint(2 * p + 1, 40)
+    bands = np.random.randn(2, n, 2 * p + 1)
+    bands[..., p] += 2 * p + 2
+    rhs = np.random.randn(2, n, 3)
+    solver = (CyclicBandedLU if cyclic else BandedLU)(bands, block_size)
+    expected = np.linalg.solve(dense_from_bands(bands, cyclic), rhs)
+    assert solver.solve(rhs) == pytest.approx(expected, rel=1e-8, abs=1e-8)
+
+
+def test_banded_lu_pivots():
+    """
+    a zero on the diagonal needs a row swap
+    """
+    bands = np.array([[[0, 0, 1], [1, 0, 1], [1, 2, 0]]], dtype=float)
+    rhs = np.array([[[1], [2], [3]]], dtype=float)
+    expected = np.linalg.solve(dense_from_bands(bands, False), rhs)
+    assert BandedLU(bands).solve(rhs) == pytest.approx(expected)
+
+
+def test_cyclic_banded_lu_requirements():
+    with pytest.raises(BaseException, match="smaller than its band"):
+        CyclicBandedLU(np.ones((1, 4, 5)))
@@ -1,4 +1,4 @@
-from util.mathbasic import gcf, lcm
+from util.mathbasic import gcf, lcm, gcd_many, lcm_many
 
 
 def test_gcf():
@@ -17,3 +17,27 @@ def test_lcm():
     assert lcm(3, 2) == 6
     assert lcm(100, -10) == -100
     assert lcm(1, 1) == 1
+
+
+def test_gcd_many():
+    """
+    test the n-ary gcd on small and high order sized operands
+    """
+    assert gcd_many([15, 30, 60]) == 15
+    assert gcd_many([-4, 8, 0]) == 4
+    assert gcd_many([]) == 0
+    big = 2**61 - 1  # prime
+    assert gcd_many([3 * big, 5 * big, -7 * big]) == big
+    assert gcd_many([big, big + 1]) == 1
+
+
+def test_lcm_many():
+    """
+    test the n-ary lcm on small and high order sized operands
+    """
+    assert lcm_many([2, 3, 4]) == 12
+    assert lcm_many([-6, 4]) == 12
+    assert lcm_many([]) == 1
+    assert lcm_many([5, 0]) == 0
+    big = 2**61 - 1  # prime
+    assert lcm_many([3 * big, 5 * big]) == 15 * big
@@ -0,0 +1,203 @@
+import json
+import math
+import pytest
+import numpy as np
+from util.integrate import Integrator
+from util.rungekutta import (
+    ButcherTableau,
+    DiagonallyImplicitTableau,
+    LowStorage2S,
+    load_tableaus,
+    register,
+    tableau_from_dict,
+    tableaus,
+)
+from util.solve import AdvectionSolver
+
+
+methods = list(tableaus.keys())
+explicit_methods = [
+    name
+    for name, tableau in tableaus.items()
+    if not isinstance(tableau, DiagonallyImplicitTableau)
+]
+implicit_methods = [name for name in methods if name not in explicit_methods]
+
+
+class Oscillator(Integrator):
+    """
+    state vector: (x, xdot) of an undamped oscillator, not autonomous in
+    time through a forcing term cos t
+    """
+
+    def xdot(self, x, t_i):
+        return np.array([x[1], -x[0] + np.cos(t_i)])
+
+    def solve_implicit(self, rhs, t_i, gamma_dt, out):
+        matrix = np.array([[1, -gamma_dt], [gamma_dt, 1]])
+        out[:] = np.linalg.solve(matrix, rhs + [0, gamma_dt * np.cos(t_i)])
+
+
+def oscillator_error(method, n_steps):
+    """
+    error at t = 2 of x'' + x = cos t with x(0) = 1, x'(0) = 0, whose
+    solution is x = cos t + t sin t / 2, x' = t cos t / 2 - sin t / 2
+    """
+    t = np.linspace(0, 2, n_steps + 1)
+    oscillator = Oscillator(np.array([1.0, 0.0]), t)
+    oscillator.integrate(method)
+    exact = np.array([np.cos(2) + np.sin(2), np.cos(2) - np.sin(2) / 2])
+    return np.linalg.norm(oscillator.x[:, -1] - exact)
+
+
+@pytest.mark.parametrize("method", methods)
+def test_order_of_convergence(method):
+    """
+    halving the step should divide the error by about 2 ** order
+    """
+    order = tableaus[method].order
+    errors = [oscillator_error(method, n) for n in [20, 40]]
+    assert np.log2(errors[0] / errors[1]) == pytest.approx(order, abs=0.3)
+
+
+@pytest.mark.parametrize("method", explicit_methods)
+def test_stability_polynomial_matches_order(method):
+    """
+    R(z) should agree with exp(z) up to z ** order
+    """
+    tableau = tableaus[method]
+    coefficients = tableau.stability_polynomial()
+    assert len(coefficients) == tableau.stages + 1
+    for k in range(tableau.order + 1):
+        assert coefficients[k] == pytest.approx(1 / math.factorial(k))
+
+
+@pytest.mark.parametrize(
+    "method, real, imaginary",
+    [
+        ("euler", 2, 0),
+        ("rk4", 2.7853, 2 * np.sqrt(2)),
+        ("ssprk2", 2, 0),
+        ("ssprk3", 2.5127, np.sqrt(3)),
+        ("lsrk3", 2.5127, np.sqrt(3)),
+    ],
+)
+def test_stability_limits(method, real, imaginary):
+    tableau = tableaus[method]
+    assert tableau.stability_limit(-1) == pytest.approx(real, abs=1e-4)
+    assert tableau.stability_limit(1j) == pytest.approx(imaginary, abs=1e-4)
+
+
+@pytest.mark.parametrize(
+    "method, registers",
+    [("rk4", 5), ("ssprk3", 2), ("ssprk104", 2), ("lsrk54", 2)],
+)
+def test_registers(method, registers):
+    assert tableaus[method].registers == registers
+
+
+@pytest.mark.parametrize("method", methods)
+def test_inplace_matches_allocating(method):
+    """
+    the stages should give the same states with or without xdot's out
+    """
+    h = 1 / 32
+    x0 = np.random.rand(32)
+    t = np.arange(0, 0.1, 0.4 * h)
+    inplace = AdvectionSolver(x0, t, h, 1, 3)
+    allocating = AdvectionSolver(x0, t, h, 1, 3)
+    allocating.inplace = False
+    inplace.integrate(method)
+    allocating.integrate(method)
+    assert inplace.x == pytest.approx(allocating.x, rel=1e-12, abs=1e-12)
+
+
+@pytest.mark.parametrize("method", ["ssprk2", "ssprk3", "ssprk104"])
+def test_ssp_total_variation(method):
+    """
+    with first order upwinding, which is total variation diminishing for
+    Euler steps with CFL <= 1, an SSP method should be so for CFL up to its
+    SSP coefficient
+    """
+    n = 64
+    h = 1 / n
+    cfl = 0.99 * tableaus[method].ssp_coefficient
+    x0 = np.where(np.arange(n) < n // 2, 1.0, 0.0)
+    t = np.arange(0, 1, cfl * h)
+    solver = AdvectionSolver(x0, t, h, 1, 1)
+    solver.integrate(method)
+    variation = np.sum(np.abs(solver.x - np.roll(solver.x, 1, axis=0)), axis=0)
+    assert np.all(np.diff(variation) <= 1e-12)
+
+
+def test_register_from_dict(tmp_path):
+    """
+    a method added as data should run like a built-in one
+    """
+    spec = {
+        "form": "butcher",
+        "name": "heun",
+        "a": [[0, 0], [1, 0]],
+        "b": ["1/2", "1/2"],
+        "c": [0, 1],
+        "order": 2,
+    }
+    path = tmp_path / "tableaus.json"
+    path.write_text(json.dumps([spec]))
+    try:
+        assert load_tableaus(str(path)) == ["heun"]
+        assert isinstance(tableaus["heun"], ButcherTableau)
+        assert oscillator_error("heun", 40) == pytest.approx(
+            oscillator_error("ssprk2", 40)
+        )
+    finally:
+        tableaus.pop("heun")
+
+
+def test_invalid_method():
+    with pytest.raises(BaseException, match="Invalid tableau form"):
+        tableau_from_dict({"form": "implicit", "name": "x"})
+    with pytest.raises(BaseException, match="Invalid integration method"):
+        oscillator_error("unknown", 10)
+
+
+def test_register_replaces():
+    tableau = LowStorage2S("copy", [1], [0], [1], [1], [0], order=1)
+    try:
+        register(tableau)
+        assert tableaus["copy"] is tableau
+        assert oscillator_error("copy", 20) == oscillator_error("euler", 20)
+    finally:
+        tableaus.pop("copy")
+
+
+@pytest.mark.parametrize("method", methods)
+def test_stability_function_matches_order(method):
+    """
+    R(z) - exp(z) should shrink at least like z ** (order + 1)
+    """
+    tableau = tableaus[method]
+    z = np.array([-0.1, -0.05, 0.1j, 0.05j])
+    errors = np.abs(tableau.stability_function(z) - np.exp(z))
+    ratios = errors[[0, 2]] / errors[[1, 3]]
+    assert np.all(np.log2(ratios) > tableau.order + 0.8)
+
+
+@pytest.mark.parametrize("method", implicit_methods)
+def test_implicit_methods_are_unconditionally_stable(method):
+    tableau = tableaus[method]
+    assert tableau.stability_limit(-1) == np.inf
+    assert tableau.stability_limit(1j) == np.inf
+    z = -np.random.rand(100) * 1e3 + 1j * np.random.randn(100) * 1e3
+    assert np.all(np.abs(tableau.stability_function(z)) <= 1 + 1e-12)
+    with pytest.raises(BaseException, match="rational stability function"):
+        tableau.stability_polynomial()
+
+
+def test_implicit_step_needs_solver():
+    class Decay(Integrator):
+        def xdot(self, x, t_i):
+            return -x
+
+    with pytest.raises(BaseException, match="Decay has no implicit solver"):
+        Decay(np.ones(1), np.array([0, 1])).integrate("backward_euler")